@@ -1,1792 +1,2960 @@
-# -*- coding: utf-8 -*-
-"""
-Copyright (c) Lodve Berre and NTNU Technology Transfer AS 2024.
-
-This file is part of Really Nice IRL.
-
-Really Nice IRL is free software: you can redistribute it and/or modify it
-under the terms of the GNU Affero General Public License as published by the
-Free Software Foundation, either version 3 of the License, or (at your option)
- any later version.
-
-Really Nice IRL is distributed in the hope that it will be useful, but
-WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
-or FITNESS FOR A PARTICULAR PURPOSE.
-See the GNU General Public License for more details.
-
-You should have received a copy of the GNU Affero General Public License
-along with Really Nice IRL. If not, see:
-<https://www.gnu.org/licenses/agpl-3.0.html>.
-"""
-
-from dataclasses import dataclass
-from datetime import datetime
-from sqlalchemy import create_engine, desc, func, Column, Integer, Text
-from sqlalchemy import update, ForeignKey
-from sqlalchemy.orm import declarative_base, sessionmaker, mapped_column
-from sqlalchemy.orm.attributes import InstrumentedAttribute
-from sqlalchemy.orm import relationship
-
-import bcrypt
-import pandas as pd
-import streamlit as st
-
-import utils
-
-Base = declarative_base()
-
-rights_map = {"Read Only": 0,
-              "Read/Write": 1,
-              "Read/Write/Create": 2,
-              "Administrator": 9}
-
-
-class SerializerMixin:
-    """
-    This class is used to make other classes iterable and enable easy
-    conversion from database queries to Pandas Dataframes via dictionaries.
-    """
-
-    def __init__(self, data):
-
-        for field in self.__table__.columns:
-
-            if getattr(field, 'name'):
-                setattr(self, field.name, data[field.name])
-
-    def as_dict(self):
-        return {column.name: getattr(self, column.name)
-                for column in self.__table__.columns}
-
-    def to_dict(self):
-        return {column.name: getattr(self, column.name)
-                for column in self.__table__.columns}
-
-
-class IRL(Base, SerializerMixin):
-    """
-    Wrapper class around IRL texts and values in the database.
-    """
-
-    __tablename__ = 'IRL'
-
-    Level = Column(Integer, primary_key=True)
-    IRLType = Column(Text(3))
-    Description = Column(Text)
-    Aspects = Column(Text)
-    StartupValue = Column(Integer)
-    LicenseValue = Column(Integer)
-
-
-class IRLAssessment(Base, SerializerMixin):
-    """
-    Wrapper class around the IRL Data table in the database.
-    Contains all the historical assessment values for all projects.
-    """
-
-    __tablename__ = 'IRL Data'
-
-    id = Column(Integer, primary_key=True)
-    project_no = Column(Integer)
-    project_name = Column(Text)
-    project_leader_id = mapped_column(ForeignKey('Users.user_id'))
-    assessment_date = Column(Text(10))
-    crl = Column(Integer)
-    trl = Column(Integer)
-    brl = Column(Integer)
-    iprl = Column(Integer)
-    tmrl = Column(Integer)
-    frl = Column(Integer)
-    crl_notes = Column(Text)
-    trl_notes = Column(Text)
-    brl_notes = Column(Text)
-    iprl_notes = Column(Text)
-    tmrl_notes = Column(Text)
-    frl_notes = Column(Text)
-    crl_target = Column(Integer)
-    trl_target = Column(Integer)
-    brl_target = Column(Integer)
-    iprl_target = Column(Integer)
-    tmrl_target = Column(Integer)
-    frl_target = Column(Integer)
-    crl_target_lead = Column(Text(64))
-    trl_target_lead = Column(Text(64))
-    brl_target_lead = Column(Text(64))
-    iprl_target_lead = Column(Text(64))
-    tmrl_target_lead = Column(Text(64))
-    frl_target_lead = Column(Text(64))
-    crl_target_duedate = Column(Text(10))
-    trl_target_duedate = Column(Text(10))
-    brl_target_duedate = Column(Text(10))
-    iprl_target_duedate = Column(Text(10))
-    tmrl_target_duedate = Column(Text(10))
-    frl_target_duedate = Column(Text(10))
-    plot_targets = Column(Integer)
-    active = Column(Integer)
-
-    def __str__(self):
-        return str(self.project_no) + " " + str(self.project_name)
-
-    def __repr__(self):
-        return str(self.project_no) + " " + str(self.project_name)
-
-    def _getDate(self):
-        """
-        Convenience method to convert from datetime.date to ISO standard
-        date string which we store in the database.
-
-        Returns
-        -------
-        date : str
-            ISO standard date (YYYY-MM-DD).
-        """
-
-        date = datetime.now()
-        date = '%d-%02d-%02d' % (date.year, date.month, date.day)
-
-        return date
-
-    def calc_license_value(self):
-        """
-        Method to calculate ballpark license value based on IRL levels and
-        the corresponding values in the database.
-        WARNING: NOT CALIBRATED OUT OF THE BOX!
-        VALUES MUST BE SET ACCORDING TO LOCAL CURRENCY AND EXPERIENCE!
-
-        Returns
-        -------
-        value : int
-             Sum of license values set in database for the IRL.
-        """
-
-        engine = create_engine(st.secrets.db_details.db_path)
-        Base.metadata.create_all(bind=engine)
-        Session = sessionmaker(bind=engine)
-        session = Session()
-        value = session.query(func.sum(IRL.LicenseValue)).filter(
-                ((IRL.IRLType == 'CRL') & (IRL.Level == self.crl)) |
-                ((IRL.IRLType == 'TRL') & (IRL.Level == self.trl)) |
-                ((IRL.IRLType == 'BRL') & (IRL.Level == self.brl)) |
-                ((IRL.IRLType == 'IPRL') & (IRL.Level == self.iprl)) |
-                ((IRL.IRLType == 'TMRL') & (IRL.Level == self.tmrl)) |
-                ((IRL.IRLType == 'FRL') & (IRL.Level == self.frl)))\
-            .scalar()
-        session.close()
-        engine.dispose()
-
-        return value
-
-    def calc_license_target_value(self):
-        """
-        Method to calculate ballpark license value based on IRL levels and
-        the corresponding target values in the database.
-        WARNING: NOT CALIBRATED OUT OF THE BOX!
-        VALUES MUST BE SET ACCORDING TO LOCAL CURRENCY AND EXPERIENCE!
-
-        Returns
-        -------
-        value : int
-             Sum of license values set in database for the target IRL.
-        """
-
-        engine = create_engine(st.secrets.db_details.db_path)
-        Base.metadata.create_all(bind=engine)
-        Session = sessionmaker(bind=engine)
-        session = Session()
-        value = session.query(func.sum(IRL.LicenseValue)).filter(
-                ((IRL.IRLType == 'CRL') & (IRL.Level == self.crl_target)) |
-                ((IRL.IRLType == 'TRL') & (IRL.Level == self.trl_target)) |
-                ((IRL.IRLType == 'BRL') & (IRL.Level == self.brl_target)) |
-                ((IRL.IRLType == 'IPRL') & (IRL.Level == self.iprl_target)) |
-                ((IRL.IRLType == 'TMRL') & (IRL.Level == self.tmrl_target)) |
-                ((IRL.IRLType == 'FRL') & (IRL.Level == self.frl_target)))\
-            .scalar()
-        session.close()
-        engine.dispose()
-
-        return value
-
-    def calc_startup_value(self):
-
-        engine = create_engine(st.secrets.db_details.db_path)
-        Base.metadata.create_all(bind=engine)
-        Session = sessionmaker(bind=engine)
-        session = Session()
-        value = session.query(func.sum(IRL.StartupValue)).filter(
-                ((IRL.IRLType == 'CRL') & (IRL.Level == self.crl)) |
-                ((IRL.IRLType == 'TRL') & (IRL.Level == self.trl)) |
-                ((IRL.IRLType == 'BRL') & (IRL.Level == self.brl)) |
-                ((IRL.IRLType == 'IPRL') & (IRL.Level == self.iprl)) |
-                ((IRL.IRLType == 'TMRL') & (IRL.Level == self.tmrl)) |
-                ((IRL.IRLType == 'FRL') & (IRL.Level == self.frl)))\
-            .scalar()
-        session.close()
-        engine.dispose()
-
-        return value
-
-    def calc_startup_target_value(self):
-
-        engine = create_engine(st.secrets.db_details.db_path)
-        Base.metadata.create_all(bind=engine)
-        Session = sessionmaker(bind=engine)
-        session = Session()
-        value = session.query(func.sum(IRL.StartupValue)).filter(
-                ((IRL.IRLType == 'CRL') & (IRL.Level == self.crl_target)) |
-                ((IRL.IRLType == 'TRL') & (IRL.Level == self.trl_target)) |
-                ((IRL.IRLType == 'BRL') & (IRL.Level == self.brl_target)) |
-                ((IRL.IRLType == 'IPRL') & (IRL.Level == self.iprl_target)) |
-                ((IRL.IRLType == 'TMRL') & (IRL.Level == self.tmrl_target)) |
-                ((IRL.IRLType == 'FRL') & (IRL.Level == self.frl_target)))\
-            .scalar()
-        session.close()
-        engine.dispose()
-
-        return value
-
-    def insert(self):
-
-        self.assessment_date = self._getDate()
-        engine = create_engine(st.secrets.db_details.db_path)
-        Base.metadata.create_all(bind=engine)
-        Session = sessionmaker()
-        Session.configure(bind=engine)
-        session = Session()
-
-        exists = (session.query(IRLAssessment).filter(
-            IRLAssessment.project_no == self.project_no).first() is not None)
-        error = None
-
-        if exists:
-
-            error = "Project already exists in the database!"
-
-        else:
-
-            session.add(self)
-            session.commit()
-
-        session.close()
-        engine.dispose()
-
-        return error
-
-    def update(self, overwrite=False):
-
-        engine = create_engine(st.secrets.db_details.db_path)
-        Base.metadata.create_all(bind=engine)
-        Session = sessionmaker()
-        Session.configure(bind=engine)
-        session = Session()
-        mapped_values = {}
-        date = self._getDate()
-
-        # If the date on record is today, we overwrite.
-        if overwrite or date == self.assessment_date:
-
-            for item in IRLAssessment.__dict__.items():
-
-                field_name = item[0]
-                field_type = item[1]
-                is_column = isinstance(field_type, InstrumentedAttribute)
-
-                if is_column:
-
-                    mapped_values[field_name] = getattr(self, field_name)
-
-            session.query(IRLAssessment).filter(
-                IRLAssessment.id == self.id).update(mapped_values)
-
-        # If not, we insert a new assessment and keep the historical one.
-        else:
-
-            # This is probably not the best way to do this. But hey, it works.
-            new_irl = IRLAssessment()
-            new_irl.project_no = self.project_no
-            new_irl.project_name = self.project_name
-            new_irl.project_leader_id = self.project_leader_id
-            new_irl.assessment_date = date
-            new_irl.crl = self.crl
-            new_irl.trl = self.trl
-            new_irl.brl = self.brl
-            new_irl.iprl = self.iprl
-            new_irl.tmrl = self.tmrl
-            new_irl.frl = self.frl
-            new_irl.crl_notes = self.crl_notes
-            new_irl.trl_notes = self.trl_notes
-            new_irl.brl_notes = self.brl_notes
-            new_irl.iprl_notes = self.iprl_notes
-            new_irl.tmrl_notes = self.tmrl_notes
-            new_irl.frl_notes = self.frl_notes
-            new_irl.crl_target = self.crl_target
-            new_irl.trl_target = self.trl_target
-            new_irl.brl_target = self.brl_target
-            new_irl.iprl_target = self.iprl_target
-            new_irl.tmrl_target = self.tmrl_target
-            new_irl.frl_target = self.frl_target
-            new_irl.crl_target_lead = self.crl_target_lead
-            new_irl.trl_target_lead = self.trl_target_lead
-            new_irl.brl_target_lead = self.brl_target_lead
-            new_irl.iprl_target_lead = self.iprl_target_lead
-            new_irl.tmrl_target_lead = self.tmrl_target_lead
-            new_irl.frl_target_lead = self.frl_target_lead
-            new_irl.crl_target_duedate = self.crl_target_duedate
-            new_irl.trl_target_duedate = self.trl_target_duedate
-            new_irl.brl_target_duedate = self.brl_target_duedate
-            new_irl.iprl_target_duedate = self.iprl_target_duedate
-            new_irl.tmrl_target_duedate = self.tmrl_target_duedate
-            new_irl.frl_target_duedate = self.frl_target_duedate
-            new_irl.plot_targets = self.plot_targets
-            new_irl.active = self.active
-
-            session.add(new_irl)
-
-        session.commit()
-        session.close()
-        engine.dispose()
-
-    def __eq__(self, other):
-
-        if isinstance(other, IRLAssessment):
-
-            if other.id == self.id:
-
-                return True
-
-        return False
-
-
-class User(Base, SerializerMixin):
-    """
-    Rights: 0: read-only, #1: read/write, #2, read/write/create, #9: admin
-    Active: # 0: inactive, #1: active
-    """
-    __tablename__ = 'Users'
-
-    user_id = Column(Integer, primary_key=True)
-    actual_name = Column(Text)
-    username = Column(Text(100), unique=True)
-    password = Column(Text(100))
-    rights = Column(Integer)
-    active = Column(Integer)
-    org_id = Column(Integer)
-    fac_id = Column(Integer)
-    dep_id = Column(Integer)
-
-    def __hash__(self):
-        return int(self.user_id)
-
-    def __str__(self):
-        return str(self.actual_name) + " (" + self.username + ")"
-
-    def __repr__(self):
-        return str(self.actual_name) + " (" + self.username + ")"
-
-
-class UserSettings(Base):
-
-    __tablename__ = 'User Settings'
-
-    id = Column(Integer, primary_key=True)
-    user_id = mapped_column(ForeignKey('Users.user_id'))
-    smooth_irl = Column(Integer)
-    filter_on_user = Column(Integer)
-    remember_project = Column(Integer)
-    last_project_no = Column(Integer)
-    ascending_irl = Column(Integer)
-    ap_table_view = Column(Integer)
-    dark_mode = Column(Integer)
-
-    def update(self):
-
-        engine = create_engine(st.secrets.db_details.db_path)
-        Base.metadata.create_all(bind=engine)
-        Session = sessionmaker()
-        Session.configure(bind=engine)
-        session = Session()
-        mapped_values = {}
-
-        for item in UserSettings.__dict__.items():
-
-            field_name = item[0]
-            field_type = item[1]
-            is_column = isinstance(field_type, InstrumentedAttribute)
-
-            if is_column:
-
-                mapped_values[field_name] = getattr(self, field_name)
-
-        session.query(UserSettings).filter(UserSettings.id == self.id).\
-            update(mapped_values)
-        session.commit()
-        session.close()
-        engine.dispose()
-
-
-class SystemSettings(Base):
-
-    __tablename__ = 'System Settings'
-
-    id = Column(Integer, primary_key=True)
-    logo_uri = Column(Text)
-    logo_uri_dark = Column(Text)
-    logo_uri_light = Column(Text)
-    force_email_users = Column(Integer)
-    owner_org_id = mapped_column(ForeignKey('Organisations.org_id'))
-
-    def update(self):
-
-        engine = create_engine(st.secrets.db_details.db_path)
-        Base.metadata.create_all(bind=engine)
-        Session = sessionmaker()
-        Session.configure(bind=engine)
-        session = Session()
-        mapped_values = {}
-
-        for item in SystemSettings.__dict__.items():
-
-            field_name = item[0]
-            field_type = item[1]
-            is_column = isinstance(field_type, InstrumentedAttribute)
-
-            if is_column:
-
-                mapped_values[field_name] = getattr(self, field_name)
-
-        session.query(SystemSettings).filter(SystemSettings.id == self.id).\
-            update(mapped_values)
-        session.commit()
-        session.close()
-        engine.dispose()
-
-
-class Organisation(Base):
-
-    __tablename__ = 'Organisations'
-
-    org_id = Column(Integer, primary_key=True)
-    org_name = Column(Text)
-    active = Column(Integer)
-
-    def __str__(self):
-        return self.org_name
-
-    def __repr__(self):
-        return self.org_name
-
-
-class Faculty(Base):
-
-    __tablename__ = 'Faculties'
-
-    fac_id = Column(Integer, primary_key=True)
-    fac_name = Column(Text)
-    org_id = mapped_column(ForeignKey('Organisations.org_id'))
-    active = Column(Integer)
-
-    def __str__(self):
-        return self.fac_name
-
-    def __repr__(self):
-        return self.fac_name
-
-
-class Department(Base):
-
-    __tablename__ = 'Departments'
-
-    dep_id = Column(Integer, primary_key=True)
-    dep_name = Column(Text)
-    fac_id = mapped_column(ForeignKey('Faculties.fac_id'))
-    active = Column(Integer)
-
-    def __str__(self):
-        return self.dep_name
-
-    def __repr__(self):
-        return self.dep_name
-
-
-class ProjectTeam(Base, SerializerMixin):
-
-    __tablename__ = "Project Teams"
-
-    id = Column(Integer, primary_key=True)
-    project_id = Column(Integer)
-    user_id = Column(Integer, ForeignKey('Users.user_id'))
-    project_rights = Column(Integer, ForeignKey('Permission Levels.level'))
-    active = Column(Integer)
-
-    user = relationship("User", backref="ProjectTeam")
-
-    def update(self):
-
-        engine = create_engine(st.secrets.db_details.db_path)
-        Base.metadata.create_all(bind=engine)
-        Session = sessionmaker()
-        Session.configure(bind=engine)
-        session = Session()
-        uv = {'project_rights': self.project_rights, 'active': self.active}
-        session.query(ProjectTeam).filter(
-               ProjectTeam.id == self.id).update(uv)
-        session.commit()
-        session.close()
-        engine.dispose()
-
-    def __str__(self):
-        return self.user.actual_name
-
-    def __repr__(self):
-        return self.user.actual_name
-
-
-@dataclass
-class PermissionLevel(Base):
-
-    __tablename__ = "Permission Levels"
-
-    level = Column(Integer, primary_key=True)
-    level_text = Column(Text)
-
-    def __hash__(self):
-        return int(self.level)
-
-    def __repr__(self):
-
-        return self.level_text
-
-    def __str__(self):
-
-        return self.level_text
-
-
-class ActionPoint(Base, SerializerMixin):
-
-    __tablename__ = "Action Points"
-
-    ap_id = Column(Integer, primary_key=True)
-    assessment_id = Column(Integer, ForeignKey('IRL Data.id'))
-    irl_type = Column(Text(4))
-    action_point = Column(Text)
-    responsible = Column(Integer, ForeignKey('Users.user_id'))
-    due_date = Column(Text(10))
-    progress = Column(Integer)
-    comment = Column(Text)
-
-    user = relationship("User", backref="ActionPoint")
-
-    def copy(self, ass_id):
-        """
-        Makes a copy of the action point, but assigns it to a new assessment.
-
-        Parameters
-        ----------
-        ass_id : Integer
-            The IRL Assessment ID to attach the action point to.
-
-        Returns
-        -------
-        None.
-
-        """
-
-        new_self = ActionPoint()
-        new_self.assessment_id = ass_id
-        new_self.irl_type = self.irl_type
-        new_self.action_point = self.action_point
-        new_self.responsible = self.responsible
-        new_self.due_date = self.due_date
-        new_self.progress = self.progress
-        new_self.comment = self.comment
-        new_self.insert()
-
-    def insert(self):
-
-        engine = create_engine(st.secrets.db_details.db_path)
-        Base.metadata.create_all(bind=engine)
-        Session = sessionmaker()
-        Session.configure(bind=engine)
-        session = Session()
-        session.add(self)
-        session.commit()
-        session.close()
-        engine.dispose()
-
-    def update(self):
-
-        engine = create_engine(st.secrets.db_details.db_path)
-        Base.metadata.create_all(bind=engine)
-        Session = sessionmaker()
-        Session.configure(bind=engine)
-        session = Session()
-        uv = {'action_point': self.action_point,
-              'responsible': self.responsible,
-              'due_date': self.due_date,
-              'progress': self.progress,
-              'comment': self.comment}
-        session.query(ActionPoint).filter(
-                ActionPoint.ap_id == self.ap_id).update(uv)
-        session.commit()
-        session.close()
-        engine.dispose()
-
-    def __repr__(self):
-
-        ap_txt = self.irl_type
-        ap_txt += " action point: " + self.action_point
-        ap_txt += "\tProgress: " + str(self.progress) + " %"
-        ap_txt += "\tDue date: " + self.due_date
-        ap_txt += "\tComment: " + self.comment
-        return ap_txt
-
-    def __str__(self):
-
-        return self.__repr__()
-
-
-"""
-IRL methods.
-"""
-
-
-def get_irl(irl_ass_id):
-
-    engine = create_engine(st.secrets.db_details.db_path)
-    Base.metadata.create_all(bind=engine)
-    Session = sessionmaker(bind=engine)
-    session = Session()
-    irl_ass = session.query(IRLAssessment).filter(
-        (IRLAssessment.id == irl_ass_id)).first()
-    session.close()
-    engine.dispose()
-
-    return irl_ass
-
-
-def irl_ass_changed(irl_ass):
-    """
-    Check if the assessment is currently different from the one saved in
-    the database.
-
-    Parameters
-    ----------
-    irl_ass_id : TYPE
-        DESCRIPTION.
-    irl_ass : TYPE
-        DESCRIPTION.
-
-    Returns
-    -------
-    Bool
-
-    """
-    db_irl_ass = get_irl(irl_ass.id)
-    attrs = ('crl', 'trl', 'brl', 'iprl', 'tmrl', 'frl')
-
-    for attr in attrs:
-
-        db_attr = getattr(db_irl_ass, attr)
-        irl_attr = getattr(irl_ass, attr)
-
-        if db_attr != irl_attr:
-
-            return True
-
-    return False
-
-
-def get_irl_table(irl_type, ascending=False):
-    """
-    Convenience method for grabbing IRL levels and descriptions from DB.
-
-    Parameters
-    ----------
-    irl_type : string
-        One of 'CRL', 'TRL', 'BRL', 'IPRL', 'TRL' 'FRL'.
-    ascending : bool
-        Returns table in ascdescending IRL level order if True,
-        returns table in descending IRL level order if False (default).
-
-    Returns
-    -------
-    irl_table : Pandas DataFrame
-        DESCRIPTION.
-
-    """
-    assert irl_type in ['CRL', 'TRL', 'BRL', 'IPRL', 'TMRL', 'FRL']
-
-    engine = create_engine(st.secrets.db_details.db_path)
-    Base.metadata.create_all(bind=engine)
-    Session = sessionmaker(bind=engine)
-    session = Session()
-
-    if ascending:
-
-        irl_orm = session.query(IRL).\
-            filter(IRL.IRLType == irl_type).\
-            order_by(IRL.Level).all()
-    else:
-
-        irl_orm = session.query(IRL).\
-            filter(IRL.IRLType == irl_type).\
-            order_by(desc(IRL.Level)).all()
-
-    session.close()
-    engine.dispose()
-    irl_df = pd.DataFrame([item.to_dict() for item in irl_orm])
-
-    return irl_df
-
-
-def get_irl_license_value_matrix():
-
-    df_dict = {'Level': list(range(1, 10, 1))}
-    irl_types = ['CRL', 'TRL', 'BRL', 'IPRL', 'TMRL', 'FRL']
-    engine = create_engine(st.secrets.db_details.db_path)
-    Base.metadata.create_all(bind=engine)
-    Session = sessionmaker(bind=engine)
-    session = Session()
-
-    for irl_type in irl_types:
-
-        irl_values = session.query(IRL.LicenseValue).\
-            filter(IRL.IRLType == irl_type).\
-            order_by(IRL.Level).all()
-        irl_values = list(map(lambda irl_value: irl_value[0], irl_values))
-        df_dict[irl_type] = irl_values
-
-    session.close()
-    engine.dispose()
-    irl_df = pd.DataFrame(df_dict)
-
-    return irl_df
-
-
-def get_irl_startup_value_matrix():
-
-    df_dict = {'Level': list(range(1, 10, 1))}
-    irl_types = ['CRL', 'TRL', 'BRL', 'IPRL', 'TMRL', 'FRL']
-    engine = create_engine(st.secrets.db_details.db_path)
-    Base.metadata.create_all(bind=engine)
-    Session = sessionmaker(bind=engine)
-    session = Session()
-
-    for irl_type in irl_types:
-
-        irl_values = session.query(IRL.StartupValue).\
-            filter(IRL.IRLType == irl_type).\
-            order_by(IRL.Level).all()
-        irl_values = list(map(lambda irl_value: irl_value[0], irl_values))
-        df_dict[irl_type] = irl_values
-
-    session.close()
-    engine.dispose()
-    irl_df = pd.DataFrame(df_dict)
-
-    return irl_df
-
-
-def update_license_values(edited_rows):
-
-    engine = create_engine(st.secrets.db_details.db_path)
-    Base.metadata.create_all(bind=engine)
-    Session = sessionmaker()
-    Session.configure(bind=engine)
-    session = Session()
-
-    for row in edited_rows.keys():
-
-        for irl, value in edited_rows[row].items():
-
-            session.query(IRL).filter(IRL.Level == row+1,
-                                      IRL.IRLType == irl).\
-                update({'LicenseValue': value})
-
-    session.commit()
-    session.close()
-    engine.dispose()
-
-
-def update_startup_values(edited_rows):
-
-    engine = create_engine(st.secrets.db_details.db_path)
-    Base.metadata.create_all(bind=engine)
-    Session = sessionmaker()
-    Session.configure(bind=engine)
-    session = Session()
-
-    for row in edited_rows.keys():
-
-        for irl, value in edited_rows[row].items():
-
-            session.query(IRL).filter(IRL.Level == row+1,
-                                      IRL.IRLType == irl).\
-                update({'StartupValue': value})
-
-    session.commit()
-    session.close()
-    engine.dispose()
-
-
-"""
-User methods.
-"""
-
-
-def add_user(new_user, password):
-    """
-
-    Parameters
-    ----------
-    username : TYPE
-        DESCRIPTION.
-    password : TYPE
-        DESCRIPTION.
-    rights : TYPE
-        DESCRIPTION.
-
-    Returns
-    -------
-    bool
-        DESCRIPTION.
-
-    """
-    engine = create_engine(st.secrets.db_details.db_path)
-    Base.metadata.create_all(bind=engine)
-    Session = sessionmaker(bind=engine)
-    session = Session()
-    password = password.encode('utf-8')
-    salt = bcrypt.gensalt()
-    hashed_password = bcrypt.hashpw(password, salt).decode('utf-8')
-
-    # Check if user doesn't already exist.
-    exists = session.query(User).filter_by(username=new_user.username).first()
-
-    if exists:
-
-        return None
-
-    else:
-
-        new_user.password = hashed_password
-        session.add(new_user)
-        session.commit()
-        new_user = session.query(User).filter(
-            User.username == new_user.username).first()
-        new_user_settings = UserSettings(user_id=new_user.user_id,
-                                         smooth_irl=1,
-                                         filter_on_user=1,
-                                         remember_project=1,
-                                         ascending_irl=1,
-                                         ap_table_view=0,
-                                         dark_mode=1)
-        session.add(new_user_settings)
-        session.commit()
-        session.refresh(new_user)
-        session.close()
-        engine.dispose()
-
-        return new_user
-
-
-def get_users(active=True, org_id=None):
-    """
-    Fetch a list of users from the database.
-
-    Parameters
-    ----------
-    active : TYPE, optional
-        DESCRIPTION. The default is True.
-    org_id : Integer, optional
-        If not None, returns only users belonging to the organisation with the
-        given org_id. The default is None.
-
-    Returns
-    -------
-    users : List of User
-        DESCRIPTION.
-
-    """
-    active = int(active)
-    engine = create_engine(st.secrets.db_details.db_path)
-    Base.metadata.create_all(bind=engine)
-    Session = sessionmaker(bind=engine)
-    session = Session()
-
-    if org_id is None:
-
-        users = session.query(User).filter(User.active == int(active)).all()
-
-    else:
-
-        users = session.query(User).filter(
-            (User.active == active) &
-            (User.org_id == org_id)).all()
-
-    session.close()
-    engine.dispose()
-
-    return users
-
-
-def get_user_id(username):
-    """
-    Get the user ID of a specific username.
-
-    Parameters
-    ----------
-    username : string
-        DESCRIPTION.
-
-    Returns
-    -------
-    user_id : integer
-        DESCRIPTION.
-
-    """
-
-    engine = create_engine(st.secrets.db_details.db_path)
-    Base.metadata.create_all(bind=engine)
-    Session = sessionmaker(bind=engine)
-    session = Session()
-
-    user_id = None
-    db_user = session.query(User).filter(User.username == username).first()
-
-    if db_user is not None:
-
-        user_id = db_user.user_id
-
-    session.close()
-    engine.dispose()
-
-    return user_id
-
-
-def validate_user(user, password):
-    """
-
-    Parameters
-    ----------
-    user : TYPE
-        DESCRIPTION.
-    password : TYPE
-        DESCRIPTION.
-
-    Returns
-    -------
-    db_user : TYPE
-        DESCRIPTION.
-
-    """
-
-    engine = create_engine(st.secrets.db_details.db_path)
-    Base.metadata.create_all(bind=engine)
-    Session = sessionmaker(bind=engine)
-    session = Session()
-
-    password = password.encode('utf-8')
-    db_user = session.query(User).filter(User.username == user).first()
-    verified = (db_user and bcrypt.checkpw(
-        password, db_user.password.encode('utf-8')))
-    session.close()
-    engine.dispose()
-
-    if not verified:
-
-        db_user = None
-
-    return db_user
-
-
-def change_user_password(user, password):
-    """
-    Change user password.
-
-    Parameters
-    ----------
-    user : base.User
-        DESCRIPTION.
-    password : string
-        DESCRIPTION.
-
-    Returns
-    -------
-    bool
-        True if change was successful, false if not.
-
-    """
-
-    engine = create_engine(st.secrets.db_details.db_path)
-    Base.metadata.create_all(bind=engine)
-    Session = sessionmaker(bind=engine)
-    session = Session()
-
-    password = password.encode('utf-8')
-    salt = bcrypt.gensalt()
-    hashed_password = bcrypt.hashpw(password, salt).decode('utf-8')
-    stmt = (update(User).where(
-        User.user_id == user.user_id).values(password=hashed_password))
-
-    try:
-
-        session.execute(stmt)
-        success = True
-
-    except BaseException:
-
-        success = False
-
-    session.commit()
-    session.close()
-    engine.dispose()
-
-    return success
-
-
-def change_user_status(users, active):
-    """
-    Change user status.
-
-    Parameters
-    ----------
-    users : list of user names
-        List of users to update.
-    active : bool
-        Set user active status. We don't delete users for historical resasons.
-
-    Returns
-    -------
-    bool
-        True if change was successful, false if not.
-
-    """
-
-    active = int(active)
-    engine = create_engine(st.secrets.db_details.db_path)
-    Base.metadata.create_all(bind=engine)
-    Session = sessionmaker(bind=engine)
-    session = Session()
-
-    try:
-
-        session.query(User).filter(
-            User.username.in_(users)).update({'active': active})
-        success = True
-
-    except BaseException:
-
-        success = False
-
-    session.commit()
-    session.close()
-    engine.dispose()
-
-    return success
-
-
-def get_user(username):
-    """
-
-    Parameters
-    ----------
-    username : string
-        Must be a valid username.
-
-    Returns
-    -------
-    user : base.User
-        DESCRIPTION.
-
-    """
-    engine = create_engine(st.secrets.db_details.db_path)
-    Base.metadata.create_all(bind=engine)
-    Session = sessionmaker(bind=engine)
-    session = Session()
-    user = session.query(User).filter(User.username == username).first()
-    session.close()
-    engine.dispose()
-
-    return user
-
-
-def get_user_settings(user_id):
-    """
-
-
-    Parameters
-    ----------
-    user : TYPE
-        DESCRIPTION.
-
-    Returns
-    -------
-    user_settings : TYPE
-        DESCRIPTION.
-
-    """
-
-    engine = create_engine(st.secrets.db_details.db_path)
-    Base.metadata.create_all(bind=engine)
-    Session = sessionmaker(bind=engine)
-    session = Session()
-    user_settings = session.query(
-        UserSettings).filter(UserSettings.user_id == user_id).first()
-    session.close()
-    engine.dispose()
-
-    return user_settings
-
-
-"""
-System settings methods.
-"""
-
-
-def get_system_settings():
-    """
-    Convenience method for grabbing system settings from DB.
-
-    Parameters
-    ----------
-    None
-
-    Returns
-    -------
-    irl_table : Pandas DataFrame
-        DESCRIPTION.
-
-    """
-    engine = create_engine(st.secrets.db_details.db_path)
-    Base.metadata.create_all(bind=engine)
-    Session = sessionmaker(bind=engine)
-    session = Session()
-    sys_settings = session.query(
-        SystemSettings).filter(SystemSettings.id == 1).first()
-    session.close()
-    engine.dispose()
-
-    return sys_settings
-
-
-"""
-Project methods.
-"""
-
-
-def change_project_status(projects, active):
-    """
-    Change project status.
-
-    Parameters
-    ----------
-    users : list of IRLAssessment
-        List of projects to update.
-    active : bool
-        Set project active status.
-        We don't delete projects for historical resasons.
-
-    Returns
-    -------
-    bool
-        True if change was successful, false if not.
-
-    """
-
-    active = int(active)
-    engine = create_engine(st.secrets.db_details.db_path)
-    Base.metadata.create_all(bind=engine)
-    Session = sessionmaker(bind=engine)
-    session = Session()
-    project_nos = [p.project_no for p in projects]
-
-    try:
-
-        session.query(IRLAssessment).filter(
-            IRLAssessment.project_no.in_(
-                project_nos)).update({'active': active})
-        success = True
-
-    except BaseException:
-
-        success = False
-
-    session.commit()
-    session.close()
-    engine.dispose()
-
-    return success
-
-
-def get_projects(user, filt=True, active=True):
-    """
-    Fetch IRL data from the database.
-    
-
-    Parameters
-    ----------
-    user : User
-        The current user.
-    filt : Bool, optional
-        If True, will only display the projects the user is project leader on.
-        If False, will display all projects where the user is part of the
-        project team for access levels 0-3.
-        For access level 8 (SuperUser) all projects for this SuperUser's
-        organisation will be returned.
-        For access level 9 (Administrator), all projects will be returned.
-        The default is True.
-    active : Bool, optional
-        If True, returns only active projects.
-        If False, returns only inactive projects.
-        The default is True.
-
-    Returns
-    -------
-    List of IRLData objects.
-
-    """
-
-    engine = create_engine(st.secrets.db_details.db_path)
-    Base.metadata.create_all(bind=engine)
-    Session = sessionmaker(bind=engine)
-    session = Session()
-    active = int(active)
-
-    if filt:
-
-        irl_data = session.query(IRLAssessment).order_by(
-            func.max(IRLAssessment.assessment_date)).group_by(
-                IRLAssessment.project_no).filter(
-                    (IRLAssessment.project_leader_id == user.user_id) &
-                    (IRLAssessment.active == active)).all()
-
-    else:
-
-        if user.rights == 9:
-
-            irl_data = session.query(IRLAssessment).order_by(
-                func.max(IRLAssessment.assessment_date)).group_by(
-                    IRLAssessment.project_no).where(
-                        IRLAssessment.active == active).all()
-
-        elif user.rights == 8:
-
-            users = get_users(True, org_id=user.org_id)
-            user_ids = [user.user_id for user in users]
-            irl_data = session.query(IRLAssessment).order_by(
-                func.max(IRLAssessment.assessment_date)).group_by(
-                    IRLAssessment.project_no).filter(
-                        (IRLAssessment.project_leader_id.in_(user_ids) &
-                            (IRLAssessment.active == active))).all()
-
-        elif user.rights <= 3:
-
-            irl_data = session.query(IRLAssessment).order_by(
-                func.max(IRLAssessment.assessment_date)).group_by(
-                    IRLAssessment.project_no).filter(
-                        (ProjectTeam.user_id == user.user_id) &
-                        (ProjectTeam.active == 1) &
-                        (IRLAssessment.project_no == ProjectTeam.project_id) &
-                        (IRLAssessment.active == active)).all()
-
-    session.close()
-    engine.dispose()
-
-    return irl_data
-
-
-def get_project_history(project_id):
-    """
-    Get IRL assessments for all projects.
-    If user is specified, returns only projects where the specified user is
-    project leader.
-    """
-
-    engine = create_engine(st.secrets.db_details.db_path)
-    Base.metadata.create_all(bind=engine)
-    Session = sessionmaker(bind=engine)
-    session = Session()
-
-    irl_data = session.query(IRLAssessment).order_by(
-            IRLAssessment.assessment_date).where(
-                    IRLAssessment.project_no == project_id).all()
-
-    session.close()
-    engine.dispose()
-
-    return irl_data
-
-
-def get_project_rights(project_id, user_id):
-
-    engine = create_engine(st.secrets.db_details.db_path)
-    Base.metadata.create_all(bind=engine)
-    Session = sessionmaker(bind=engine)
-    session = Session()
-    rights = session.query(ProjectTeam).where(
-                    (ProjectTeam.project_id == project_id) &
-                    (ProjectTeam.user_id == user_id)).first()
-    session.close()
-    engine.dispose()
-
-    if rights is None:
-
-        return 1
-
-    else:
-
-        return rights.project_rights
-
-
-def get_project_team(project_id, active=True):
-    """
-    Convenience method for fetching the project team.
-
-    Parameters
-    ----------
-    project_id : integer
-        The unique project id from the database.
-    active : bool, optional
-        If True, only returns active project members.
-        If False, will return all members that have been part of the project
-        team at any point in its history.
-        The default is True.
-
-    Returns
-    -------
-    team_df : Pandas DataFrame
-        DESCRIPTION.
-
-    """
-
-    engine = create_engine(st.secrets.db_details.db_path)
-    Base.metadata.create_all(bind=engine)
-    Session = sessionmaker(bind=engine)
-    session = Session()
-
-    if active is True:
-
-        team = session.query(ProjectTeam).order_by(
-                ProjectTeam.user_id).where(
-                        (ProjectTeam.project_id == project_id) &
-                        (ProjectTeam.user_id == User.user_id) &
-                        (ProjectTeam.active == active)).all()
-
-    else:
-
-        team = session.query(ProjectTeam).order_by(
-                ProjectTeam.user_id).where(
-                        (ProjectTeam.project_id == project_id) &
-                        (ProjectTeam.user_id == User.user_id)).all()
-
-    members = []
-    user_objs = []
-
-    for member in team:
-
-        # This is hackish and the order matters as we have the active flag
-        # for both users and team members. The latter overwrites the former.
-        row = member.user.to_dict()
-        row.update(member.to_dict())
-        members.append(row)
-        user_objs.append(member.user)
-
-    team_df = pd.DataFrame(members)
-    team_df['team_obj'] = team
-    team_df['user_obj'] = user_objs
-    session.close()
-    engine.dispose()
-
-    return team_df
-
-
-def is_project(project_no):
-
-    engine = create_engine(st.secrets.db_details.db_path)
-    Base.metadata.create_all(bind=engine)
-    Session = sessionmaker(bind=engine)
-    session = Session()
-    exists = session.query(IRLAssessment).filter_by(
-        project_no=project_no).first()
-    session.close()
-    engine.dispose()
-
-    if exists:
-
-        return True
-
-    else:
-
-        return False
-
-
-def get_orgs():
-    """
-    Return all active organisations in the database.
-    TODO: Implement active
-
-    Returns
-    -------
-    orgs : TYPE
-        DESCRIPTION.
-
-    """
-    engine = create_engine(st.secrets.db_details.db_path)
-    Base.metadata.create_all(bind=engine)
-    Session = sessionmaker(bind=engine)
-    session = Session()
-
-    orgs = session.query(Organisation).order_by(
-        Organisation.org_name).where(
-            Organisation.active == 1).all()
-    session.close()
-    engine.dispose()
-
-    return orgs
-
-
-def get_facs(org):
-    """
-    Return all active organisations in the database.
-
-    Returns
-    -------
-    orgs : TYPE
-        DESCRIPTION.
-
-    """
-    engine = create_engine(st.secrets.db_details.db_path)
-    Base.metadata.create_all(bind=engine)
-    Session = sessionmaker(bind=engine)
-    session = Session()
-
-    facs = session.query(Faculty).order_by(
-        Faculty.fac_name).where(
-            Faculty.org_id == org.org_id,
-            Faculty.active == 1).all()
-    session.close()
-    engine.dispose()
-
-    return facs
-
-
-def get_deps(fac):
-    """
-    Return all active organisations in the database.
-
-    Returns
-    -------
-    orgs : TYPE
-        DESCRIPTION.
-
-    """
-    engine = create_engine(st.secrets.db_details.db_path)
-    Base.metadata.create_all(bind=engine)
-    Session = sessionmaker(bind=engine)
-    session = Session()
-
-    deps = session.query(Department).order_by(
-        Department.dep_name).where(
-            Department.fac_id == fac.fac_id,
-            Department.active == 1).all()
-    session.close()
-    engine.dispose()
-
-    return deps
-
-
-def get_permission_levels(user=None):
-    """
-    Get a list of all permission leveles in the database.
-
-    Returns
-    -------
-    list : PermissionLevel
-        DESCRIPTION.
-
-    """
-    engine = create_engine(st.secrets.db_details.db_path)
-    Base.metadata.create_all(bind=engine)
-    Session = sessionmaker(bind=engine)
-    session = Session()
-
-    if user is None:
-
-        pls = session.query(PermissionLevel).all()
-
-    else:
-
-        pls = session.query(PermissionLevel).where(
-            PermissionLevel.level <= user.rights).all()
-
-    session.close()
-    engine.dispose()
-
-    return pls
-
-
-def get_permission_level_map():
-    """
-    Get a mapping from permission level texts to permission level ids.
-    This is needed because I can't find a way to use the PermissionLevel
-    object inside st.selectbox in st.data_editor. It is probably feasible,
-    which would be ideal, but I don't know how to do it right now.
-
-    Returns
-    -------
-    pm_map : dict
-        Dictionary with permission level labels as keys and level ID as values.
-
-    """
-    engine = create_engine(st.secrets.db_details.db_path)
-    Base.metadata.create_all(bind=engine)
-    Session = sessionmaker(bind=engine)
-    session = Session()
-    pms = session.query(PermissionLevel).all()
-    session.close()
-    engine.dispose()
-    pm_map = {}
-
-    for pm in pms:
-
-        pm_map[pm.level_text] = pm.level
-
-    return pm_map
-
-
-def add_project_team(project_no, team):
-
-    engine = create_engine(st.secrets.db_details.db_path)
-    Base.metadata.create_all(bind=engine)
-    Session = sessionmaker()
-    Session.configure(bind=engine)
-    session = Session()
-
-    for user in team:
-
-        team_member = ProjectTeam()
-        team_member.project_id = project_no
-        team_member.user_id = user.user_id
-        team_member.project_rights = user.rights
-        team_member.active = 1
-        session.add(team_member)
-
-    session.commit()
-
-    session.close()
-    engine.dispose()
-
-
-""" Organisation, department and faculty methods."""
-
-
-def add_org(org_name):
-
-    engine = create_engine(st.secrets.db_details.db_path)
-    Base.metadata.create_all(bind=engine)
-    Session = sessionmaker()
-    Session.configure(bind=engine)
-    session = Session()
-    new_org = Organisation()
-    new_org.org_name = org_name
-    new_org.active = True
-    session.add(new_org)
-    session.commit()
-    new_org = session.query(Organisation).filter(
-        Organisation.org_name == org_name).first()
-    session.close()
-    engine.dispose()
-
-    return new_org.org_id
-
-
-def add_fac(org_id, fac_name):
-
-    engine = create_engine(st.secrets.db_details.db_path)
-    Base.metadata.create_all(bind=engine)
-    Session = sessionmaker()
-    Session.configure(bind=engine)
-    session = Session()
-    new_fac = Faculty()
-    new_fac.org_id = org_id
-    new_fac.fac_name = fac_name
-    new_fac.active = True
-    session.add(new_fac)
-    session.commit()
-    new_fac = session.query(Faculty).filter(
-        (Faculty.org_id == org_id) & (Faculty.fac_name == fac_name)).first()
-    session.close()
-    engine.dispose()
-
-    return new_fac.fac_id
-
-
-def add_dep(fac_id, dep_name):
-
-    engine = create_engine(st.secrets.db_details.db_path)
-    Base.metadata.create_all(bind=engine)
-    Session = sessionmaker()
-    Session.configure(bind=engine)
-    session = Session()
-    new_dep = Department()
-    new_dep.fac_id = fac_id
-    new_dep.dep_name = dep_name
-    new_dep.active = True
-    session.add(new_dep)
-    session.commit()
-    new_dep = session.query(Department).filter(
-        (Department.fac_id == fac_id) &
-        (Department.dep_name == dep_name)).first()
-    session.close()
-    engine.dispose()
-
-    return new_dep.dep_id
-
-
-"""
-Action points methods.
-"""
-
-
-def get_ap(ap_id):
-    """
-    Get the action point object corresponding to the action point id.
-
-    Parameters
-    ----------
-    ap_id : Integer
-        Unique action point database ID.
-
-    Returns
-    -------
-    ap : ActionPoint
-        DESCRIPTION.
-
-    """
-    engine = create_engine(st.secrets.db_details.db_path)
-    Base.metadata.create_all(bind=engine)
-    Session = sessionmaker(bind=engine)
-    session = Session()
-    ap = session.query(ActionPoint).filter(ActionPoint.ap_id == ap_id).first()
-    session.close()
-    engine.dispose()
-
-    return ap
-
-
-def get_action_points(irl_ass_id, irl_type=None):
-    """
-    Get all action points related to the project IRL assessment.
-
-    Parameters
-    ----------
-    irl_ass_id : Integer
-        IRL Assessment ID
-    irl_type : String, optional
-        If specified returns only action points for the indicated IRL type.
-        Valid values are CRL, TRL, BRL, IPRL, TMRL, FRL.
-        The default is None.
-
-    Returns
-    -------
-    aps_df : Pandas DataFrame
-        Pandas DataFrame containing all action points.
-        If no action points exists, returns empty dataframe with correct
-        columns.
-    """
-    if irl_type is not None:
-
-        assert irl_type in ('CRL', 'TRL', 'BRL', 'IPRL', 'TMRL', 'FRL')
-
-    engine = create_engine(st.secrets.db_details.db_path)
-    Base.metadata.create_all(bind=engine)
-    Session = sessionmaker(bind=engine)
-    session = Session()
-
-    if irl_type is None:
-
-        aps = session.query(ActionPoint).filter(
-            ActionPoint.assessment_id == irl_ass_id).all()
-
-    else:
-
-        aps = session.query(ActionPoint).filter(
-            (ActionPoint.assessment_id == irl_ass_id) &
-            (ActionPoint.irl_type == irl_type)).all()
-
-    points = []
-    user_objs = []
-
-    for ap in aps:
-
-        # This is hackish and the order matters as we have the active flag
-        # for both users and team members. The latter overwrites the former.
-        row = ap.user.to_dict()
-        row.update(ap.to_dict())
-        points.append(row)
-        user_objs.append(ap.user)
-
-    aps_df = pd.DataFrame(points)
-
-    if len(points) > 0:
-
-        aps_df['aps'] = points
-        aps_df['user_obj'] = user_objs
-        aps_df['due_date'] = utils.dbdates2datetimes(aps_df['due_date'])
-
-    session.close()
-    engine.dispose()
-
-    # If no action points exists, return empty dataframe but with correct cols.
-    if len(aps_df.index) == 0:
-
-        columns = ['user_id', 'actual_name', 'username', 'password', 'rights',
-                   'active', 'org_id', 'fac_id', 'dep_id', 'id',
-                   'assessment_id', 'irl_type', 'action_point', 'responsible',
-                   'due_date', 'progress', 'comment', 'aps', 'user_obj']
-        aps_df = pd.DataFrame(columns=columns)
-
-    return aps_df
-
-
-def ap_completed(irl_ass_id):
-
-    engine = create_engine(st.secrets.db_details.db_path)
-    Base.metadata.create_all(bind=engine)
-    Session = sessionmaker(bind=engine)
-    session = Session()
-
-    aps = session.query(ActionPoint).filter(
-            ActionPoint.assessment_id == irl_ass_id).all()
-    completion = session.query(func.sum(ActionPoint.progress)).filter(
-                (ActionPoint.assessment_id == irl_ass_id)).scalar()
-    session.close()
-    engine.dispose()
-
-    completed = (len(aps)*100 == completion) or (len(aps) == 0)
-
-    return completed
-
-
-def copy_aps(old_ass_id, new_ass_id):
-    """
-    Copy unfinished action points from an old assessment to a new one.
-
-    Parameters
-    ----------
-    old_ass_id : TYPE
-        DESCRIPTION.
-    new_ass_id : TYPE
-        DESCRIPTION.
-
-    Returns
-    -------
-    None.
-
-    """
-
-    old_aps = get_action_points(old_ass_id)
-
-    for old_ap in old_aps:
-
-        old_ap.copy(new_ass_id)
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) Lodve Berre and NTNU Technology Transfer AS 2024.
+
+This file is part of Really Nice IRL.
+
+Really Nice IRL is free software: you can redistribute it and/or modify it
+under the terms of the GNU Affero General Public License as published by the
+Free Software Foundation, either version 3 of the License, or (at your option)
+ any later version.
+
+Really Nice IRL is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with Really Nice IRL. If not, see:
+<https://www.gnu.org/licenses/agpl-3.0.html>.
+"""
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from sqlalchemy import create_engine, func, Column, Integer, Text
+from sqlalchemy import event, insert, literal, select, text, update
+from sqlalchemy import ForeignKey
+from sqlalchemy.orm import declarative_base, sessionmaker, mapped_column
+from sqlalchemy.orm import scoped_session, Session
+from sqlalchemy.orm.attributes import InstrumentedAttribute
+from sqlalchemy.orm import relationship
+from sqlalchemy.pool import QueuePool
+
+import bcrypt
+import bisect
+import functools
+import numpy as np
+import threading
+import time
+import pandas as pd
+import streamlit as st
+
+import migrations
+
+Base = declarative_base()
+
+rights_map = {"Read Only": 0,
+              "Read/Write": 1,
+              "Read/Write/Create": 2,
+              "Administrator": 9}
+
+
+class SerializerMixin:
+    """
+    This class is used to make other classes iterable and enable easy
+    conversion from database queries to Pandas Dataframes via dictionaries.
+    """
+
+    def __init__(self, data):
+
+        for field in self.__table__.columns:
+
+            if getattr(field, 'name'):
+                setattr(self, field.name, data[field.name])
+
+    def as_dict(self):
+        return {column.name: getattr(self, column.name)
+                for column in self.__table__.columns}
+
+    def to_dict(self):
+        return {column.name: getattr(self, column.name)
+                for column in self.__table__.columns}
+
+
+class IRL(Base, SerializerMixin):
+    """
+    Wrapper class around IRL texts and values in the database.
+    """
+
+    __tablename__ = 'IRL'
+
+    Level = Column(Integer, primary_key=True)
+    IRLType = Column(Text(3))
+    Description = Column(Text)
+    Aspects = Column(Text)
+    StartupValue = Column(Integer)
+    LicenseValue = Column(Integer)
+
+
+class IRLAssessment(Base, SerializerMixin):
+    """
+    Wrapper class around the IRL Data table in the database.
+    Contains all the historical assessment values for all projects.
+    """
+
+    __tablename__ = 'IRL Data'
+
+    id = Column(Integer, primary_key=True)
+    project_no = Column(Integer)
+    project_name = Column(Text)
+    project_leader_id = mapped_column(ForeignKey('Users.user_id'))
+    assessment_date = Column(Text(10))
+    crl = Column(Integer)
+    trl = Column(Integer)
+    brl = Column(Integer)
+    iprl = Column(Integer)
+    tmrl = Column(Integer)
+    frl = Column(Integer)
+    crl_notes = Column(Text)
+    trl_notes = Column(Text)
+    brl_notes = Column(Text)
+    iprl_notes = Column(Text)
+    tmrl_notes = Column(Text)
+    frl_notes = Column(Text)
+    crl_target = Column(Integer)
+    trl_target = Column(Integer)
+    brl_target = Column(Integer)
+    iprl_target = Column(Integer)
+    tmrl_target = Column(Integer)
+    frl_target = Column(Integer)
+    crl_target_lead = Column(Text(64))
+    trl_target_lead = Column(Text(64))
+    brl_target_lead = Column(Text(64))
+    iprl_target_lead = Column(Text(64))
+    tmrl_target_lead = Column(Text(64))
+    frl_target_lead = Column(Text(64))
+    crl_target_duedate = Column(Text(10))
+    trl_target_duedate = Column(Text(10))
+    brl_target_duedate = Column(Text(10))
+    iprl_target_duedate = Column(Text(10))
+    tmrl_target_duedate = Column(Text(10))
+    frl_target_duedate = Column(Text(10))
+    plot_targets = Column(Integer)
+    active = Column(Integer)
+
+    def __str__(self):
+        return str(self.project_no) + " " + str(self.project_name)
+
+    def __repr__(self):
+        return str(self.project_no) + " " + str(self.project_name)
+
+    def _getDate(self):
+        """
+        Convenience method to convert from datetime.date to ISO standard
+        date string which we store in the database.
+
+        Returns
+        -------
+        date : str
+            ISO standard date (YYYY-MM-DD).
+        """
+
+        date = datetime.now()
+        date = '%d-%02d-%02d' % (date.year, date.month, date.day)
+
+        return date
+
+    def levels(self, target=False):
+        """
+        The six IRL levels of the assessment, in CRL, TRL, BRL, IPRL, TMRL,
+        FRL order.
+
+        Parameters
+        ----------
+        target : bool, optional
+            If True, returns the target levels instead. The default is False.
+
+        Returns
+        -------
+        list of int
+
+        """
+        suffix = '_target' if target else ''
+
+        return [getattr(self, irl_type.lower() + suffix)
+                for irl_type in IRL_TYPES]
+
+    def calc_license_value(self):
+        """
+        Method to calculate ballpark license value based on IRL levels and
+        the corresponding values in the database.
+        WARNING: NOT CALIBRATED OUT OF THE BOX!
+        VALUES MUST BE SET ACCORDING TO LOCAL CURRENCY AND EXPERIENCE!
+
+        Returns
+        -------
+        value : int
+             Sum of license values set in database for the IRL.
+        """
+
+        return int(calc_values([self], 'LicenseValue')[0])
+
+    def calc_license_target_value(self):
+        """
+        Method to calculate ballpark license value based on IRL levels and
+        the corresponding target values in the database.
+        WARNING: NOT CALIBRATED OUT OF THE BOX!
+        VALUES MUST BE SET ACCORDING TO LOCAL CURRENCY AND EXPERIENCE!
+
+        Returns
+        -------
+        value : int
+             Sum of license values set in database for the target IRL.
+        """
+
+        return int(calc_values([self], 'LicenseValue', True)[0])
+
+    def calc_startup_value(self):
+
+        return int(calc_values([self], 'StartupValue')[0])
+
+    def calc_startup_target_value(self):
+
+        return int(calc_values([self], 'StartupValue', True)[0])
+
+    def insert(self):
+
+        self.assessment_date = self._getDate()
+
+        with session_scope() as session:
+
+            exists = (session.query(IRLAssessment).filter(
+                IRLAssessment.project_no == self.project_no).first()
+                is not None)
+            error = None
+
+            if exists:
+
+                error = "Project already exists in the database!"
+
+            else:
+
+                session.add(self)
+                session.flush()
+                LatestAssessment.set_latest(session, self)
+
+        return error
+
+    def update(self, overwrite=False, keep_aps=False):
+        """
+        Save the assessment. Overwrites the stored assessment if it is from
+        today, otherwise saves a new revision.
+
+        Parameters
+        ----------
+        overwrite : bool, optional
+            If True, always overwrite the stored assessment.
+            The default is False.
+        keep_aps : bool, optional
+            If True and a new revision is saved, unfinished action points
+            are copied to it in the same transaction. The default is False.
+
+        Returns
+        -------
+        int
+            ID of the saved assessment.
+
+        """
+
+        with session_scope() as session:
+
+            mapped_values = {}
+            date = self._getDate()
+
+            # If the date on record is today, we overwrite.
+            if overwrite or date == self.assessment_date:
+
+                for item in IRLAssessment.__dict__.items():
+
+                    field_name = item[0]
+                    field_type = item[1]
+                    is_column = isinstance(field_type, InstrumentedAttribute)
+
+                    if is_column:
+
+                        mapped_values[field_name] = getattr(self, field_name)
+
+                session.query(IRLAssessment).filter(
+                    IRLAssessment.id == self.id).update(mapped_values)
+                LatestAssessment.set_latest(session, self)
+
+            # If not, we insert a new assessment and keep the historical one.
+            else:
+
+                # This is probably not the best way to do this.
+                # But hey, it works.
+                new_irl = IRLAssessment()
+                new_irl.project_no = self.project_no
+                new_irl.project_name = self.project_name
+                new_irl.project_leader_id = self.project_leader_id
+                new_irl.assessment_date = date
+                new_irl.crl = self.crl
+                new_irl.trl = self.trl
+                new_irl.brl = self.brl
+                new_irl.iprl = self.iprl
+                new_irl.tmrl = self.tmrl
+                new_irl.frl = self.frl
+                new_irl.crl_notes = self.crl_notes
+                new_irl.trl_notes = self.trl_notes
+                new_irl.brl_notes = self.brl_notes
+                new_irl.iprl_notes = self.iprl_notes
+                new_irl.tmrl_notes = self.tmrl_notes
+                new_irl.frl_notes = self.frl_notes
+                new_irl.crl_target = self.crl_target
+                new_irl.trl_target = self.trl_target
+                new_irl.brl_target = self.brl_target
+                new_irl.iprl_target = self.iprl_target
+                new_irl.tmrl_target = self.tmrl_target
+                new_irl.frl_target = self.frl_target
+                new_irl.crl_target_lead = self.crl_target_lead
+                new_irl.trl_target_lead = self.trl_target_lead
+                new_irl.brl_target_lead = self.brl_target_lead
+                new_irl.iprl_target_lead = self.iprl_target_lead
+                new_irl.tmrl_target_lead = self.tmrl_target_lead
+                new_irl.frl_target_lead = self.frl_target_lead
+                new_irl.crl_target_duedate = self.crl_target_duedate
+                new_irl.trl_target_duedate = self.trl_target_duedate
+                new_irl.brl_target_duedate = self.brl_target_duedate
+                new_irl.iprl_target_duedate = self.iprl_target_duedate
+                new_irl.tmrl_target_duedate = self.tmrl_target_duedate
+                new_irl.frl_target_duedate = self.frl_target_duedate
+                new_irl.plot_targets = self.plot_targets
+                new_irl.active = self.active
+
+                session.add(new_irl)
+                session.flush()
+                LatestAssessment.set_latest(session, new_irl)
+
+                if keep_aps:
+
+                    copy_aps(self.id, new_irl.id)
+
+                return new_irl.id
+
+        return self.id
+
+    def __eq__(self, other):
+
+        if isinstance(other, IRLAssessment):
+
+            if other.id == self.id:
+
+                return True
+
+        return False
+
+
+class User(Base, SerializerMixin):
+    """
+    Rights: 0: read-only, #1: read/write, #2, read/write/create, #9: admin
+    Active: # 0: inactive, #1: active
+    """
+    __tablename__ = 'Users'
+
+    user_id = Column(Integer, primary_key=True)
+    actual_name = Column(Text)
+    username = Column(Text(100), unique=True)
+    password = Column(Text(100))
+    rights = Column(Integer)
+    active = Column(Integer)
+    org_id = Column(Integer)
+    fac_id = Column(Integer)
+    dep_id = Column(Integer)
+
+    def __hash__(self):
+        return int(self.user_id)
+
+    def __str__(self):
+        return str(self.actual_name) + " (" + self.username + ")"
+
+    def __repr__(self):
+        return str(self.actual_name) + " (" + self.username + ")"
+
+
+class UserSettings(Base):
+
+    __tablename__ = 'User Settings'
+
+    id = Column(Integer, primary_key=True)
+    user_id = mapped_column(ForeignKey('Users.user_id'))
+    smooth_irl = Column(Integer)
+    filter_on_user = Column(Integer)
+    remember_project = Column(Integer)
+    last_project_no = Column(Integer)
+    ascending_irl = Column(Integer)
+    ap_table_view = Column(Integer)
+    dark_mode = Column(Integer)
+    interactive_irl = Column(Integer)
+
+    def update(self):
+
+        with session_scope() as session:
+
+            mapped_values = {}
+
+            for item in UserSettings.__dict__.items():
+
+                field_name = item[0]
+                field_type = item[1]
+                is_column = isinstance(field_type, InstrumentedAttribute)
+
+                if is_column:
+
+                    mapped_values[field_name] = getattr(self, field_name)
+
+            session.query(UserSettings).filter(UserSettings.id == self.id).\
+                update(mapped_values)
+
+
+class SystemSettings(Base):
+
+    __tablename__ = 'System Settings'
+
+    id = Column(Integer, primary_key=True)
+    logo_uri = Column(Text)
+    logo_uri_dark = Column(Text)
+    logo_uri_light = Column(Text)
+    force_email_users = Column(Integer)
+    owner_org_id = mapped_column(ForeignKey('Organisations.org_id'))
+
+    def update(self):
+
+        with session_scope() as session:
+
+            mapped_values = {}
+
+            for item in SystemSettings.__dict__.items():
+
+                field_name = item[0]
+                field_type = item[1]
+                is_column = isinstance(field_type, InstrumentedAttribute)
+
+                if is_column:
+
+                    mapped_values[field_name] = getattr(self, field_name)
+
+            session.query(SystemSettings).filter(
+                SystemSettings.id == self.id).update(mapped_values)
+
+
+class Organisation(Base):
+
+    __tablename__ = 'Organisations'
+
+    org_id = Column(Integer, primary_key=True)
+    org_name = Column(Text)
+    active = Column(Integer)
+
+    def __str__(self):
+        return self.org_name
+
+    def __repr__(self):
+        return self.org_name
+
+
+class Faculty(Base):
+
+    __tablename__ = 'Faculties'
+
+    fac_id = Column(Integer, primary_key=True)
+    fac_name = Column(Text)
+    org_id = mapped_column(ForeignKey('Organisations.org_id'))
+    active = Column(Integer)
+
+    def __str__(self):
+        return self.fac_name
+
+    def __repr__(self):
+        return self.fac_name
+
+
+class Department(Base):
+
+    __tablename__ = 'Departments'
+
+    dep_id = Column(Integer, primary_key=True)
+    dep_name = Column(Text)
+    fac_id = mapped_column(ForeignKey('Faculties.fac_id'))
+    active = Column(Integer)
+
+    def __str__(self):
+        return self.dep_name
+
+    def __repr__(self):
+        return self.dep_name
+
+
+class ProjectTeam(Base, SerializerMixin):
+
+    __tablename__ = "Project Teams"
+
+    id = Column(Integer, primary_key=True)
+    project_id = Column(Integer)
+    user_id = Column(Integer, ForeignKey('Users.user_id'))
+    project_rights = Column(Integer, ForeignKey('Permission Levels.level'))
+    active = Column(Integer)
+
+    user = relationship("User", backref="ProjectTeam")
+
+    def update(self):
+
+        with session_scope() as session:
+
+            uv = {'project_rights': self.project_rights, 'active': self.active}
+            session.query(ProjectTeam).filter(
+                   ProjectTeam.id == self.id).update(uv)
+
+    def __str__(self):
+        return self.user.actual_name
+
+    def __repr__(self):
+        return self.user.actual_name
+
+
+@dataclass
+class PermissionLevel(Base):
+
+    __tablename__ = "Permission Levels"
+
+    level = Column(Integer, primary_key=True)
+    level_text = Column(Text)
+
+    def __hash__(self):
+        return int(self.level)
+
+    def __repr__(self):
+
+        return self.level_text
+
+    def __str__(self):
+
+        return self.level_text
+
+
+class ActionPoint(Base, SerializerMixin):
+
+    __tablename__ = "Action Points"
+
+    ap_id = Column(Integer, primary_key=True)
+    assessment_id = Column(Integer, ForeignKey('IRL Data.id'))
+    irl_type = Column(Text(4))
+    action_point = Column(Text)
+    responsible = Column(Integer, ForeignKey('Users.user_id'))
+    due_date = Column(Text(10))
+    progress = Column(Integer)
+    comment = Column(Text)
+
+    user = relationship("User", backref="ActionPoint")
+
+    def copy(self, ass_id):
+        """
+        Makes a copy of the action point, but assigns it to a new assessment.
+
+        Parameters
+        ----------
+        ass_id : Integer
+            The IRL Assessment ID to attach the action point to.
+
+        Returns
+        -------
+        None.
+
+        """
+
+        new_self = ActionPoint()
+        new_self.assessment_id = ass_id
+        new_self.irl_type = self.irl_type
+        new_self.action_point = self.action_point
+        new_self.responsible = self.responsible
+        new_self.due_date = self.due_date
+        new_self.progress = self.progress
+        new_self.comment = self.comment
+        new_self.insert()
+
+    def insert(self):
+
+        with session_scope() as session:
+
+            session.add(self)
+
+    def update(self):
+
+        with session_scope() as session:
+
+            uv = {'action_point': self.action_point,
+                  'responsible': self.responsible,
+                  'due_date': self.due_date,
+                  'progress': self.progress,
+                  'comment': self.comment}
+            session.query(ActionPoint).filter(
+                    ActionPoint.ap_id == self.ap_id).update(uv)
+
+    def __repr__(self):
+
+        ap_txt = self.irl_type
+        ap_txt += " action point: " + self.action_point
+        ap_txt += "\tProgress: " + str(self.progress) + " %"
+        ap_txt += "\tDue date: " + self.due_date
+        ap_txt += "\tComment: " + self.comment
+        return ap_txt
+
+    def __str__(self):
+
+        return self.__repr__()
+
+
+class LatestAssessment(Base):
+    """
+    Projection of the newest IRL Data row for each project.
+    Kept up to date on write so project lists never touch the history.
+    Every write to the leader or status of an assessment must go through
+    set_latest, or project lists show stale values.
+    """
+
+    __tablename__ = "Latest Assessments"
+
+    project_no = Column(Integer, primary_key=True)
+    assessment_id = Column(Integer, ForeignKey('IRL Data.id'))
+    project_leader_id = Column(Integer, ForeignKey('Users.user_id'))
+    active = Column(Integer)
+
+    @staticmethod
+    def set_latest(session, irl_ass):
+        """
+        Point the project of an assessment at that assessment and copy its
+        leader and status, unless a newer revision is already the latest.
+
+        Parameters
+        ----------
+        session : sqlalchemy.orm.Session
+            Session to write in, so the change commits with the assessment.
+        irl_ass : IRLAssessment
+            A flushed assessment of the project.
+
+        Returns
+        -------
+        None.
+
+        """
+        latest = session.get(LatestAssessment, irl_ass.project_no)
+
+        if latest is not None and latest.assessment_id > irl_ass.id:
+
+            return
+
+        session.merge(LatestAssessment(
+            project_no=irl_ass.project_no,
+            assessment_id=irl_ass.id,
+            project_leader_id=irl_ass.project_leader_id,
+            active=irl_ass.active))
+
+
+"""
+Database engine and session methods.
+"""
+
+_engine = None
+_Session = None
+_engine_lock = threading.Lock()
+_pool_stats = {'connects': 0,
+               'checkouts': 0,
+               'checkins': 0,
+               'waits': 0,
+               'wait_time': 0.0,
+               'max_wait_time': 0.0,
+               'wal_checkpoints': 0}
+# Pool events fire on every Streamlit script thread.
+_pool_stats_lock = threading.Lock()
+
+# Default SQLite pragmas applied to every new connection. Any of them can be
+# overridden in the [sqlite_pragmas] section in secrets.toml.
+# busy_timeout goes first so that switching journal mode waits for locks.
+SQLITE_PRAGMAS = {'busy_timeout': 5000,
+                  'journal_mode': 'WAL',
+                  'synchronous': 'NORMAL',
+                  'cache_size': -20000,
+                  'mmap_size': 268435456,
+                  'temp_store': 'MEMORY'}
+_sqlite_pragmas = dict(SQLITE_PRAGMAS)
+_wal_checkpoint = {'interval': 300.0, 'last': 0.0}
+
+
+class TimedQueuePool(QueuePool):
+    """
+    QueuePool that records how long callers wait for a connection.
+    The wait time includes establishing a new connection when the pool has
+    none to spare, which is exactly the cost we want to keep an eye on.
+    """
+
+    def _do_get(self):
+
+        start = time.perf_counter()
+
+        try:
+
+            return super()._do_get()
+
+        finally:
+
+            wait = time.perf_counter() - start
+
+            with _pool_stats_lock:
+
+                _pool_stats['waits'] += 1
+                _pool_stats['wait_time'] += wait
+                _pool_stats['max_wait_time'] = max(
+                    _pool_stats['max_wait_time'], wait)
+
+
+def _on_connect(dbapi_connection, connection_record):
+
+    with _pool_stats_lock:
+
+        _pool_stats['connects'] += 1
+
+
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+
+    with _pool_stats_lock:
+
+        _pool_stats['checkouts'] += 1
+
+
+def _on_checkin(dbapi_connection, connection_record):
+
+    with _pool_stats_lock:
+
+        _pool_stats['checkins'] += 1
+
+
+def _on_sqlite_connect(dbapi_connection, connection_record):
+
+    cursor = dbapi_connection.cursor()
+
+    for name, value in _sqlite_pragmas.items():
+
+        cursor.execute("PRAGMA %s = %s" % (name, value))
+
+    cursor.close()
+
+
+def _on_sqlite_checkin(dbapi_connection, connection_record):
+    """
+    Run a passive WAL checkpoint at most once per interval.
+    Piggybacks on connections returned to the pool so we don't need a
+    separate maintenance thread.
+    """
+    interval = _wal_checkpoint['interval']
+
+    if dbapi_connection is None or interval <= 0:
+
+        return
+
+    now = time.monotonic()
+
+    # Claim the interval under the lock, so only one thread checkpoints.
+    with _pool_stats_lock:
+
+        if now - _wal_checkpoint['last'] < interval:
+
+            return
+
+        _wal_checkpoint['last'] = now
+        _pool_stats['wal_checkpoints'] += 1
+
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA wal_checkpoint(PASSIVE)")
+    cursor.close()
+
+
+def get_sqlite_pragmas():
+    """
+    Get the SQLite pragma profile, defaults merged with [sqlite_pragmas] in
+    secrets.toml.
+
+    Returns
+    -------
+    pragmas : dict
+        Pragma names and values in the order they are applied.
+
+    Raises
+    ------
+    ValueError
+        If secrets.toml names an unknown pragma, or gives a value that is
+        not a plain word or number.
+
+    """
+    pragmas = dict(SQLITE_PRAGMAS)
+
+    for name, value in st.secrets.get('sqlite_pragmas', {}).items():
+
+        # Pragmas are interpolated into SQL, so only allow known names and
+        # plain values.
+        if name not in SQLITE_PRAGMAS:
+
+            raise ValueError("Unknown SQLite pragma: %s" % name)
+
+        if not str(value).lstrip('-').isalnum():
+
+            raise ValueError("Invalid value for SQLite pragma %s: %r"
+                             % (name, value))
+
+        pragmas[name] = value
+
+    return pragmas
+
+
+def get_engine():
+    """
+    Get the process wide database engine, creating it on first use.
+    Pool settings are read from the [db_details] section in secrets.toml:
+    pool_size, max_overflow, pool_timeout and pool_recycle.
+    The schema is never changed here: deployments run
+    python migrations.py upgrade before starting the app, and an outdated
+    schema raises RuntimeError instead. Set auto_migrate = true to apply
+    pending migrations when the engine is created, e.g. for development.
+    For SQLite every new connection gets the pragma profile from
+    get_sqlite_pragmas(), and a passive WAL checkpoint is run every
+    wal_checkpoint_interval seconds (default 300, 0 disables).
+
+    Returns
+    -------
+    engine : sqlalchemy.engine.Engine
+        The shared engine.
+
+    """
+    global _engine, _Session, _sqlite_pragmas
+
+    if _engine is not None:
+
+        return _engine
+
+    with _engine_lock:
+
+        if _engine is None:
+
+            db_details = st.secrets.db_details
+            db_path = db_details.db_path
+            connect_args = {}
+
+            if db_path.startswith('sqlite'):
+
+                # Connections are shared between Streamlit script threads.
+                connect_args['check_same_thread'] = False
+
+            engine = create_engine(
+                db_path,
+                poolclass=TimedQueuePool,
+                pool_size=int(db_details.get('pool_size', 5)),
+                max_overflow=int(db_details.get('max_overflow', 10)),
+                pool_timeout=float(db_details.get('pool_timeout', 30)),
+                pool_recycle=int(db_details.get('pool_recycle', -1)),
+                pool_pre_ping=bool(db_details.get('pool_pre_ping', False)),
+                connect_args=connect_args)
+            event.listen(engine, 'connect', _on_connect)
+            event.listen(engine, 'checkout', _on_checkout)
+            event.listen(engine, 'checkin', _on_checkin)
+
+            if engine.dialect.name == 'sqlite':
+
+                _sqlite_pragmas = get_sqlite_pragmas()
+                _wal_checkpoint['interval'] = float(
+                    db_details.get('wal_checkpoint_interval', 300))
+                event.listen(engine, 'connect', _on_sqlite_connect)
+                event.listen(engine, 'checkin', _on_sqlite_checkin)
+
+            if db_details.get('auto_migrate', False):
+
+                migrations.upgrade(engine)
+
+            else:
+
+                # A read, no DDL runs inside a request.
+                with engine.connect() as connection:
+
+                    version = migrations.current_version(connection)
+
+                if version < migrations.latest_version():
+
+                    engine.dispose()
+
+                    raise RuntimeError(
+                        "Database schema is at version %d, the latest is "
+                        "%d. Run python migrations.py upgrade before "
+                        "starting the app."
+                        % (version, migrations.latest_version()))
+
+            # Objects are handed to the UI after the session is gone, so
+            # they must not be expired on commit.
+            _Session = scoped_session(sessionmaker(bind=engine,
+                                                   expire_on_commit=False))
+            _engine = engine
+
+    return _engine
+
+
+@contextmanager
+def session_scope():
+    """
+    Context manager providing a thread local session from the shared engine.
+    The outermost scope commits on success, rolls back on errors and returns
+    the connection to the pool when done. Nested scopes reuse the session of
+    the outermost scope.
+
+    Yields
+    ------
+    session : sqlalchemy.orm.Session
+        Session bound to the shared engine.
+
+    """
+    get_engine()
+    session = _Session()
+    depth = session.info.get('depth', 0)
+    session.info['depth'] = depth + 1
+
+    try:
+
+        yield session
+
+        if depth == 0:
+
+            session.commit()
+
+    except BaseException:
+
+        if depth == 0:
+
+            session.rollback()
+
+        raise
+
+    finally:
+
+        session.info['depth'] = depth
+
+        if depth == 0:
+
+            _Session.remove()
+
+
+def get_pool_stats():
+    """
+    Get connection pool statistics for monitoring purposes.
+
+    Returns
+    -------
+    stats : dict
+        Pool size, connections currently checked out and in overflow, as well
+        as cumulative connects, checkouts, checkins, WAL checkpoints and wait
+        times in seconds.
+
+    """
+    with _pool_stats_lock:
+
+        stats = dict(_pool_stats)
+
+    if _engine is not None:
+
+        pool = _engine.pool
+        stats['pool_size'] = pool.size()
+        stats['checked_out'] = pool.checkedout()
+        stats['overflow'] = max(pool.overflow(), 0)
+
+    if stats['waits'] > 0:
+
+        stats['mean_wait_time'] = stats['wait_time'] / stats['waits']
+
+    else:
+
+        stats['mean_wait_time'] = 0.0
+
+    return stats
+
+
+def dispose_engine():
+    """
+    Close all pooled connections and drop the shared engine.
+    The engine is recreated on next use.
+    """
+    global _engine, _Session
+
+    with _engine_lock:
+
+        if _Session is not None:
+
+            _Session.remove()
+
+        if _engine is not None:
+
+            _engine.dispose()
+
+        _engine = None
+        _Session = None
+
+
+def bind_engine(engine):
+    """
+    Use the given engine instead of the one configured in secrets.toml, for
+    tests, benchmarks and tools. Migrations are not applied and the cached
+    reference data, organisation tree and user directory are reloaded on
+    next use.
+
+    Parameters
+    ----------
+    engine : sqlalchemy.engine.Engine
+        Engine for the database to use.
+
+    Returns
+    -------
+    None.
+
+    """
+    global _engine, _Session
+
+    dispose_engine()
+
+    with _engine_lock:
+
+        _Session = scoped_session(sessionmaker(bind=engine,
+                                               expire_on_commit=False))
+        _engine = engine
+
+    invalidate_irl_reference()
+    user_directory.invalidate()
+    org_tree.invalidate()
+
+
+"""
+Request context.
+"""
+
+
+class RequestContext:
+    """
+    Memo of read queries for the duration of one script run, so that the
+    same query is not sent twice while a page is drawn.
+    Created by request_scope around each page script and discarded when
+    the run ends. Any write through a session clears it, so reads after a
+    write in the same run see the change.
+    Every caller gets its own copy of DataFrame and list results. The ORM
+    objects in them are shared, so they must only be modified to write
+    them back, which clears the memo.
+    """
+
+    def __init__(self):
+
+        self.hits = 0
+        self.misses = 0
+        self._memo = {}
+
+    def get(self, func, *args, **kwargs):
+        """
+        Result of func for the given arguments, queried on first use.
+        Lists in the arguments are treated as tuples.
+        """
+        key = (func.__name__,
+               tuple(_hashable(arg) for arg in args),
+               tuple(sorted((k, _hashable(v)) for k, v in kwargs.items())))
+
+        if key in self._memo:
+
+            self.hits += 1
+
+        else:
+
+            self.misses += 1
+            self._memo[key] = func(*args, **kwargs)
+
+        return _copy_result(self._memo[key])
+
+    def invalidate(self):
+
+        self._memo.clear()
+
+    def stats(self):
+        """
+        Memo counters and size.
+
+        Returns
+        -------
+        stats : dict
+            hits, misses (i.e. queries sent) and the number of memoized
+            results.
+
+        """
+
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'results': len(self._memo)}
+
+
+# Streamlit runs each script run in its own thread.
+_request = threading.local()
+
+
+def _hashable(arg):
+
+    if isinstance(arg, list):
+
+        return tuple(arg)
+
+    return arg
+
+
+def _copy_result(result):
+
+    # Shallow copies, enough to keep added columns or rows out of the memo.
+    if isinstance(result, pd.DataFrame):
+
+        return result.copy()
+
+    if isinstance(result, list):
+
+        return list(result)
+
+    return result
+
+
+@contextmanager
+def request_scope():
+    """
+    Context manager memoizing the read queries of one script run.
+    Nested scopes reuse the context of the outermost scope.
+
+    Yields
+    ------
+    context : RequestContext
+        The context of the current run.
+
+    """
+    context = get_request_context()
+
+    if context is not None:
+
+        yield context
+        return
+
+    context = RequestContext()
+    _request.context = context
+
+    try:
+
+        yield context
+
+    finally:
+
+        _request.context = None
+
+
+def get_request_context():
+    """
+    The context of the current script run, None outside request_scope.
+    """
+
+    return getattr(_request, 'context', None)
+
+
+def request_cached(func):
+    """
+    Memoize a read query in the current request context, if any.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+
+        context = get_request_context()
+
+        if context is None:
+
+            return func(*args, **kwargs)
+
+        return context.get(func, *args, **kwargs)
+
+    return wrapper
+
+
+def _invalidate_request():
+
+    context = get_request_context()
+
+    if context is not None:
+
+        context.invalidate()
+
+
+def _on_flush(session, flush_context):
+
+    _invalidate_request()
+
+
+def _on_orm_execute(orm_execute_state):
+
+    # Bulk inserts, updates and deletes bypass the flush.
+    if (orm_execute_state.is_insert or orm_execute_state.is_update or
+            orm_execute_state.is_delete):
+
+        _invalidate_request()
+
+
+event.listen(Session, 'after_flush', _on_flush)
+event.listen(Session, 'do_orm_execute', _on_orm_execute)
+
+
+"""
+IRL methods.
+"""
+
+
+@request_cached
+def get_irl(irl_ass_id):
+
+    with session_scope() as session:
+
+        irl_ass = session.query(IRLAssessment).filter(
+            (IRLAssessment.id == irl_ass_id)).first()
+
+    return irl_ass
+
+
+def irl_ass_changed(irl_ass):
+    """
+    Check if the assessment is currently different from the one saved in
+    the database.
+
+    Parameters
+    ----------
+    irl_ass_id : TYPE
+        DESCRIPTION.
+    irl_ass : TYPE
+        DESCRIPTION.
+
+    Returns
+    -------
+    Bool
+
+    """
+    db_irl_ass = get_irl(irl_ass.id)
+    attrs = ('crl', 'trl', 'brl', 'iprl', 'tmrl', 'frl')
+
+    for attr in attrs:
+
+        db_attr = getattr(db_irl_ass, attr)
+        irl_attr = getattr(irl_ass, attr)
+
+        if db_attr != irl_attr:
+
+            return True
+
+    return False
+
+
+IRL_TYPES = ['CRL', 'TRL', 'BRL', 'IPRL', 'TMRL', 'FRL']
+
+# The IRL table is reference data that only changes through
+# update_license_values and update_startup_values, so it is loaded once per
+# process and shared by all sessions.
+_irl_reference = None
+_irl_reference_lock = threading.Lock()
+
+
+def get_irl_reference():
+    """
+    Get the cached IRL reference data, loading it with one query if needed.
+
+    Returns
+    -------
+    reference : dict
+        (irl_type, ascending) as keys with the get_irl_table dataframes as
+        values, and 'StartupValue' and 'LicenseValue' as keys with 9x6
+        numpy arrays indexed by [level - 1, IRL type] as values.
+
+    """
+    global _irl_reference
+
+    reference = _irl_reference
+
+    if reference is not None:
+
+        return reference
+
+    with _irl_reference_lock:
+
+        if _irl_reference is None:
+
+            # Columns, not entities: Level alone is the mapped primary key,
+            # so entities of different IRL types would be merged.
+            columns = [column.name for column in IRL.__table__.columns]
+
+            with session_scope() as session:
+
+                rows = session.query(*IRL.__table__.columns).all()
+
+            irl_df = pd.DataFrame.from_records(rows, columns=columns)
+            reference = {}
+
+            for irl_type in IRL_TYPES:
+
+                type_df = irl_df[irl_df.IRLType == irl_type]
+                type_df = type_df.sort_values('Level')
+                reference[(irl_type, True)] = type_df.reset_index(drop=True)
+                type_df = type_df.sort_values('Level', ascending=False)
+                reference[(irl_type, False)] = type_df.reset_index(drop=True)
+
+            for value in ('StartupValue', 'LicenseValue'):
+
+                matrix = np.zeros((9, len(IRL_TYPES)), dtype=np.int64)
+                cols = irl_df.IRLType.map(IRL_TYPES.index).to_numpy()
+                rows = irl_df.Level.to_numpy() - 1
+                matrix[rows, cols] = irl_df[value].fillna(0).to_numpy()
+                reference[value] = matrix
+
+            _irl_reference = reference
+
+        return _irl_reference
+
+
+def invalidate_irl_reference():
+    """
+    Drop the cached IRL reference data so the next use reloads it.
+
+    Returns
+    -------
+    None.
+
+    """
+    global _irl_reference
+
+    with _irl_reference_lock:
+
+        _irl_reference = None
+
+
+def get_irl_table(irl_type, ascending=False):
+    """
+    Convenience method for grabbing IRL levels and descriptions from DB.
+
+    Parameters
+    ----------
+    irl_type : string
+        One of 'CRL', 'TRL', 'BRL', 'IPRL', 'TRL' 'FRL'.
+    ascending : bool
+        Returns table in ascdescending IRL level order if True,
+        returns table in descending IRL level order if False (default).
+
+    Returns
+    -------
+    irl_table : Pandas DataFrame
+        DESCRIPTION.
+
+    """
+    assert irl_type in IRL_TYPES
+
+    return get_irl_reference()[(irl_type, bool(ascending))].copy()
+
+
+def get_irl_license_value_matrix():
+
+    df_dict = {'Level': list(range(1, 10, 1))}
+    matrix = get_irl_reference()['LicenseValue']
+
+    for col, irl_type in enumerate(IRL_TYPES):
+
+        df_dict[irl_type] = matrix[:, col]
+
+    irl_df = pd.DataFrame(df_dict)
+
+    return irl_df
+
+
+def get_irl_startup_value_matrix():
+
+    df_dict = {'Level': list(range(1, 10, 1))}
+    matrix = get_irl_reference()['StartupValue']
+
+    for col, irl_type in enumerate(IRL_TYPES):
+
+        df_dict[irl_type] = matrix[:, col]
+
+    irl_df = pd.DataFrame(df_dict)
+
+    return irl_df
+
+
+def update_license_values(edited_rows):
+
+    with session_scope() as session:
+
+        for row in edited_rows.keys():
+
+            for irl, value in edited_rows[row].items():
+
+                session.query(IRL).filter(IRL.Level == row+1,
+                                          IRL.IRLType == irl).\
+                    update({'LicenseValue': value})
+
+    invalidate_irl_reference()
+
+
+def update_startup_values(edited_rows):
+
+    with session_scope() as session:
+
+        for row in edited_rows.keys():
+
+            for irl, value in edited_rows[row].items():
+
+                session.query(IRL).filter(IRL.Level == row+1,
+                                          IRL.IRLType == irl).\
+                    update({'StartupValue': value})
+
+    invalidate_irl_reference()
+
+
+"""
+Valuation methods.
+"""
+
+
+def get_value_matrices():
+    """
+    Get the startup and license value matrices from the IRL reference cache.
+
+    Returns
+    -------
+    matrices : dict
+        'StartupValue' and 'LicenseValue' as keys, 9x6 numpy arrays indexed
+        by [level - 1, IRL type] as values. Missing values are 0.
+
+    """
+    reference = get_irl_reference()
+
+    return {'StartupValue': reference['StartupValue'],
+            'LicenseValue': reference['LicenseValue']}
+
+
+def calc_values(assessments, value='LicenseValue', target=False):
+    """
+    Value any number of assessments with a single lookup per IRL level.
+
+    Parameters
+    ----------
+    assessments : list of IRLAssessment
+        The assessments to value.
+    value : str, optional
+        'LicenseValue' or 'StartupValue'. The default is 'LicenseValue'.
+    target : bool, optional
+        If True, values the target levels instead. The default is False.
+
+    Returns
+    -------
+    values : numpy.ndarray
+        One value per assessment, in the order given. Levels that are unset
+        or outside 1-9 are worth 0.
+
+    """
+    matrix = get_value_matrices()[value]
+    levels = np.array([[level or 0 for level in irl_ass.levels(target)]
+                       for irl_ass in assessments],
+                      dtype=np.int64).reshape(-1, len(IRL_TYPES))
+    valid = (levels >= 1) & (levels <= 9)
+
+    # Pick matrix[level - 1, type] for every type and sum across types.
+    picked = matrix[np.clip(levels, 1, 9) - 1, np.arange(len(IRL_TYPES))]
+
+    return np.where(valid, picked, 0).sum(axis=1)
+
+
+def calc_portfolio_values(assessments):
+    """
+    Startup and license values, now and if targets are met, for a portfolio.
+
+    Parameters
+    ----------
+    assessments : list of IRLAssessment
+        The assessments to value.
+
+    Returns
+    -------
+    values : Pandas DataFrame
+        Columns startup, startup_target, license and license_target, one row
+        per assessment in the order given.
+
+    """
+    return pd.DataFrame({
+        'startup': calc_values(assessments, 'StartupValue'),
+        'startup_target': calc_values(assessments, 'StartupValue', True),
+        'license': calc_values(assessments, 'LicenseValue'),
+        'license_target': calc_values(assessments, 'LicenseValue', True)})
+
+
+"""
+User methods.
+"""
+
+# Seconds before the user directory is reloaded even without writes.
+USER_DIRECTORY_TTL = 60.0
+
+
+class UserDirectory:
+    """
+    Process wide, read-only snapshot of the Users and Permission Levels
+    tables with lookups by user id and username.
+    Reloaded after USER_DIRECTORY_TTL seconds, or on the next lookup after
+    invalidate() is called by one of the user write methods.
+    The User objects are detached and shared between sessions, so they must
+    not be modified.
+    """
+
+    def __init__(self, ttl=USER_DIRECTORY_TTL):
+
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._loaded = None
+        self._users = []
+        self._by_id = {}
+        self._by_username = {}
+        self._permission_levels = []
+
+    def _load(self):
+        """
+        Reload the snapshot if it is missing or stale.
+        Counts the lookup as a hit or a miss.
+        """
+        with self._lock:
+
+            loaded = self._loaded
+
+            if loaded is not None and time.monotonic() - loaded < self.ttl:
+
+                self.hits += 1
+                return
+
+            self.misses += 1
+
+            with session_scope() as session:
+
+                users = session.query(User).order_by(User.user_id).all()
+                pls = session.query(PermissionLevel).order_by(
+                    PermissionLevel.level).all()
+
+            self._users = users
+            self._by_id = {user.user_id: user for user in users}
+            self._by_username = {user.username: user for user in users}
+            self._permission_levels = pls
+            self._loaded = time.monotonic()
+
+    def invalidate(self):
+
+        with self._lock:
+
+            self._loaded = None
+
+    def users(self, active=True, org_id=None):
+
+        self._load()
+        active = int(active)
+
+        return [user for user in self._users
+                if user.active == active and
+                (org_id is None or user.org_id == org_id)]
+
+    def by_id(self, user_id):
+
+        self._load()
+
+        return self._by_id.get(user_id, None)
+
+    def by_ids(self, user_ids):
+        """
+        Users for a list of user ids, in the same order, skipping unknown
+        ids. One lookup, however many ids.
+        """
+        self._load()
+
+        return [self._by_id[user_id] for user_id in user_ids
+                if user_id in self._by_id]
+
+    def by_username(self, username):
+
+        self._load()
+
+        return self._by_username.get(username, None)
+
+    def permission_levels(self):
+
+        self._load()
+
+        return list(self._permission_levels)
+
+    def stats(self):
+        """
+        Cache counters and size.
+
+        Returns
+        -------
+        stats : dict
+            hits, misses (i.e. reloads) and the number of cached users.
+
+        """
+
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'users': len(self._users)}
+
+
+user_directory = UserDirectory()
+
+
+def add_user(new_user, password):
+    """
+
+    Parameters
+    ----------
+    username : TYPE
+        DESCRIPTION.
+    password : TYPE
+        DESCRIPTION.
+    rights : TYPE
+        DESCRIPTION.
+
+    Returns
+    -------
+    bool
+        DESCRIPTION.
+
+    """
+    with session_scope() as session:
+
+        password = password.encode('utf-8')
+        salt = bcrypt.gensalt()
+        hashed_password = bcrypt.hashpw(password, salt).decode('utf-8')
+
+        # Check if user doesn't already exist.
+        exists = session.query(User).filter_by(
+            username=new_user.username).first()
+
+        if exists:
+
+            return None
+
+        else:
+
+            new_user.password = hashed_password
+            session.add(new_user)
+            session.commit()
+            new_user = session.query(User).filter(
+                User.username == new_user.username).first()
+            new_user_settings = UserSettings(user_id=new_user.user_id,
+                                             smooth_irl=1,
+                                             filter_on_user=1,
+                                             remember_project=1,
+                                             ascending_irl=1,
+                                             ap_table_view=0,
+                                             dark_mode=1,
+                                             interactive_irl=0)
+            session.add(new_user_settings)
+            session.commit()
+            session.refresh(new_user)
+            user_directory.invalidate()
+
+        return new_user
+
+
+def get_users(active=True, org_id=None):
+    """
+    Fetch a list of users from the database.
+
+    Parameters
+    ----------
+    active : TYPE, optional
+        DESCRIPTION. The default is True.
+    org_id : Integer, optional
+        If not None, returns only users belonging to the organisation with the
+        given org_id. The default is None.
+
+    Returns
+    -------
+    users : List of User
+        DESCRIPTION.
+
+    """
+
+    return user_directory.users(active, org_id)
+
+
+def get_user_id(username):
+    """
+    Get the user ID of a specific username.
+
+    Parameters
+    ----------
+    username : string
+        DESCRIPTION.
+
+    Returns
+    -------
+    user_id : integer
+        DESCRIPTION.
+
+    """
+
+    user_id = None
+    db_user = user_directory.by_username(username)
+
+    if db_user is not None:
+
+        user_id = db_user.user_id
+
+    return user_id
+
+
+def validate_user(user, password):
+    """
+
+    Parameters
+    ----------
+    user : TYPE
+        DESCRIPTION.
+    password : TYPE
+        DESCRIPTION.
+
+    Returns
+    -------
+    db_user : TYPE
+        DESCRIPTION.
+
+    """
+
+    with session_scope() as session:
+
+        password = password.encode('utf-8')
+        db_user = session.query(User).filter(User.username == user).first()
+        verified = (db_user and bcrypt.checkpw(
+            password, db_user.password.encode('utf-8')))
+
+    if not verified:
+
+        db_user = None
+
+    return db_user
+
+
+def change_user_password(user, password):
+    """
+    Change user password.
+
+    Parameters
+    ----------
+    user : base.User
+        DESCRIPTION.
+    password : string
+        DESCRIPTION.
+
+    Returns
+    -------
+    bool
+        True if change was successful, false if not.
+
+    """
+
+    with session_scope() as session:
+
+        password = password.encode('utf-8')
+        salt = bcrypt.gensalt()
+        hashed_password = bcrypt.hashpw(password, salt).decode('utf-8')
+        stmt = (update(User).where(
+            User.user_id == user.user_id).values(password=hashed_password))
+
+        try:
+
+            session.execute(stmt)
+            success = True
+
+        except BaseException:
+
+            success = False
+
+    user_directory.invalidate()
+
+    return success
+
+
+def change_user_status(users, active):
+    """
+    Change user status.
+
+    Parameters
+    ----------
+    users : list of user names
+        List of users to update.
+    active : bool
+        Set user active status. We don't delete users for historical resasons.
+
+    Returns
+    -------
+    bool
+        True if change was successful, false if not.
+
+    """
+
+    active = int(active)
+
+    with session_scope() as session:
+
+        try:
+
+            session.query(User).filter(
+                User.username.in_(users)).update({'active': active})
+            success = True
+
+        except BaseException:
+
+            success = False
+
+    user_directory.invalidate()
+
+    return success
+
+
+def get_user(username):
+    """
+
+    Parameters
+    ----------
+    username : string
+        Must be a valid username.
+
+    Returns
+    -------
+    user : base.User
+        DESCRIPTION.
+
+    """
+
+    return user_directory.by_username(username)
+
+
+def get_user_by_id(user_id):
+    """
+
+    Parameters
+    ----------
+    user_id : integer
+        Unique user ID from the database.
+
+    Returns
+    -------
+    user : base.User
+        The user, or None if there is no such user.
+
+    """
+
+    return user_directory.by_id(user_id)
+
+
+def get_user_settings(user_id):
+    """
+
+
+    Parameters
+    ----------
+    user : TYPE
+        DESCRIPTION.
+
+    Returns
+    -------
+    user_settings : TYPE
+        DESCRIPTION.
+
+    """
+
+    with session_scope() as session:
+
+        user_settings = session.query(
+            UserSettings).filter(UserSettings.user_id == user_id).first()
+
+    return user_settings
+
+
+"""
+System settings methods.
+"""
+
+
+def get_system_settings():
+    """
+    Convenience method for grabbing system settings from DB.
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    irl_table : Pandas DataFrame
+        DESCRIPTION.
+
+    """
+    with session_scope() as session:
+
+        sys_settings = session.query(
+            SystemSettings).filter(SystemSettings.id == 1).first()
+
+    return sys_settings
+
+
+"""
+Project methods.
+"""
+
+
+def change_project_status(projects, active):
+    """
+    Change project status.
+
+    Parameters
+    ----------
+    users : list of IRLAssessment
+        List of projects to update.
+    active : bool
+        Set project active status.
+        We don't delete projects for historical resasons.
+
+    Returns
+    -------
+    bool
+        True if change was successful, false if not.
+
+    """
+
+    active = int(active)
+
+    with session_scope() as session:
+
+        project_nos = [p.project_no for p in projects]
+
+        try:
+
+            session.query(IRLAssessment).filter(
+                IRLAssessment.project_no.in_(
+                    project_nos)).update({'active': active})
+
+            newest = select(func.max(IRLAssessment.id)).where(
+                IRLAssessment.project_no.in_(project_nos)).group_by(
+                    IRLAssessment.project_no)
+
+            for irl_ass in session.scalars(select(IRLAssessment).where(
+                    IRLAssessment.id.in_(newest))):
+
+                LatestAssessment.set_latest(session, irl_ass)
+
+            success = True
+
+        except BaseException:
+
+            success = False
+
+    return success
+
+
+def get_projects(user, filt=True, active=True):
+    """
+    Fetch IRL data from the database.
+    
+
+    Parameters
+    ----------
+    user : User
+        The current user.
+    filt : Bool, optional
+        If True, will only display the projects the user is project leader on.
+        If False, will display all projects where the user is part of the
+        project team for access levels 0-3.
+        For access level 8 (SuperUser) all projects for this SuperUser's
+        organisation will be returned.
+        For access level 9 (Administrator), all projects will be returned.
+        The default is True.
+    active : Bool, optional
+        If True, returns only active projects.
+        If False, returns only inactive projects.
+        The default is True.
+
+    Returns
+    -------
+    List of IRLData objects, the latest revision of each project.
+
+    """
+
+    with session_scope() as session:
+
+        irl_data = _projects_query(session, user, filt, active).all()
+
+    return irl_data
+
+
+def _projects_query(session, user, filt=True, active=True):
+    """
+    Build the query behind get_projects. Kept separate so the query plan
+    check runs exactly what the UI runs.
+    """
+    active = int(active)
+    query = session.query(IRLAssessment).join(
+        LatestAssessment,
+        LatestAssessment.assessment_id == IRLAssessment.id).order_by(
+            IRLAssessment.assessment_date, IRLAssessment.id)
+
+    if filt:
+
+        return query.filter(
+            (LatestAssessment.project_leader_id == user.user_id) &
+            (LatestAssessment.active == active))
+
+    if user.rights == 9:
+
+        return query.where(LatestAssessment.active == active)
+
+    elif user.rights == 8:
+
+        org_users = select(User.user_id).where(
+            (User.org_id == user.org_id) &
+            (User.active == 1))
+
+        return query.filter(
+            (LatestAssessment.project_leader_id.in_(org_users) &
+                (LatestAssessment.active == active)))
+
+    elif user.rights <= 3:
+
+        return query.filter(
+            (ProjectTeam.user_id == user.user_id) &
+            (ProjectTeam.active == 1) &
+            (LatestAssessment.project_no == ProjectTeam.project_id) &
+            (LatestAssessment.active == active))
+
+
+def rebuild_latest_assessments(engine=None):
+    """
+    Rebuild the Latest Assessments projection from the full history.
+    Only needed if the projection has drifted, e.g. after editing the
+    database by hand.
+
+    Parameters
+    ----------
+    engine : sqlalchemy.engine.Engine, optional
+        Engine for the database to rebuild. The default is the shared engine.
+
+    Returns
+    -------
+    int
+        Number of projects in the rebuilt projection.
+
+    """
+    if engine is None:
+
+        engine = get_engine()
+
+    with engine.begin() as connection:
+
+        connection.execute(text(migrations.REBUILD_LATEST_ASSESSMENTS[0]))
+        connection.execute(text(migrations.REBUILD_LATEST_ASSESSMENTS[1]))
+        count = connection.execute(
+            select(func.count()).select_from(LatestAssessment)).scalar()
+
+    return count
+
+
+@request_cached
+def get_project_history(project_id):
+    """
+    Get IRL assessments for all projects.
+    If user is specified, returns only projects where the specified user is
+    project leader.
+    """
+
+    with session_scope() as session:
+
+        irl_data = _project_history_query(session, project_id).all()
+
+    return irl_data
+
+
+def _project_history_query(session, project_id):
+
+    return session.query(IRLAssessment).order_by(
+            IRLAssessment.assessment_date).where(
+                    IRLAssessment.project_no == project_id)
+
+
+@request_cached
+def get_project_rights(project_id, user_id):
+
+    with session_scope() as session:
+
+        rights = _project_rights_query(session, project_id, user_id).first()
+
+    if rights is None:
+
+        return 1
+
+    else:
+
+        return rights.project_rights
+
+
+def _project_rights_query(session, project_id, user_id):
+
+    return session.query(ProjectTeam).where(
+                    (ProjectTeam.project_id == project_id) &
+                    (ProjectTeam.user_id == user_id))
+
+
+@request_cached
+def get_project_team(project_id, active=True):
+    """
+    Convenience method for fetching the project team.
+
+    Parameters
+    ----------
+    project_id : integer
+        The unique project id from the database.
+    active : bool, optional
+        If True, only returns active project members.
+        If False, will return all members that have been part of the project
+        team at any point in its history.
+        The default is True.
+
+    Returns
+    -------
+    team_df : Pandas DataFrame
+        DESCRIPTION.
+
+    """
+
+    with session_scope() as session:
+
+        team = _project_team_query(session, project_id, active).all()
+        members = []
+        user_objs = []
+
+        for member in team:
+
+            # This is hackish and the order matters as we have the active
+            # flag for both users and team members. The latter overwrites the
+            # former.
+            row = member.user.to_dict()
+            row.update(member.to_dict())
+            members.append(row)
+            user_objs.append(member.user)
+
+        team_df = pd.DataFrame(members)
+        team_df['team_obj'] = team
+        team_df['user_obj'] = user_objs
+
+    return team_df
+
+
+def _project_team_query(session, project_id, active=True):
+
+    if active is True:
+
+        return session.query(ProjectTeam).order_by(
+                ProjectTeam.user_id).where(
+                        (ProjectTeam.project_id == project_id) &
+                        (ProjectTeam.user_id == User.user_id) &
+                        (ProjectTeam.active == active))
+
+    else:
+
+        return session.query(ProjectTeam).order_by(
+                ProjectTeam.user_id).where(
+                        (ProjectTeam.project_id == project_id) &
+                        (ProjectTeam.user_id == User.user_id))
+
+
+@request_cached
+def get_project_non_members(project_id, org_id=None):
+    """
+    Active users that have never been on the project team.
+
+    Parameters
+    ----------
+    project_id : integer
+        The unique project id from the database.
+    org_id : Integer, optional
+        If not None, returns only users belonging to the organisation with the
+        given org_id. The default is None.
+
+    Returns
+    -------
+    users : List of User
+        The users, ordered by user id. Shared with the user directory, so
+        they must not be modified.
+
+    """
+
+    with session_scope() as session:
+
+        user_ids = _project_non_members_query(session,
+                                              project_id,
+                                              org_id).all()
+
+    # Only ids from the database, the users come from the user directory
+    # instead of loading possibly thousands of them as new objects.
+    return user_directory.by_ids([user_id for user_id, in user_ids])
+
+
+def _project_non_members_query(session, project_id, org_id=None):
+
+    # Anti-join, answered from ix_project_teams_project_user per user.
+    member = select(ProjectTeam.id).where(
+        (ProjectTeam.project_id == project_id) &
+        (ProjectTeam.user_id == User.user_id))
+    query = session.query(User.user_id).order_by(User.user_id).where(
+        (User.active == 1) & ~member.exists())
+
+    if org_id is not None:
+
+        query = query.where(User.org_id == org_id)
+
+    return query
+
+
+@request_cached
+def get_active_project_members(project_id, leader_id=None, org_id=None):
+    """
+    Active users that are active members of the project team.
+
+    Parameters
+    ----------
+    project_id : integer
+        The unique project id from the database.
+    leader_id : integer, optional
+        User id to leave out, typically the project leader. The default is
+        None.
+    org_id : Integer, optional
+        If not None, returns only users belonging to the organisation with the
+        given org_id. The default is None.
+
+    Returns
+    -------
+    users : List of User
+        The users, ordered by user id.
+
+    """
+
+    with session_scope() as session:
+
+        users = _active_project_members_query(session,
+                                              project_id,
+                                              leader_id,
+                                              org_id).all()
+
+    return users
+
+
+def _active_project_members_query(session, project_id, leader_id=None,
+                                  org_id=None):
+
+    query = session.query(User).join(
+        ProjectTeam,
+        ProjectTeam.user_id == User.user_id).order_by(User.user_id).where(
+            (ProjectTeam.project_id == project_id) &
+            (ProjectTeam.active == 1) &
+            (User.active == 1))
+
+    if leader_id is not None:
+
+        query = query.where(User.user_id != leader_id)
+
+    if org_id is not None:
+
+        query = query.where(User.org_id == org_id)
+
+    return query
+
+
+def is_project(project_no):
+
+    with session_scope() as session:
+
+        exists = session.query(IRLAssessment).filter_by(
+            project_no=project_no).first()
+
+    if exists:
+
+        return True
+
+    else:
+
+        return False
+
+
+def get_orgs():
+    """
+    Return all active organisations in the database.
+    TODO: Implement active
+
+    Returns
+    -------
+    orgs : TYPE
+        DESCRIPTION.
+
+    """
+
+    return org_tree.orgs()
+
+
+def get_facs(org):
+    """
+    Return all active organisations in the database.
+
+    Returns
+    -------
+    orgs : TYPE
+        DESCRIPTION.
+
+    """
+
+    return org_tree.facs(org.org_id)
+
+
+def get_deps(fac):
+    """
+    Return all active organisations in the database.
+
+    Returns
+    -------
+    orgs : TYPE
+        DESCRIPTION.
+
+    """
+
+    return org_tree.deps(fac.fac_id)
+
+
+def get_permission_levels(user=None):
+    """
+    Get a list of all permission leveles in the database.
+
+    Returns
+    -------
+    list : PermissionLevel
+        DESCRIPTION.
+
+    """
+    pls = user_directory.permission_levels()
+
+    if user is not None:
+
+        pls = [pl for pl in pls if pl.level <= user.rights]
+
+    return pls
+
+
+def get_permission_level_map():
+    """
+    Get a mapping from permission level texts to permission level ids.
+    This is needed because I can't find a way to use the PermissionLevel
+    object inside st.selectbox in st.data_editor. It is probably feasible,
+    which would be ideal, but I don't know how to do it right now.
+
+    Returns
+    -------
+    pm_map : dict
+        Dictionary with permission level labels as keys and level ID as values.
+
+    """
+    pms = user_directory.permission_levels()
+    pm_map = {}
+
+    for pm in pms:
+
+        pm_map[pm.level_text] = pm.level
+
+    return pm_map
+
+
+def add_project_team(project_no, team):
+
+    with session_scope() as session:
+
+        for user in team:
+
+            team_member = ProjectTeam()
+            team_member.project_id = project_no
+            team_member.user_id = user.user_id
+            team_member.project_rights = user.rights
+            team_member.active = 1
+            session.add(team_member)
+
+
+""" Organisation, department and faculty methods."""
+
+
+class OrgTree:
+    """
+    Process wide tree of active organisations, faculties and departments.
+    Loaded with one query per level on first use, and kept up to date by
+    add_org, add_fac and add_dep. Children are kept sorted by name, as the
+    selectboxes show them.
+    The objects are detached and shared between sessions, so they must not
+    be modified.
+    """
+
+    def __init__(self):
+
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._orgs = []
+        self._by_id = {}
+        self._children = {}
+
+    @staticmethod
+    def _key(node):
+
+        return str(node)
+
+    def _load(self):
+
+        with self._lock:
+
+            if self._loaded:
+
+                return
+
+            with session_scope() as session:
+
+                orgs = session.query(Organisation).filter(
+                    Organisation.active == 1).all()
+                facs = session.query(Faculty).filter(
+                    Faculty.active == 1).all()
+                deps = session.query(Department).filter(
+                    Department.active == 1).all()
+
+            self._orgs = []
+            self._by_id = {}
+            self._children = {}
+
+            for node in orgs + facs + deps:
+
+                self._insert(node)
+
+            self._loaded = True
+
+    def _insert(self, node):
+        """
+        Add a node under its parent, keeping the children sorted.
+        """
+        if isinstance(node, Organisation):
+
+            key = ('org', node.org_id)
+            siblings = self._orgs
+
+        elif isinstance(node, Faculty):
+
+            key = ('fac', node.fac_id)
+            siblings = self._children.setdefault(('org', node.org_id), [])
+
+        else:
+
+            key = ('dep', node.dep_id)
+            siblings = self._children.setdefault(('fac', node.fac_id), [])
+
+        if key in self._by_id:
+
+            return
+
+        self._by_id[key] = node
+        bisect.insort(siblings, node, key=OrgTree._key)
+
+    def add(self, node):
+        """
+        Add a newly created organisation, faculty or department.
+        Ignored until the tree has been loaded, as loading will include it.
+        """
+        with self._lock:
+
+            if self._loaded:
+
+                self._insert(node)
+
+    def invalidate(self):
+
+        with self._lock:
+
+            self._loaded = False
+
+    def orgs(self):
+
+        self._load()
+
+        return list(self._orgs)
+
+    def facs(self, org_id):
+
+        self._load()
+
+        return list(self._children.get(('org', org_id), []))
+
+    def deps(self, fac_id):
+
+        self._load()
+
+        return list(self._children.get(('fac', fac_id), []))
+
+    def org(self, org_id):
+
+        self._load()
+
+        return self._by_id.get(('org', org_id), None)
+
+    def fac(self, fac_id):
+
+        self._load()
+
+        return self._by_id.get(('fac', fac_id), None)
+
+    def dep(self, dep_id):
+
+        self._load()
+
+        return self._by_id.get(('dep', dep_id), None)
+
+
+org_tree = OrgTree()
+
+
+def add_org(org_name):
+
+    with session_scope() as session:
+
+        new_org = Organisation()
+        new_org.org_name = org_name
+        new_org.active = True
+        session.add(new_org)
+        session.commit()
+        new_org = session.query(Organisation).filter(
+            Organisation.org_name == org_name).first()
+
+    org_tree.add(new_org)
+
+    return new_org.org_id
+
+
+def add_fac(org_id, fac_name):
+
+    with session_scope() as session:
+
+        new_fac = Faculty()
+        new_fac.org_id = org_id
+        new_fac.fac_name = fac_name
+        new_fac.active = True
+        session.add(new_fac)
+        session.commit()
+        new_fac = session.query(Faculty).filter(
+            (Faculty.org_id == org_id) &
+            (Faculty.fac_name == fac_name)).first()
+
+    org_tree.add(new_fac)
+
+    return new_fac.fac_id
+
+
+def add_dep(fac_id, dep_name):
+
+    with session_scope() as session:
+
+        new_dep = Department()
+        new_dep.fac_id = fac_id
+        new_dep.dep_name = dep_name
+        new_dep.active = True
+        session.add(new_dep)
+        session.commit()
+        new_dep = session.query(Department).filter(
+            (Department.fac_id == fac_id) &
+            (Department.dep_name == dep_name)).first()
+
+    org_tree.add(new_dep)
+
+    return new_dep.dep_id
+
+
+"""
+Action points methods.
+"""
+
+
+def get_ap(ap_id):
+    """
+    Get the action point object corresponding to the action point id.
+
+    Parameters
+    ----------
+    ap_id : Integer
+        Unique action point database ID.
+
+    Returns
+    -------
+    ap : ActionPoint
+        DESCRIPTION.
+
+    """
+    with session_scope() as session:
+
+        ap = session.query(ActionPoint).filter(
+            ActionPoint.ap_id == ap_id).first()
+
+    return ap
+
+
+def get_action_points(irl_ass_id, irl_type=None):
+    """
+    Get all action points related to the project IRL assessment.
+
+    Parameters
+    ----------
+    irl_ass_id : Integer
+        IRL Assessment ID
+    irl_type : String, optional
+        If specified returns only action points for the indicated IRL type.
+        Valid values are CRL, TRL, BRL, IPRL, TMRL, FRL.
+        The default is None.
+
+    Returns
+    -------
+    aps_df : Pandas DataFrame
+        Pandas DataFrame containing all action points and the name of the
+        responsible user. If no action points exists, returns empty
+        dataframe with correct columns.
+    """
+    if irl_type is not None:
+
+        assert irl_type in IRL_TYPES
+
+    with session_scope() as session:
+
+        query = _action_points_query(session, irl_ass_id, irl_type)
+        aps_df = _action_points_df(query.all())
+
+    return aps_df
+
+
+@request_cached
+def get_assessments_action_points(irl_ass_ids):
+    """
+    Get the action points of all IRL types for several assessments in one
+    round trip.
+
+    Parameters
+    ----------
+    irl_ass_ids : list of Integer
+        IRL Assessment IDs.
+
+    Returns
+    -------
+    aps_df : Pandas DataFrame
+        Same columns as get_action_points. Filter on assessment_id and
+        irl_type and reset the index before handing a subset to a data
+        editor, as the editor reports changes by row position.
+
+    """
+    with session_scope() as session:
+
+        query = _action_points_query(session, irl_ass_ids)
+        aps_df = _action_points_df(query.all())
+
+    return aps_df
+
+
+# Columns of the action point dataframes, in query order.
+ACTION_POINT_COLUMNS = ['ap_id', 'assessment_id', 'irl_type', 'action_point',
+                        'responsible', 'due_date', 'progress', 'comment',
+                        'user_id', 'actual_name', 'username']
+
+
+def _action_points_query(session, irl_ass_id, irl_type=None):
+    """
+    Action point columns joined with the responsible user's names.
+    irl_ass_id may be a single ID or a list of IDs.
+    """
+    query = session.query(
+        ActionPoint.ap_id,
+        ActionPoint.assessment_id,
+        ActionPoint.irl_type,
+        ActionPoint.action_point,
+        ActionPoint.responsible,
+        ActionPoint.due_date,
+        ActionPoint.progress,
+        ActionPoint.comment,
+        User.user_id,
+        User.actual_name,
+        User.username).outerjoin(
+            User, User.user_id == ActionPoint.responsible).order_by(
+                ActionPoint.ap_id)
+
+    if isinstance(irl_ass_id, (list, tuple)):
+
+        query = query.filter(ActionPoint.assessment_id.in_(irl_ass_id))
+
+    else:
+
+        query = query.filter(ActionPoint.assessment_id == irl_ass_id)
+
+    if irl_type is not None:
+
+        query = query.filter(ActionPoint.irl_type == irl_type)
+
+    return query
+
+
+def _action_points_df(rows):
+    """
+    Build the typed action point dataframe from query rows.
+    Missing due dates are set to now, as utils.dbdate2datetime does.
+    """
+    aps_df = pd.DataFrame.from_records(rows, columns=ACTION_POINT_COLUMNS)
+    aps_df = aps_df.astype({'ap_id': 'int64',
+                            'assessment_id': 'int64',
+                            'progress': 'Int64'})
+    due_dates = pd.to_datetime(aps_df['due_date'], format='%Y-%m-%d')
+    aps_df['due_date'] = due_dates.fillna(pd.Timestamp(datetime.now()))
+
+    return aps_df
+
+
+def save_action_points(irl_ass_id, edits):
+    """
+    Apply all edited and added action point rows from the action point
+    editors of an assessment in one transaction.
+
+    Parameters
+    ----------
+    irl_ass_id : Integer
+        IRL Assessment ID the added action points belong to.
+    edits : dict
+        IRL type as key and (aps_df, editor_state) as value, where aps_df is
+        the dataframe shown in the editor and editor_state is the data
+        editor's change state with edited_rows and added_rows.
+
+    Returns
+    -------
+    None.
+
+    """
+    columns = ('action_point', 'username', 'due_date', 'progress', 'comment')
+    updates = []
+    inserts = []
+
+    for irl_type, (aps_df, editor_state) in edits.items():
+
+        for row, changes in editor_state["edited_rows"].items():
+
+            values = {col: val for col, val in changes.items()
+                      if col in columns}
+            values['ap_id'] = int(aps_df.at[row, "ap_id"])
+            updates.append(values)
+
+        for row in editor_state["added_rows"]:
+
+            values = {'assessment_id': irl_ass_id,
+                      'irl_type': irl_type,
+                      'action_point': None,
+                      'username': None,
+                      'due_date': None,
+                      'progress': None,
+                      'comment': None}
+            values.update({col: val for col, val in row.items()
+                           if col in columns})
+            inserts.append(values)
+
+    if len(updates) + len(inserts) == 0:
+
+        return
+
+    usernames = {values['username'] for values in updates + inserts
+                 if values.get('username', None) is not None}
+
+    with session_scope() as session:
+
+        user_ids = dict(session.query(User.username, User.user_id).filter(
+            User.username.in_(usernames)).all())
+
+        for values in updates + inserts:
+
+            if 'username' in values:
+
+                values['responsible'] = user_ids.get(values.pop('username'),
+                                                     None)
+
+            if values.get('progress', None) is not None:
+
+                values['progress'] = int(values['progress'])
+
+            if values.get('due_date', None) is not None:
+
+                values['due_date'] = values['due_date'][:10]
+
+        # Bulk statements, rows with the same keys are sent as one batch.
+        if len(updates) > 0:
+
+            session.execute(update(ActionPoint), updates)
+
+        if len(inserts) > 0:
+
+            session.execute(insert(ActionPoint), inserts)
+
+
+@request_cached
+def ap_completed(irl_ass_id):
+
+    with session_scope() as session:
+
+        aps = session.query(ActionPoint).filter(
+                ActionPoint.assessment_id == irl_ass_id).all()
+        completion = session.query(func.sum(ActionPoint.progress)).filter(
+                    (ActionPoint.assessment_id == irl_ass_id)).scalar()
+
+    completed = (len(aps)*100 == completion) or (len(aps) == 0)
+
+    return completed
+
+
+def copy_aps(old_ass_id, new_ass_id):
+    """
+    Copy unfinished action points from an old assessment to a new one.
+    Runs as a single INSERT ... SELECT, in the caller's transaction if
+    there is one.
+
+    Parameters
+    ----------
+    old_ass_id : Integer
+        IRL Assessment ID to copy action points from.
+    new_ass_id : Integer
+        IRL Assessment ID to copy action points to.
+
+    Returns
+    -------
+    None.
+
+    """
+    columns = ['assessment_id', 'irl_type', 'action_point', 'responsible',
+               'due_date', 'progress', 'comment']
+    unfinished = select(
+        literal(new_ass_id),
+        ActionPoint.irl_type,
+        ActionPoint.action_point,
+        ActionPoint.responsible,
+        ActionPoint.due_date,
+        ActionPoint.progress,
+        ActionPoint.comment).where(
+            (ActionPoint.assessment_id == old_ass_id) &
+            (func.coalesce(ActionPoint.progress, 0) < 100)).order_by(
+                ActionPoint.ap_id)
+
+    with session_scope() as session:
+
+        session.execute(insert(ActionPoint).from_select(columns, unfinished))
+
+
+"""
+Query plan methods.
+"""
+
+
+def explain_query(session, query):
+    """
+    Run EXPLAIN QUERY PLAN for an ORM query.
+
+    Parameters
+    ----------
+    session : sqlalchemy.orm.Session
+        Session to run the explain in.
+    query : sqlalchemy.orm.Query
+        The query to explain.
+
+    Returns
+    -------
+    details : list of str
+        The detail column of the query plan, one entry per plan step.
+
+    """
+    statement = query.statement.compile(
+        dialect=session.get_bind().dialect,
+        compile_kwargs={'literal_binds': True})
+    plan = session.execute(text("EXPLAIN QUERY PLAN %s" % statement)).all()
+
+    return [row[-1] for row in plan]
+
+
+def check_query_plans(engine=None):
+    """
+    Explain the queries on the hot paths and report table scans.
+    A full scan of an index (e.g. to group all projects by project number)
+    is accepted, a scan of the table itself is not. SQLite only.
+
+    Parameters
+    ----------
+    engine : sqlalchemy.engine.Engine, optional
+        Engine for the database to check. The default is the shared engine.
+
+    Returns
+    -------
+    scans : dict
+        Query name as key and list of offending plan steps as value.
+        Empty if no query scans a table.
+
+    """
+    if engine is None:
+
+        engine = get_engine()
+
+    # Transient objects are enough, only their ids end up in the queries.
+    user = User(user_id=1, org_id=1, rights=1)
+    super_user = User(user_id=1, org_id=1, rights=8)
+    admin = User(user_id=1, org_id=1, rights=9)
+    scans = {}
+
+    with sessionmaker(bind=engine)() as session:
+
+        queries = {
+            'get_projects(filt=True)':
+                _projects_query(session, user, True),
+            'get_projects(rights=9)':
+                _projects_query(session, admin, False),
+            'get_projects(rights=8)':
+                _projects_query(session, super_user, False),
+            'get_projects(rights<=3)':
+                _projects_query(session, user, False),
+            'get_project_history':
+                _project_history_query(session, 1),
+            'get_project_rights':
+                _project_rights_query(session, 1, 1),
+            'get_project_team':
+                _project_team_query(session, 1),
+            'get_project_team(active=False)':
+                _project_team_query(session, 1, False),
+            'get_project_non_members(org_id)':
+                _project_non_members_query(session, 1, 1),
+            'get_active_project_members':
+                _active_project_members_query(session, 1, 1),
+            'get_action_points':
+                _action_points_query(session, 1),
+            'get_action_points(irl_type)':
+                _action_points_query(session, 1, 'CRL'),
+            }
+
+        for name, query in queries.items():
+
+            details = [detail for detail in explain_query(session, query)
+                       if detail.startswith('SCAN') and
+                       'USING INDEX' not in detail and
+                       'USING COVERING INDEX' not in detail]
+
+            if len(details) > 0:
+
+                scans[name] = details
+
+    return scans
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) Lodve Berre and NTNU Technology Transfer AS 2024.
+
+This file is part of Really Nice IRL.
+
+Really Nice IRL is free software: you can redistribute it and/or modify it
+under the terms of the GNU Affero General Public License as published by the
+Free Software Foundation, either version 3 of the License, or (at your option)
+ any later version.
+
+Really Nice IRL is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with Really Nice IRL. If not, see:
+<https://www.gnu.org/licenses/agpl-3.0.html>.
+
+Time get_projects for each permission branch on a generated history, and
+check that every returned row is the latest revision of its project:
+
+    python benchmarks/bench_get_projects.py [--projects N] [--revisions N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine, text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+import base  # noqa: E402
+import migrations  # noqa: E402
+
+
+LEADERS = 500
+ORGS = 5
+TEAM_PROJECTS = 20
+
+
+def populate(engine, projects, revisions):
+    """
+    Users, teams and an interleaved assessment history, so the revisions
+    of a project are spread over the table as they are in production.
+    """
+    users = [{'user_id': user_id,
+              'username': 'user%d' % user_id,
+              'rights': 1,
+              'active': 1,
+              'org_id': user_id % ORGS + 1} for user_id in
+             range(1, LEADERS + 1)]
+    history = [{'project_no': project_no,
+                'project_leader_id': project_no % LEADERS + 1,
+                'assessment_date': '2024-%02d-%02d' % (revision // 28 + 1,
+                                                       revision % 28 + 1),
+                'active': 1}
+               for revision in range(revisions)
+               for project_no in range(1, projects + 1)]
+    team = [{'project_id': project_no, 'user_id': 1, 'active': 1}
+            for project_no in range(1, TEAM_PROJECTS + 1)]
+
+    with engine.begin() as connection:
+
+        connection.execute(text(
+            "INSERT INTO Users (user_id, username, rights, active, org_id) "
+            "VALUES (:user_id, :username, :rights, :active, :org_id)"),
+            users)
+        connection.execute(text(
+            'INSERT INTO "IRL Data" (project_no, project_leader_id, '
+            'assessment_date, active) VALUES (:project_no, '
+            ':project_leader_id, :assessment_date, :active)'), history)
+        connection.execute(text(
+            'INSERT INTO "Project Teams" (project_id, user_id, active) '
+            'VALUES (:project_id, :user_id, :active)'), team)
+
+    base.rebuild_latest_assessments(engine)
+
+    with engine.begin() as connection:
+
+        connection.execute(text("ANALYZE"))
+
+
+def best_of(func, repeat):
+
+    best = None
+
+    for _ in range(repeat):
+
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best, result
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[-2])
+    parser.add_argument("--projects", type=int, default=10000)
+    parser.add_argument("--revisions", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+
+        engine = create_engine('sqlite:///%s' % os.path.join(tmp_dir,
+                                                             'irl.sdb'))
+        migrations.upgrade(engine)
+        populate(engine, args.projects, args.revisions)
+        base.bind_engine(engine)
+
+        with engine.begin() as connection:
+
+            latest = dict(connection.execute(text(
+                'SELECT project_no, MAX(id) FROM "IRL Data" '
+                'GROUP BY project_no')).all())
+
+        # Transient users, only their ids and rights end up in the queries.
+        branches = [
+            ('filter', base.User(user_id=1, org_id=2, rights=1), True),
+            ('rights 9', base.User(user_id=1, org_id=2, rights=9), False),
+            ('rights 8', base.User(user_id=1, org_id=2, rights=8), False),
+            ('rights <=3', base.User(user_id=1, org_id=2, rights=1), False)]
+
+        print("%d projects, %d revisions each, best of %d"
+              % (args.projects, args.revisions, args.repeat))
+        print("%-12s %6s %10s" % ("branch", "rows", "time"))
+
+        for name, user, filt in branches:
+
+            elapsed, projects = best_of(
+                lambda: base.get_projects(user, filt), args.repeat)
+            assert all(project.id == latest[project.project_no]
+                       for project in projects), name
+            print("%-12s %6d %7.1f ms" % (name, len(projects),
+                                          elapsed * 1e3))
+
+        base.dispose_engine()
+
+
+if __name__ == '__main__':
+
+    main()
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) Lodve Berre and NTNU Technology Transfer AS 2024.
+
+This file is part of Really Nice IRL.
+
+Really Nice IRL is free software: you can redistribute it and/or modify it
+under the terms of the GNU Affero General Public License as published by the
+Free Software Foundation, either version 3 of the License, or (at your option)
+ any later version.
+
+Really Nice IRL is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with Really Nice IRL. If not, see:
+<https://www.gnu.org/licenses/agpl-3.0.html>.
+
+Compare the pandas Styler tables the IRL pages used to send with
+ui.irl_table, for the action point overview and the explainer tables.
+Reports the time to build one table and the bytes sent to the browser,
+style included:
+
+    python benchmarks/bench_irl_table.py [--db sqlite:///irl.sdb]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+import pandas as pd
+
+from sqlalchemy import create_engine
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import base  # noqa: E402
+import ui  # noqa: E402
+
+
+# What the pages sent before each Styler table.
+HIDE_TABLE_ROW_INDEX = """
+                       <style>
+                       thead tr th:first-child {display:none}
+                       tbody th {display:none}
+                       </style>
+                       """
+
+OVERVIEW_COLUMNS = ['', 'Current', 'Target', 'Action Points', 'Lead',
+                    'Due Date']
+
+
+def overview_rows():
+
+    return [[irl_type, level, min(level + 2, 9),
+             'Talk to customers about %s.\nWrite it down.' % irl_type,
+             'Project leader', '2024-06-01']
+            for level, irl_type in enumerate(base.IRL_TYPES, 2)]
+
+
+def styler_overview(rows):
+
+    overview = pd.DataFrame(rows, columns=OVERVIEW_COLUMNS)
+
+    return HIDE_TABLE_ROW_INDEX + overview.style.map(
+        ui.irl_color, subset=['Current', 'Target']).to_html()
+
+
+def irl_table_overview(rows):
+
+    return ui.IRL_TABLE_STYLE + ui.irl_table(OVERVIEW_COLUMNS, rows,
+                                             levels=['Current', 'Target'])
+
+
+def styler_explainer(irl_df, column):
+
+    table = irl_df[['Level', column]]
+
+    return HIDE_TABLE_ROW_INDEX + table.style.map(
+        ui.irl_color, subset=['Level']).to_html(escape=False)
+
+
+def irl_table_explainer(irl_df, column):
+
+    return ui.IRL_TABLE_STYLE + ui.irl_table_html(irl_df, column)
+
+
+def measure(func, *args, number=200, repeat=5):
+
+    best = min(timeit.repeat(lambda: func(*args), number=number,
+                             repeat=repeat))
+
+    return best / number, len(func(*args).encode('utf-8'))
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[-2])
+    parser.add_argument("--db",
+                        default='sqlite:///file:%s?mode=ro&uri=true' %
+                        os.path.join(ROOT, 'irl.sdb'),
+                        help="Database with the IRL reference texts, "
+                             "opened read-only by default.")
+    args = parser.parse_args(argv)
+
+    base.bind_engine(create_engine(args.db))
+    rows = overview_rows()
+    irl_df = base.get_irl_table('CRL')
+    cases = [('overview', styler_overview, irl_table_overview, (rows,)),
+             ('scale', styler_explainer, irl_table_explainer,
+              (irl_df, 'Description')),
+             ('aspects', styler_explainer, irl_table_explainer,
+              (irl_df, 'Aspects'))]
+
+    print("%-9s %-9s %10s %8s" % ("table", "renderer", "time", "bytes"))
+
+    for name, styler, fast, case_args in cases:
+
+        for renderer, func in (('Styler', styler), ('irl_table', fast)):
+
+            elapsed, size = measure(func, *case_args)
+            print("%-9s %-9s %7.1f us %8d" % (name, renderer, elapsed * 1e6,
+                                              size))
+
+    base.dispose_engine()
+
+
+if __name__ == '__main__':
+
+    main()
@@ -1,476 +1,1337 @@
-# -*- coding: utf-8 -*-
-"""
-Copyright (c) Lodve Berre and NTNU Technology Transfer AS 2024.
-
-This file is part of Really Nice IRL.
-
-Really Nice IRL is free software: you can redistribute it and/or modify it
-under the terms of the GNU Affero General Public License as published by the
-Free Software Foundation, either version 3 of the License, or (at your option)
- any later version.
-
-Really Nice IRL is distributed in the hope that it will be useful, but
-WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
-or FITNESS FOR A PARTICULAR PURPOSE.
-See the GNU General Public License for more details.
-
-You should have received a copy of the GNU Affero General Public License
-along with Really Nice IRL. If not, see:
-<https://www.gnu.org/licenses/agpl-3.0.html>.
-"""
-
-import matplotlib.colors as mc
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-import matplotlib.patheffects as pe
-import numpy as np
-
-from scipy.interpolate import interp1d
-from statistics import mean
-
-
-IRL_CMAP = mc.LinearSegmentedColormap.from_list("IRL_CMAP",
-                                                [(0.0000, "#A8202F"),
-                                                 (0.1111, "#A8202F"),
-                                                 (0.2222, "#D66016"),
-                                                 (0.3333, "#F99B08"),
-                                                 (0.4444, "#FCB927"),
-                                                 (0.5555, "#FDDE16"),
-                                                 (0.6666, "#D5D311"),
-                                                 (0.7777, "#71AF34"),
-                                                 (0.8888, "#37913B"),
-                                                 (0.9999, "#37953B"),
-                                                 (1.0000, "#37953B")])
-
-
-def plot_irl(irl_data, smooth=False, dark_mode=True, targets=False):
-
-    if dark_mode:
-
-        fc = '#E5E8EE'
-        fg = '#222834'
-
-    else:
-
-        fc = 'black'
-        fg = 'white'
-
-    fig, ax = plt.subplots()
-
-    irl_vals = [irl_data.crl,
-                irl_data.trl,
-                irl_data.brl,
-                irl_data.iprl,
-                irl_data.tmrl,
-                irl_data.frl]
-
-    irl_targets = [irl_data.crl_target,
-                   irl_data.trl_target,
-                   irl_data.brl_target,
-                   irl_data.iprl_target,
-                   irl_data.tmrl_target,
-                   irl_data.frl_target]
-
-    irl_labels = ['Customer Readiness Level',
-                  'Technology Readiness Level',
-                  'Business Model Readiness Level',
-                  'IPR Readiness Level',
-                  'Team Readiness Level',
-                  'Funding Readiness Level']
-
-    irl_cats = np.arange(-2*np.pi+np.pi/2, np.pi/2, np.pi/3)*-1
-    irl_cats += np.pi
-    xs = []
-    ys = []
-    xts = []
-    yts = []
-    sxs = []
-    sys = []
-    sxts = []
-    syts = []
-
-    m_x, m_y = np.meshgrid(np.linspace(-1, 1, 256), np.linspace(-1, 1, 256))
-    R = np.sqrt((m_x)**2 + (m_y)**2)
-    R *= 9/R.max()
-    irl_norm = mc.Normalize(0.5, 5)
-
-    for i in range(1, 10):
-
-        circle = plt.Circle((0, 0),
-                            i,
-                            edgecolor=fc,
-                            facecolor=None,
-                            zorder=None,
-                            fill=False,
-                            linestyle=':')
-        ax.add_patch(circle)
-
-    # Plot spokes and labels.
-    for irl_cat, irl_label in zip(irl_cats, irl_labels):
-
-        x = np.cos(irl_cat)*10
-        y = np.sin(irl_cat)*10
-        ax.plot([x, 0], [y, 0], color=fc, linestyle=':', linewidth=0.5)
-
-        # IRL labels.
-        rotation = int(np.rad2deg(irl_cat)-90)
-
-        if rotation == 180:
-
-            ax.text(x,
-                    y,
-                    irl_label.replace(" ", "\n")+"\n\n",
-                    size=8,
-                    rotation=0,
-                    ha="center",
-                    va="top",
-                    color=fc)
-
-        else:
-
-            ax.text(x,
-                    y,
-                    irl_label.replace(" ", "\n")+"\n\n",
-                    size=8,
-                    rotation=rotation,
-                    ha="center",
-                    va="center",
-                    color=fc)
-
-    # Calculate IRL positions values.
-    for irl_val, irl_cat in zip(irl_vals, irl_cats):
-
-        x = np.cos(irl_cat)*irl_val
-        y = np.sin(irl_cat)*irl_val
-
-        xs.append(x)
-        ys.append(y)
-
-        # Level labels.
-        ax.text(x,
-                y,
-                "%d" % irl_val,
-                size=8,
-                ha="center",
-                va="center",
-                color=fc,
-                path_effects=[pe.withStroke(linewidth=2,
-                                            foreground=fg)])
-
-    xs.append(xs[0])
-    ys.append(ys[0])
-
-    if irl_data.plot_targets or targets:
-
-        for irl_t_val, irl_cat in zip(irl_targets, irl_cats):
-
-            xt = np.cos(irl_cat)*irl_t_val
-            yt = np.sin(irl_cat)*irl_t_val
-            xts.append(xt)
-            yts.append(yt)
-
-        xts.append(xts[0])
-        yts.append(yts[0])
-
-        # Adding average values between the levels for better smoothing.
-        for i in range(len(xs)):
-
-            if i < len(xs)-1:
-
-                sxts.append(xts[i])
-                syts.append(yts[i])
-                sxts.append((xts[i]+xts[i+1])/2.0)
-                syts.append((yts[i]+yts[i+1])/2.0)
-
-        sxts.append(sxts[0])
-        syts.append(syts[0])
-
-        # Smooth IRL target levels
-        orig_t_len = len(sxts)
-        sxts = sxts[-3:-1] + sxts + sxts[1:3]
-        syts = syts[-3:-1] + syts + syts[1:3]
-        tt = np.arange(len(sxts))
-        tti = np.linspace(2, orig_t_len+1, 10 * orig_t_len)
-        xti = interp1d(tt, sxts, kind='cubic')(tti)
-        yti = interp1d(tt, syts, kind='cubic')(tti)
-        irl_t = patches.Polygon(np.asarray([xti, yti]).T,
-                                linestyle='--',
-                                fill=False)
-
-    if smooth:
-
-        # Adding average values between the levels for better smoothing.
-        for i in range(len(xs)):
-
-            if i < len(xs)-1:
-
-                sxs.append(xs[i])
-                sys.append(ys[i])
-                sxs.append((xs[i]+xs[i+1])/2.0)
-                sys.append((ys[i]+ys[i+1])/2.0)
-
-        sxs.append(sxs[0])
-        sys.append(sys[0])
-
-        # Smooth IRL levels.
-        orig_len = len(sxs)
-        sxs = sxs[-3:-1] + sxs + sxs[1:3]
-        sys = sys[-3:-1] + sys + sys[1:3]
-        t = np.arange(len(sxs))
-        ti = np.linspace(2, orig_len+1, 10 * orig_len)
-        xi = interp1d(t, sxs, kind='cubic')(ti)
-        yi = interp1d(t, sys, kind='cubic')(ti)
-        irl = patches.Polygon(np.asarray([xi, yi]).T, fill=False)
-
-    else:
-
-        irl = patches.Polygon(np.asarray([xs, ys]).T, fill=False)
-        irl_t = patches.Polygon(np.asarray([xts, yts]).T,
-                                fill=False,
-                                ec=(1, 0, 1, 0.5),
-                                fc=(1, 0, 1, 0.5),
-                                color=(1, 0, 1, 0.5))
-        irl_t.set_edge_color('w')
-        irl_t.set_face_color('w')
-        irl_t.set_color('w')
-
-    if irl_data.plot_targets or targets:
-
-        ax.add_patch(irl_t)
-        ax.imshow(R,
-                  cmap=IRL_CMAP,
-                  norm=irl_norm,
-                  extent=(-9, 9, -9, 9),
-                  origin="lower",
-                  clip_on=True,
-                  clip_path=irl_t,
-                  alpha=0.333)
-
-    ax.add_patch(irl)
-    ax.imshow(R,
-              cmap=IRL_CMAP,
-              norm=irl_norm,
-              extent=(-9, 9, -9, 9),
-              origin="lower",
-              clip_on=True,
-              clip_path=irl,
-              alpha=0.999)
-    ax.set_xlim([-10, 10])
-    ax.set_ylim([-10, 10])
-    ax.set_aspect('equal', adjustable='box')
-    fig.patch.set_facecolor('none')
-    ax.patch.set_facecolor('none')
-    plt.axis('off')
-
-    return fig
-
-
-def plot_irl_progress(irl0, irl1, smooth=False, dark_mode=True):
-
-    if dark_mode:
-
-        fc = '#E5E8EE'
-        fg = '#222834'
-
-    else:
-
-        fc = 'black'
-        fg = 'white'
-
-    fig, ax = plt.subplots()
-    irl_norm = mc.Normalize(0, 9)
-
-    irl0 = [irl0.crl,
-            irl0.trl,
-            irl0.brl,
-            irl0.iprl,
-            irl0.tmrl,
-            irl0.frl]
-
-    # Get the mean for the fill color.
-    irl0_mean = irl_norm(mean(irl0))
-
-    irl1 = [irl1.crl,
-            irl1.trl,
-            irl1.brl,
-            irl1.iprl,
-            irl1.tmrl,
-            irl1.frl]
-
-    # Get the mean for fill color.
-    irl1_mean = irl_norm(mean(irl1))
-
-    irl_labels = ['Customer Readiness Level',
-                  'Technology Readiness Level',
-                  'Business Model Readiness Level',
-                  'IPR Readiness Level',
-                  'Team Readiness Level',
-                  'Funding Readiness Level']
-
-    irl_cats = np.arange(-2*np.pi+np.pi/2, np.pi/2, np.pi/3)*-1
-    irl_cats += np.pi
-    x0s = []
-    y0s = []
-    x1s = []
-    y1s = []
-
-    m_x, m_y = np.meshgrid(np.linspace(-1, 1, 256), np.linspace(-1, 1, 256))
-    R = np.sqrt((m_x)**2 + (m_y)**2)
-    R *= 9/R.max()
-
-    for i in range(1, 10):
-
-        circle = plt.Circle((0, 0),
-                            i,
-                            edgecolor=fc,
-                            facecolor=None,
-                            zorder=None,
-                            fill=False,
-                            linestyle=':')
-        ax.add_patch(circle)
-
-    # Plot spokes and labels.
-    for irl_cat, irl_label in zip(irl_cats, irl_labels):
-
-        x = np.cos(irl_cat)*10
-        y = np.sin(irl_cat)*10
-        ax.plot([x, 0],
-                [y, 0],
-                color=fc,
-                linestyle=':',
-                linewidth=0.5)
-
-        # IRL labels.
-        rotation = int(np.rad2deg(irl_cat)-90)
-
-        if rotation == 180:
-
-            ax.text(x,
-                    y,
-                    irl_label.replace(" ", "\n")+"\n\n",
-                    size=8,
-                    rotation=0,
-                    ha="center",
-                    va="top",
-                    color=fc)
-
-        else:
-
-            ax.text(x,
-                    y,
-                    irl_label.replace(" ", "\n")+"\n\n",
-                    size=8,
-                    rotation=rotation,
-                    ha="center",
-                    va="center",
-                    color=fc)
-
-    # Calculate IRL positions values.
-    for irl0_val, irl1_val, irl_cat in zip(irl0, irl1, irl_cats):
-
-        x0 = np.cos(irl_cat)*irl0_val
-        y0 = np.sin(irl_cat)*irl0_val
-        x1 = np.cos(irl_cat)*irl1_val
-        y1 = np.sin(irl_cat)*irl1_val
-
-        x0s.append(x0)
-        y0s.append(y0)
-        x1s.append(x1)
-        y1s.append(y1)
-
-        # Level labels.
-        ax.text(x1,
-                y1,
-                "%d" % irl1_val,
-                size=8,
-                ha="center",
-                va="center",
-                color=fc,
-                path_effects=[pe.withStroke(linewidth=2,
-                                            foreground=fg)])
-
-    x0s.append(x0s[0])
-    y0s.append(y0s[0])
-    x1s.append(x1s[0])
-    y1s.append(y1s[0])
-
-    if smooth:
-
-        sx0s = []
-        sy0s = []
-        sx1s = []
-        sy1s = []
-
-        # Adding average values between the levels for better smoothing.
-        for i in range(len(x0s)):
-
-            if i < len(x0s)-1:
-
-                sx0s.append(x0s[i])
-                sy0s.append(y0s[i])
-                sx0s.append((x0s[i]+x0s[i+1])/2.0)
-                sy0s.append((y0s[i]+y0s[i+1])/2.0)
-
-                sx1s.append(x1s[i])
-                sy1s.append(y1s[i])
-                sx1s.append((x1s[i]+x1s[i+1])/2.0)
-                sy1s.append((y1s[i]+y1s[i+1])/2.0)
-
-        sx0s.append(sx0s[0])
-        sy0s.append(sy0s[0])
-        sx1s.append(sx1s[0])
-        sy1s.append(sy1s[0])
-
-        # Smooth IRL0 levels.
-        orig_len = len(sx0s)
-        sx0s = sx0s[-3:-1] + sx0s + sx0s[1:3]
-        sy0s = sy0s[-3:-1] + sy0s + sy0s[1:3]
-        t = np.arange(len(sx0s))
-        ti = np.linspace(2, orig_len+1, 10 * orig_len)
-        xi = interp1d(t, sx0s, kind='cubic')(ti)
-        yi = interp1d(t, sy0s, kind='cubic')(ti)
-
-        # Smooth IRL1 levels
-        orig_t_len = len(sx1s)
-        sx1s = sx1s[-3:-1] + sx1s + sx1s[1:3]
-        sy1s = sy1s[-3:-1] + sy1s + sy1s[1:3]
-        tt = np.arange(len(sx1s))
-        tti = np.linspace(2, orig_t_len+1, 10 * orig_t_len)
-        xti = interp1d(tt, sx1s, kind='cubic')(tti)
-        yti = interp1d(tt, sy1s, kind='cubic')(tti)
-
-        # Previous IRL.
-        irl0 = patches.Polygon(np.asarray([xi, yi]).T,
-                               facecolor=IRL_CMAP(irl0_mean),
-                               edgecolor='black',
-                               linestyle='--',
-                               alpha=0.888)
-
-        irl1 = patches.Polygon(np.asarray([xti, yti]).T,
-                               facecolor=IRL_CMAP(irl1_mean),
-                               edgecolor='black',
-                               alpha=0.888)
-
-    else:
-
-        irl0 = patches.Polygon(np.asarray([x0s, y0s]).T, fill=False)
-        irl0.set_edge_color(IRL_CMAP(irl0_mean))
-        irl0.set_face_color(IRL_CMAP(irl0_mean))
-        irl0.set_color(IRL_CMAP(irl0_mean))
-        irl1 = patches.Polygon(np.asarray([x1s, y1s]).T,
-                               fill=False,
-                               ec=(1, 0, 1, 0.5),
-                               fc=(1, 0, 1, 0.5),
-                               color=(1, 0, 1, 0.5))
-
-    ax.add_patch(irl1)
-    ax.add_patch(irl0)
-
-    ax.set_xlim([-10, 10])
-    ax.set_ylim([-10, 10])
-    ax.set_aspect('equal', adjustable='box')
-    fig.patch.set_facecolor('none')
-    ax.patch.set_facecolor('none')
-    plt.axis('off')
-
-    return fig
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) Lodve Berre and NTNU Technology Transfer AS 2024.
+
+This file is part of Really Nice IRL.
+
+Really Nice IRL is free software: you can redistribute it and/or modify it
+under the terms of the GNU Affero General Public License as published by the
+Free Software Foundation, either version 3 of the License, or (at your option)
+ any later version.
+
+Really Nice IRL is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with Really Nice IRL. If not, see:
+<https://www.gnu.org/licenses/agpl-3.0.html>.
+"""
+
+import hashlib
+import io
+import matplotlib.colors as mc
+import matplotlib.patches as patches
+import matplotlib.patheffects as pe
+import multiprocessing
+import numpy as np
+import os
+import threading
+
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from scipy.interpolate import interp1d
+from statistics import mean
+from types import SimpleNamespace
+
+
+IRL_CMAP = mc.LinearSegmentedColormap.from_list("IRL_CMAP",
+                                                [(0.0000, "#A8202F"),
+                                                 (0.1111, "#A8202F"),
+                                                 (0.2222, "#D66016"),
+                                                 (0.3333, "#F99B08"),
+                                                 (0.4444, "#FCB927"),
+                                                 (0.5555, "#FDDE16"),
+                                                 (0.6666, "#D5D311"),
+                                                 (0.7777, "#71AF34"),
+                                                 (0.8888, "#37913B"),
+                                                 (0.9999, "#37953B"),
+                                                 (1.0000, "#37953B")])
+
+IRL_LABELS = ['Customer Readiness Level',
+              'Technology Readiness Level',
+              'Business Model Readiness Level',
+              'IPR Readiness Level',
+              'Team Readiness Level',
+              'Funding Readiness Level']
+
+# Spoke angles, CRL at the top and then clockwise.
+IRL_CATS = np.arange(-2*np.pi+np.pi/2, np.pi/2, np.pi/3)*-1 + np.pi
+
+# Points per spline segment of a smoothed outline.
+SMOOTH_SAMPLES = 10
+
+
+def _smoothing_basis(samples=SMOOTH_SAMPLES):
+    """
+    Linear map from the six levels to the points of a smoothed outline.
+
+    The outline runs through the levels and the midpoints between
+    neighbouring levels, padded by two points on either side to close it,
+    and is interpolated by a cubic spline. Spline interpolation is linear
+    in the values interpolated, so interpolating the unit vectors once
+    gives the basis for every outline.
+
+    Parameters
+    ----------
+    samples : int, optional
+        Points per spline segment. The default is SMOOTH_SAMPLES.
+
+    Returns
+    -------
+    basis_x, basis_y : numpy.ndarray
+        (13*samples, 6) arrays, so that basis_x @ levels and
+        basis_y @ levels are the x and y coordinates of the outline.
+
+    """
+    unit = np.eye(6)
+    knots = []
+
+    for i in range(6):
+
+        knots.append(unit[i])
+        knots.append((unit[i] + unit[(i+1) % 6])/2.0)
+
+    knots.append(knots[0])
+    n_knots = len(knots)
+    knots = knots[-3:-1] + knots + knots[1:3]
+    t = np.arange(len(knots))
+    ti = np.linspace(2, n_knots+1, samples * n_knots)
+    basis = interp1d(t, np.asarray(knots), kind='cubic', axis=0)(ti)
+
+    return basis*np.cos(IRL_CATS), basis*np.sin(IRL_CATS)
+
+
+SMOOTH_BASIS_X, SMOOTH_BASIS_Y = _smoothing_basis()
+
+
+def smooth_outline(levels):
+    """
+    Smoothed outline of one or many sets of IRL levels.
+
+    Parameters
+    ----------
+    levels : array_like
+        The six levels, CRL to FRL, or an (n, 6) array of them, e.g. a
+        whole portfolio.
+
+    Returns
+    -------
+    xs, ys : numpy.ndarray
+        Outline coordinates, with shape (points,) or (n, points).
+
+    """
+    levels = np.asarray(levels, dtype=float)
+
+    return levels @ SMOOTH_BASIS_X.T, levels @ SMOOTH_BASIS_Y.T
+
+
+# Resolution the charts are encoded at, as st.pyplot does.
+DPI = 200
+
+# Static chart layers per theme, see _scaffold.
+_scaffolds = {}
+_scaffolds_lock = threading.Lock()
+
+
+def _theme(dark_mode):
+    """
+    Foreground and outline colours for the theme.
+    """
+
+    if dark_mode:
+
+        return '#E5E8EE', '#222834'
+
+    else:
+
+        return 'black', 'white'
+
+
+def _draw_scaffold(ax, fc):
+    """
+    Draw the level circles, spokes and IRL labels.
+    """
+
+    for i in range(1, 10):
+
+        circle = patches.Circle((0, 0),
+                                i,
+                                edgecolor=fc,
+                                facecolor=None,
+                                zorder=None,
+                                fill=False,
+                                linestyle=':')
+        ax.add_patch(circle)
+
+    # Plot spokes and labels.
+    for irl_cat, irl_label in zip(IRL_CATS, IRL_LABELS):
+
+        x = np.cos(irl_cat)*10
+        y = np.sin(irl_cat)*10
+        ax.plot([x, 0], [y, 0], color=fc, linestyle=':', linewidth=0.5)
+
+        # IRL labels.
+        rotation = int(np.rad2deg(irl_cat)-90)
+
+        if rotation == 180:
+
+            ax.text(x,
+                    y,
+                    irl_label.replace(" ", "\n")+"\n\n",
+                    size=8,
+                    rotation=0,
+                    ha="center",
+                    va="top",
+                    color=fc)
+
+        else:
+
+            ax.text(x,
+                    y,
+                    irl_label.replace(" ", "\n")+"\n\n",
+                    size=8,
+                    rotation=rotation,
+                    ha="center",
+                    va="center",
+                    color=fc)
+
+
+def _scaffold(dark_mode):
+    """
+    The static part of the radar chart for a theme, rendered once per
+    process: the chart extent and a raster of the circles, spokes and IRL
+    labels.
+
+    The extent is the area a default figure would keep when saved with
+    bbox_inches='tight', so charts keep their size and proportions while
+    every render can skip the extra layout pass.
+
+    Returns
+    -------
+    scaffold : dict
+        'extent' (x0, x1, y0, y1) in data units, 'size' (width, height) in
+        inches, 'under' (circles and labels) and 'over' (spokes) as RGBA
+        arrays covering the extent, and 'gradient' as an RGBA array to be
+        placed at the pixel 'offset'.
+
+    """
+    scaffold = _scaffolds.get(bool(dark_mode), None)
+
+    if scaffold is not None:
+
+        return scaffold
+
+    with _scaffolds_lock:
+
+        if bool(dark_mode) in _scaffolds:
+
+            return _scaffolds[bool(dark_mode)]
+
+        fc, _ = _theme(dark_mode)
+
+        # Lay out a default sized chart to find the extent.
+        fig = Figure()
+        canvas = FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        _draw_scaffold(ax, fc)
+        ax.set_xlim([-10, 10])
+        ax.set_ylim([-10, 10])
+        ax.set_aspect('equal', adjustable='box')
+        ax.axis('off')
+        canvas.draw()
+        pad = 0.1*fig.dpi
+        bbox = fig.get_tightbbox().transformed(fig.dpi_scale_trans)
+        bbox = bbox.padded(pad).transformed(ax.transData.inverted())
+        extent = (bbox.x0, bbox.x1, bbox.y0, bbox.y1)
+        inch_per_unit = ax.get_window_extent().width/fig.dpi/20
+        size = ((bbox.x1 - bbox.x0)*inch_per_unit,
+                (bbox.y1 - bbox.y0)*inch_per_unit)
+
+        # Render the layer at the final size.
+        fig = Figure(figsize=size, dpi=DPI)
+        canvas = FigureCanvasAgg(fig)
+        ax = _chart_axes(fig, extent)
+        _draw_scaffold(ax, fc)
+        fig.patch.set_facecolor('none')
+
+        # The spokes are drawn above the outlines, the circles below.
+        layers = {}
+
+        for name, spokes in (('under', False), ('over', True)):
+
+            for line in ax.lines:
+
+                line.set_visible(spokes)
+
+            for artist in [*ax.patches, *ax.texts]:
+
+                artist.set_visible(not spokes)
+
+            canvas.draw()
+            layers[name] = np.asarray(canvas.buffer_rgba()).copy()
+
+        # Radial gradient over the level 9 square, in output pixels.
+        (x0, y0), (x1, y1) = np.rint(ax.transData.transform([(-9, -9),
+                                                             (9, 9)]))
+        m_x, m_y = np.meshgrid(np.linspace(-9, 9, int(x1 - x0)),
+                               np.linspace(-9, 9, int(y1 - y0)))
+        gradient = np.sqrt(m_x**2 + m_y**2)/np.sqrt(2)
+        gradient = IRL_CMAP(mc.Normalize(0.5, 5)(gradient), bytes=True)
+
+        scaffold = {'extent': extent,
+                    'size': size,
+                    'gradient': gradient,
+                    'offset': (int(x0), int(y0)),
+                    **layers}
+        _scaffolds[bool(dark_mode)] = scaffold
+
+    return scaffold
+
+
+def _chart_axes(fig, extent):
+    """
+    Axes covering the whole figure and showing exactly the chart extent.
+    """
+    ax = fig.add_axes([0, 0, 1, 1])
+    ax.set_xlim(extent[0], extent[1])
+    ax.set_ylim(extent[2], extent[3])
+    ax.axis('off')
+    ax.patch.set_facecolor('none')
+
+    return ax
+
+
+def _irl_chart(dark_mode):
+    """
+    New figure with the cached static layers of the theme in place.
+
+    Figures are created on an Agg canvas of their own rather than through
+    pyplot, so no global figure registry keeps them alive between reruns.
+    The circles and labels are placed below the axes and the spokes above
+    them, as pixel aligned figure images instead of being drawn again.
+
+    Returns
+    -------
+    fig : matplotlib.figure.Figure
+        The chart figure.
+    ax : matplotlib.axes.Axes
+        Axes for the outlines and level labels.
+
+    """
+    scaffold = _scaffold(dark_mode)
+    fig = Figure(figsize=scaffold['size'], dpi=DPI)
+    FigureCanvasAgg(fig)
+    fig.figimage(scaffold['under'], origin='upper', zorder=0.5)
+    ax = _chart_axes(fig, scaffold['extent'])
+    ax.set_zorder(1)
+    fig.figimage(scaffold['over'], origin='upper', zorder=1.5)
+    fig.patch.set_facecolor('none')
+
+    return fig, ax
+
+
+def _fill_gradient(fig, dark_mode, outline, alpha):
+    """
+    Fill an outline, already added to the chart axes, with the cached
+    radial gradient below the circles.
+    """
+    scaffold = _scaffold(dark_mode)
+    xo, yo = scaffold['offset']
+    fig.figimage(scaffold['gradient'],
+                 xo,
+                 yo,
+                 alpha=alpha,
+                 origin='lower',
+                 zorder=0.25,
+                 clip_path=outline)
+
+
+def plot_irl(irl_data, smooth=False, dark_mode=True, targets=False):
+
+    fc, fg = _theme(dark_mode)
+    fig, ax = _irl_chart(dark_mode)
+
+    irl_vals = [irl_data.crl,
+                irl_data.trl,
+                irl_data.brl,
+                irl_data.iprl,
+                irl_data.tmrl,
+                irl_data.frl]
+
+    irl_targets = [irl_data.crl_target,
+                   irl_data.trl_target,
+                   irl_data.brl_target,
+                   irl_data.iprl_target,
+                   irl_data.tmrl_target,
+                   irl_data.frl_target]
+
+    irl_cats = IRL_CATS
+    xs = []
+    ys = []
+    xts = []
+    yts = []
+
+    # Calculate IRL positions values.
+    for irl_val, irl_cat in zip(irl_vals, irl_cats):
+
+        x = np.cos(irl_cat)*irl_val
+        y = np.sin(irl_cat)*irl_val
+
+        xs.append(x)
+        ys.append(y)
+
+        # Level labels.
+        ax.text(x,
+                y,
+                "%d" % irl_val,
+                size=8,
+                ha="center",
+                va="center",
+                color=fc,
+                path_effects=[pe.withStroke(linewidth=2,
+                                            foreground=fg)])
+
+    xs.append(xs[0])
+    ys.append(ys[0])
+
+    if irl_data.plot_targets or targets:
+
+        for irl_t_val, irl_cat in zip(irl_targets, irl_cats):
+
+            xt = np.cos(irl_cat)*irl_t_val
+            yt = np.sin(irl_cat)*irl_t_val
+            xts.append(xt)
+            yts.append(yt)
+
+        xts.append(xts[0])
+        yts.append(yts[0])
+
+        # Smooth IRL target levels
+        xti, yti = smooth_outline(irl_targets)
+        irl_t = patches.Polygon(np.asarray([xti, yti]).T,
+                                linestyle='--',
+                                fill=False)
+
+    if smooth:
+
+        # Smooth IRL levels.
+        xi, yi = smooth_outline(irl_vals)
+        irl = patches.Polygon(np.asarray([xi, yi]).T, fill=False)
+
+    else:
+
+        irl = patches.Polygon(np.asarray([xs, ys]).T, fill=False)
+        irl_t = patches.Polygon(np.asarray([xts, yts]).T,
+                                fill=False,
+                                ec=(1, 0, 1, 0.5),
+                                fc=(1, 0, 1, 0.5),
+                                color=(1, 0, 1, 0.5))
+        irl_t.set_edgecolor('w')
+        irl_t.set_facecolor('w')
+        irl_t.set_color('w')
+
+    if irl_data.plot_targets or targets:
+
+        ax.add_patch(irl_t)
+        _fill_gradient(fig, dark_mode, irl_t, 0.333)
+
+    ax.add_patch(irl)
+    _fill_gradient(fig, dark_mode, irl, 0.999)
+
+    return fig
+
+
+def plot_irl_progress(irl0, irl1, smooth=False, dark_mode=True):
+
+    fc, fg = _theme(dark_mode)
+    fig, ax = _irl_chart(dark_mode)
+    irl_norm = mc.Normalize(0, 9)
+
+    irl0 = [irl0.crl,
+            irl0.trl,
+            irl0.brl,
+            irl0.iprl,
+            irl0.tmrl,
+            irl0.frl]
+
+    # Get the mean for the fill color.
+    irl0_mean = irl_norm(mean(irl0))
+
+    irl1 = [irl1.crl,
+            irl1.trl,
+            irl1.brl,
+            irl1.iprl,
+            irl1.tmrl,
+            irl1.frl]
+
+    # Get the mean for fill color.
+    irl1_mean = irl_norm(mean(irl1))
+
+    irl_cats = IRL_CATS
+    x0s = []
+    y0s = []
+    x1s = []
+    y1s = []
+
+    # Calculate IRL positions values.
+    for irl0_val, irl1_val, irl_cat in zip(irl0, irl1, irl_cats):
+
+        x0 = np.cos(irl_cat)*irl0_val
+        y0 = np.sin(irl_cat)*irl0_val
+        x1 = np.cos(irl_cat)*irl1_val
+        y1 = np.sin(irl_cat)*irl1_val
+
+        x0s.append(x0)
+        y0s.append(y0)
+        x1s.append(x1)
+        y1s.append(y1)
+
+        # Level labels.
+        ax.text(x1,
+                y1,
+                "%d" % irl1_val,
+                size=8,
+                ha="center",
+                va="center",
+                color=fc,
+                path_effects=[pe.withStroke(linewidth=2,
+                                            foreground=fg)])
+
+    x0s.append(x0s[0])
+    y0s.append(y0s[0])
+    x1s.append(x1s[0])
+    y1s.append(y1s[0])
+
+    if smooth:
+
+        # Smooth IRL0 and IRL1 levels in one go.
+        (xi, xti), (yi, yti) = smooth_outline([irl0, irl1])
+
+        # Previous IRL.
+        irl0 = patches.Polygon(np.asarray([xi, yi]).T,
+                               facecolor=IRL_CMAP(irl0_mean),
+                               edgecolor='black',
+                               linestyle='--',
+                               alpha=0.888)
+
+        irl1 = patches.Polygon(np.asarray([xti, yti]).T,
+                               facecolor=IRL_CMAP(irl1_mean),
+                               edgecolor='black',
+                               alpha=0.888)
+
+    else:
+
+        irl0 = patches.Polygon(np.asarray([x0s, y0s]).T, fill=False)
+        irl0.set_edgecolor(IRL_CMAP(irl0_mean))
+        irl0.set_facecolor(IRL_CMAP(irl0_mean))
+        irl0.set_color(IRL_CMAP(irl0_mean))
+        irl1 = patches.Polygon(np.asarray([x1s, y1s]).T,
+                               fill=False,
+                               ec=(1, 0, 1, 0.5),
+                               fc=(1, 0, 1, 0.5),
+                               color=(1, 0, 1, 0.5))
+
+    ax.add_patch(irl1)
+    ax.add_patch(irl0)
+
+    return fig
+
+
+"""
+Render cache methods.
+"""
+
+# Byte budget for encoded charts kept in memory, shared by all sessions.
+RENDER_CACHE_BYTES = 32 * 1024 * 1024
+
+
+class RenderCache:
+    """
+    Least recently used cache of encoded charts, bounded by the total size
+    of the stored images rather than their number.
+    """
+
+    def __init__(self, max_bytes=RENDER_CACHE_BYTES):
+
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._images = OrderedDict()
+
+    def get(self, key):
+
+        with self._lock:
+
+            image = self._images.get(key, None)
+
+            if image is None:
+
+                self.misses += 1
+
+            else:
+
+                self.hits += 1
+                self._images.move_to_end(key)
+
+        return image
+
+    def __contains__(self, key):
+
+        # A peek, does not count as a hit or refresh the entry.
+        with self._lock:
+
+            return key in self._images
+
+    def put(self, key, image):
+
+        with self._lock:
+
+            if key in self._images:
+
+                return
+
+            # Never keep a single image larger than the whole budget.
+            if len(image) > self.max_bytes:
+
+                return
+
+            self._images[key] = image
+            self.nbytes += len(image)
+
+            while self.nbytes > self.max_bytes:
+
+                _, old_image = self._images.popitem(last=False)
+                self.nbytes -= len(old_image)
+                self.evictions += 1
+
+    def clear(self):
+
+        with self._lock:
+
+            self._images.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        """
+        Cache counters and size.
+
+        Returns
+        -------
+        stats : dict
+            hits, misses, evictions, number of images and their total bytes.
+
+        """
+
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'images': len(self._images),
+                'bytes': self.nbytes}
+
+
+render_cache = RenderCache()
+
+
+def render_key(*content):
+    """
+    Content address of a chart: a digest of everything that affects it.
+    """
+
+    return hashlib.sha1(repr(content).encode('utf-8')).hexdigest()
+
+
+def encode_figure(fig, fmt='png'):
+    """
+    Encode a chart figure and release it. The figure already has the size
+    st.pyplot would crop it to, so no tight bounding box pass is needed.
+
+    The figure is cleared afterwards, dropping its artists and image data
+    at once instead of whenever the garbage collector gets to the
+    reference cycles between them. It should not be used again.
+
+    Parameters
+    ----------
+    fig : matplotlib.figure.Figure
+        The figure to encode.
+    fmt : str, optional
+        'png' or 'svg'. The default is 'png'.
+
+    Returns
+    -------
+    image : bytes
+        The encoded figure.
+
+    """
+    buf = io.BytesIO()
+
+    try:
+
+        if fmt == 'png':
+
+            # Fast zlib level, the images are cached and sent only once.
+            fig.savefig(buf, format=fmt, dpi=DPI,
+                        pil_kwargs={'compress_level': 1})
+
+        else:
+
+            fig.savefig(buf, format=fmt, dpi=DPI)
+
+    finally:
+
+        fig.clear()
+
+    return buf.getvalue()
+
+
+def _irl_levels(irl_data):
+
+    return (irl_data.crl,
+            irl_data.trl,
+            irl_data.brl,
+            irl_data.iprl,
+            irl_data.tmrl,
+            irl_data.frl)
+
+
+def _irl_targets(irl_data):
+
+    return (irl_data.crl_target,
+            irl_data.trl_target,
+            irl_data.brl_target,
+            irl_data.iprl_target,
+            irl_data.tmrl_target,
+            irl_data.frl_target)
+
+
+def _irl_render_key(irl_data, smooth, dark_mode, targets, fmt):
+    """
+    Render cache key of a plot_irl chart.
+    """
+    plot_targets = bool(irl_data.plot_targets or targets)
+
+    # Targets only change the chart when they are plotted.
+    if plot_targets:
+
+        irl_targets = _irl_targets(irl_data)
+
+    else:
+
+        irl_targets = None
+
+    return render_key('irl', _irl_levels(irl_data), irl_targets,
+                      bool(smooth), bool(dark_mode), plot_targets, fmt)
+
+
+def render_irl(irl_data, smooth=False, dark_mode=True, targets=False,
+               fmt='png'):
+    """
+    Encoded plot_irl chart, served from the render cache when the same
+    chart has been drawn before.
+
+    Parameters
+    ----------
+    irl_data : IRLAssessment
+        The assessment to plot.
+    smooth : bool, optional
+        Smooth the IRL outline. The default is False.
+    dark_mode : bool, optional
+        Use the dark theme colours. The default is True.
+    targets : bool, optional
+        Plot target levels even if the assessment does not ask for it.
+        The default is False.
+    fmt : str, optional
+        'png' or 'svg'. The default is 'png'.
+
+    Returns
+    -------
+    image : bytes
+        The encoded chart.
+
+    """
+    key = _irl_render_key(irl_data, smooth, dark_mode, targets, fmt)
+    image = render_cache.get(key)
+
+    if image is None:
+
+        fig = plot_irl(irl_data, smooth, dark_mode, targets)
+        image = encode_figure(fig, fmt)
+        render_cache.put(key, image)
+
+    return image
+
+
+def render_irl_progress(irl0, irl1, smooth=False, dark_mode=True,
+                        fmt='png'):
+    """
+    Encoded plot_irl_progress chart, served from the render cache when the
+    same chart has been drawn before.
+
+    Parameters
+    ----------
+    irl0 : IRLAssessment
+        The previous assessment.
+    irl1 : IRLAssessment
+        The current assessment.
+    smooth : bool, optional
+        Smooth the IRL outlines. The default is False.
+    dark_mode : bool, optional
+        Use the dark theme colours. The default is True.
+    fmt : str, optional
+        'png' or 'svg'. The default is 'png'.
+
+    Returns
+    -------
+    image : bytes
+        The encoded chart.
+
+    """
+    key = render_key('progress', _irl_levels(irl0), _irl_levels(irl1),
+                     bool(smooth), bool(dark_mode), fmt)
+    image = render_cache.get(key)
+
+    if image is None:
+
+        fig = plot_irl_progress(irl0, irl1, smooth, dark_mode)
+        image = encode_figure(fig, fmt)
+        render_cache.put(key, image)
+
+    return image
+
+
+"""
+Batch render methods.
+"""
+
+# Default number of render processes for render_irl_batch.
+RENDER_WORKERS = min(4, os.cpu_count() or 1)
+
+_render_pool = None
+_render_pool_workers = 0
+_render_pool_lock = threading.Lock()
+
+
+def _get_render_pool(workers):
+    """
+    The process pool for batch renders, shared by all sessions and
+    recreated only when the worker count changes.
+
+    Workers are spawned rather than forked, as forking the multithreaded
+    server process is not safe. Each worker builds its own scaffolds once.
+    """
+    global _render_pool, _render_pool_workers
+
+    with _render_pool_lock:
+
+        if _render_pool is None or _render_pool_workers != workers:
+
+            if _render_pool is not None:
+
+                _render_pool.shutdown(wait=False)
+
+            context = multiprocessing.get_context('spawn')
+            _render_pool = ProcessPoolExecutor(workers, mp_context=context)
+            _render_pool_workers = workers
+
+        return _render_pool
+
+
+def _chart_data(irl_data):
+    """
+    The fields plot_irl uses, as a small picklable object to send to the
+    render processes instead of an ORM instance.
+    """
+    levels = _irl_levels(irl_data)
+    irl_targets = _irl_targets(irl_data)
+
+    return SimpleNamespace(crl=levels[0],
+                           trl=levels[1],
+                           brl=levels[2],
+                           iprl=levels[3],
+                           tmrl=levels[4],
+                           frl=levels[5],
+                           crl_target=irl_targets[0],
+                           trl_target=irl_targets[1],
+                           brl_target=irl_targets[2],
+                           iprl_target=irl_targets[3],
+                           tmrl_target=irl_targets[4],
+                           frl_target=irl_targets[5],
+                           plot_targets=irl_data.plot_targets)
+
+
+def _render_irl_job(job):
+    """
+    Render one chart of a batch, in a render process.
+    """
+    irl_data, smooth, dark_mode, targets, fmt = job
+
+    return encode_figure(plot_irl(irl_data, smooth, dark_mode, targets), fmt)
+
+
+def render_irl_batch(assessments, smooth=False, dark_mode=True,
+                     targets=False, fmt='png', workers=None):
+    """
+    Encoded plot_irl charts for many assessments, rendered concurrently in
+    a process pool. Charts in the render cache are not drawn again, and
+    new charts are added to it.
+
+    Parameters
+    ----------
+    assessments : list of IRLAssessment
+        The assessments to plot.
+    smooth : bool, optional
+        Smooth the IRL outlines. The default is False.
+    dark_mode : bool, optional
+        Use the dark theme colours. The default is True.
+    targets : bool, optional
+        Plot target levels even if an assessment does not ask for it.
+        The default is False.
+    fmt : str, optional
+        'png' or 'svg'. The default is 'png'.
+    workers : int, optional
+        Number of render processes, 1 renders in this process. The default
+        is RENDER_WORKERS.
+
+    Returns
+    -------
+    images : list of bytes
+        The encoded charts, in the order of the assessments.
+
+    """
+    if workers is None:
+
+        workers = RENDER_WORKERS
+
+    keys = [_irl_render_key(irl_data, smooth, dark_mode, targets, fmt)
+            for irl_data in assessments]
+    images = [render_cache.get(key) for key in keys]
+
+    # Identical charts are only rendered once.
+    pending = {}
+
+    for i, (key, image) in enumerate(zip(keys, images)):
+
+        if image is None:
+
+            pending.setdefault(key, []).append(i)
+
+    jobs = [(_chart_data(assessments[cells[0]]),
+             bool(smooth),
+             bool(dark_mode),
+             targets,
+             fmt) for cells in pending.values()]
+
+    if workers > 1 and len(jobs) > 1:
+
+        rendered = _get_render_pool(workers).map(_render_irl_job, jobs)
+
+    else:
+
+        rendered = map(_render_irl_job, jobs)
+
+    for (key, cells), image in zip(pending.items(), rendered):
+
+        render_cache.put(key, image)
+
+        for i in cells:
+
+            images[i] = image
+
+    return images
+
+
+# Charts being rendered by prefetch_irl_batch.
+_prefetching = set()
+_prefetching_lock = threading.Lock()
+
+
+def _prefetch_job(charts, keys, smooth, dark_mode, targets, fmt, workers):
+
+    try:
+
+        render_irl_batch(charts, smooth, dark_mode, targets, fmt, workers)
+
+    finally:
+
+        with _prefetching_lock:
+
+            _prefetching.difference_update(keys)
+
+
+def prefetch_irl_batch(assessments, smooth=False, dark_mode=True,
+                       targets=False, fmt='png', workers=None):
+    """
+    Render charts into the render cache in a background thread, e.g. for
+    the next page of a portfolio, so a later render_irl_batch call for
+    them is served from the cache.
+
+    Charts already cached or being prefetched are skipped. Parameters as
+    for render_irl_batch.
+
+    Returns
+    -------
+    thread : threading.Thread
+        The prefetching thread, None if there was nothing to render.
+
+    """
+    charts = []
+    keys = set()
+
+    with _prefetching_lock:
+
+        for irl_data in assessments:
+
+            key = _irl_render_key(irl_data, smooth, dark_mode, targets, fmt)
+
+            if key in render_cache or key in _prefetching or key in keys:
+
+                continue
+
+            # Snapshot the levels here, not in the thread.
+            charts.append(_chart_data(irl_data))
+            keys.add(key)
+
+        _prefetching.update(keys)
+
+    if not charts:
+
+        return None
+
+    thread = threading.Thread(target=_prefetch_job,
+                              args=(charts, keys, smooth, dark_mode,
+                                    targets, fmt, workers),
+                              daemon=True)
+    thread.start()
+
+    return thread
+
+
+"""
+Vega-Lite chart methods.
+"""
+
+# Size of the interactive charts in pixels.
+VL_SIZE = 360
+
+# Data range shown by the interactive charts, room for the IRL labels.
+VL_DOMAIN = [-13.5, 13.5]
+
+# Colour stops of the radial gradient, as radius / gradient radius.
+VL_STOPS = np.linspace(0, 1, 12)
+
+# The gradient reaches the top of IRL_CMAP at this radius, see _scaffold.
+VL_GRADIENT_RADIUS = 5.5*np.sqrt(2)
+
+
+# Position encoding shared by all layers, with equal fixed scales.
+VL_POSITION = {channel: {'field': channel,
+                         'type': 'quantitative',
+                         'scale': {'domain': VL_DOMAIN},
+                         'axis': None} for channel in ('x', 'y')}
+
+
+def _vl_points(xs, ys):
+    """
+    Outline points as inline data, in drawing order.
+    """
+
+    return {'values': [{'x': round(float(x), 3),
+                        'y': round(float(y), 3),
+                        'i': i} for i, (x, y) in enumerate(zip(xs, ys))]}
+
+
+def _vl_knots(levels, smooth):
+    """
+    Points an outline is drawn through: the levels, and for a smooth
+    outline the midpoints between them as well, like smooth_outline.
+    """
+    levels = np.asarray(levels, dtype=float)
+    xs = np.cos(IRL_CATS)*levels
+    ys = np.sin(IRL_CATS)*levels
+
+    if smooth:
+
+        xs = np.column_stack([xs, (xs + np.roll(xs, -1))/2.0]).ravel()
+        ys = np.column_stack([ys, (ys + np.roll(ys, -1))/2.0]).ravel()
+
+    return xs, ys
+
+
+def _vl_gradient(xs, ys):
+    """
+    The IRL radial gradient as a Vega fill for an outline.
+
+    Vega places radial gradients relative to the bounding box of the mark
+    and scales the radius by its longest side, so the centre and radius
+    are expressed in those units for the given outline.
+    """
+    x0, x1 = np.min(xs), np.max(xs)
+    y0, y1 = np.min(ys), np.max(ys)
+    side = max(x1 - x0, y1 - y0)
+    cx = float(-x0/(x1 - x0))
+    cy = float(y1/(y1 - y0))
+    norm = mc.Normalize(0.5, 5)
+    stops = []
+
+    for offset in VL_STOPS:
+
+        level = offset*VL_GRADIENT_RADIUS/np.sqrt(2)
+        stops.append({'offset': round(float(offset), 3),
+                      'color': mc.to_hex(IRL_CMAP(norm(level)))})
+
+    return {'gradient': 'radial',
+            'x1': round(cx, 4),
+            'y1': round(cy, 4),
+            'r1': 0,
+            'x2': round(cx, 4),
+            'y2': round(cy, 4),
+            'r2': round(float(VL_GRADIENT_RADIUS/side), 4),
+            'stops': stops}
+
+
+def _vl_outline(levels, smooth, **mark):
+    """
+    Layer for one closed IRL outline.
+    """
+    xs, ys = _vl_knots(levels, smooth)
+    mark = {'type': 'line',
+            'interpolate': 'linear-closed',
+            'stroke': 'black',
+            'strokeWidth': 1,
+            **mark}
+
+    if smooth:
+
+        # Catmull-Rom, close to the cubic spline of smooth_outline.
+        mark.update(interpolate='cardinal-closed', tension=0)
+
+    return {'data': _vl_points(xs, ys),
+            'mark': mark,
+            'encoding': {'order': {'field': 'i', 'type': 'ordinal'}}}
+
+
+def _vl_level_labels(levels, fc, fg):
+    """
+    Layers for the level numbers on the spokes, on a dot of the
+    background colour.
+    """
+    xs, ys = _vl_knots(levels, False)
+    data = _vl_points(xs, ys)
+
+    for value, level in zip(data['values'], levels):
+
+        value['level'] = int(level)
+
+    return [{'data': data,
+             'mark': {'type': 'point',
+                      'filled': True,
+                      'size': 110,
+                      'color': fg,
+                      'opacity': 1},
+             'encoding': {}},
+            {'data': data,
+             'mark': {'type': 'text', 'fontSize': 11, 'color': fc},
+             'encoding': {'text': {'field': 'level', 'type': 'nominal'}}}]
+
+
+def _vl_scaffold(fc):
+    """
+    Layers for the level circles, spokes and IRL labels. The circles are
+    generated in the browser from a sequence.
+    """
+    circles = {'data': {'sequence': {'start': 0,
+                                     'stop': 9*73,
+                                     'as': 'n'}},
+               'transform': [{'calculate': 'floor(datum.n/73) + 1',
+                              'as': 'level'},
+                             {'calculate': '(datum.n % 73)*PI/36',
+                              'as': 'angle'},
+                             {'calculate': 'datum.level*cos(datum.angle)',
+                              'as': 'x'},
+                             {'calculate': 'datum.level*sin(datum.angle)',
+                              'as': 'y'}],
+               'mark': {'type': 'line',
+                        'stroke': fc,
+                        'strokeWidth': 1,
+                        'strokeDash': [1, 3]},
+               'encoding': {'detail': {'field': 'level', 'type': 'nominal'},
+                            'order': {'field': 'n', 'type': 'quantitative'}}}
+
+    spokes = []
+    labels = []
+
+    for irl_cat, irl_label in zip(IRL_CATS, IRL_LABELS):
+
+        x = round(float(np.cos(irl_cat)*10), 3)
+        y = round(float(np.sin(irl_cat)*10), 3)
+        spokes.append({'x': x, 'y': y, 'x2': 0, 'y2': 0})
+
+        # Same orientation as the labels of the plots, clockwise here.
+        rotation = int(np.rad2deg(irl_cat)-90)
+
+        if rotation == 180:
+
+            rotation = 0
+
+        labels.append({'x': round(float(np.cos(irl_cat)*11.8), 3),
+                       'y': round(float(np.sin(irl_cat)*11.8), 3),
+                       'label': irl_label,
+                       'angle': -rotation % 360})
+
+    spokes = {'data': {'values': spokes},
+              'mark': {'type': 'rule',
+                       'stroke': fc,
+                       'strokeWidth': 0.5,
+                       'strokeDash': [1, 2]},
+              'encoding': {'x2': {'field': 'x2'}, 'y2': {'field': 'y2'}}}
+    labels = {'data': {'values': labels},
+              'mark': {'type': 'text',
+                       'fontSize': 10,
+                       'color': fc,
+                       'lineBreak': ' ',
+                       'align': 'center',
+                       'baseline': 'middle'},
+              'encoding': {'text': {'field': 'label', 'type': 'nominal'},
+                           'angle': {'field': 'angle',
+                                     'type': 'quantitative',
+                                     'scale': None}}}
+
+    return circles, spokes, labels
+
+
+def _vl_chart(layers):
+    """
+    Complete Vega-Lite spec from the chart layers.
+    """
+
+    return {'$schema': 'https://vega.github.io/schema/vega-lite/v5.json',
+            'width': VL_SIZE,
+            'height': VL_SIZE,
+            'background': 'transparent',
+            'config': {'view': {'stroke': None}},
+            'encoding': VL_POSITION,
+            'layer': layers}
+
+
+def irl_spec(irl_data, smooth=False, dark_mode=True, targets=False):
+    """
+    Vega-Lite spec of an IRL plot, for the browser to draw.
+
+    The spec carries the same gradient, targets and smoothing as plot_irl
+    and only a few hundred bytes of data per chart: the circles are
+    generated in the browser, and smooth outlines are drawn as closed
+    Catmull-Rom splines through the levels and midpoints instead of being
+    sampled here.
+
+    Parameters
+    ----------
+    irl_data : IRLAssessment
+        The assessment to plot.
+    smooth : bool, optional
+        Smooth the IRL outline. The default is False.
+    dark_mode : bool, optional
+        Use colours for the dark theme. The default is True.
+    targets : bool, optional
+        Also plot the targets, as does irl_data.plot_targets. The default
+        is False.
+
+    Returns
+    -------
+    spec : dict
+        The Vega-Lite spec, for st.vega_lite_chart.
+
+    """
+    fc, fg = _theme(dark_mode)
+    levels = _irl_levels(irl_data)
+    circles, spokes, labels = _vl_scaffold(fc)
+    layers = [circles]
+
+    if irl_data.plot_targets or targets:
+
+        # Targets are always smoothed, as in plot_irl.
+        target_levels = _irl_targets(irl_data)
+        gradient = _vl_gradient(*smooth_outline(target_levels))
+        layers.append(_vl_outline(target_levels,
+                                  True,
+                                  fill=gradient,
+                                  fillOpacity=0.333,
+                                  strokeDash=[4, 2]))
+
+    if smooth:
+
+        gradient = _vl_gradient(*smooth_outline(levels))
+
+    else:
+
+        gradient = _vl_gradient(*_vl_knots(levels, False))
+
+    layers.append(_vl_outline(levels,
+                              smooth,
+                              fill=gradient,
+                              fillOpacity=0.999))
+    layers += [spokes, labels]
+    layers += _vl_level_labels(levels, fc, fg)
+
+    return _vl_chart(layers)
+
+
+def irl_progress_spec(irl0, irl1, smooth=False, dark_mode=True):
+    """
+    Vega-Lite spec of the progress between two IRL assessments, see
+    irl_spec and plot_irl_progress.
+
+    Parameters
+    ----------
+    irl0 : IRLAssessment
+        The earlier assessment.
+    irl1 : IRLAssessment
+        The later assessment.
+    smooth : bool, optional
+        Smooth the IRL outlines. The default is False.
+    dark_mode : bool, optional
+        Use colours for the dark theme. The default is True.
+
+    Returns
+    -------
+    spec : dict
+        The Vega-Lite spec, for st.vega_lite_chart.
+
+    """
+    fc, fg = _theme(dark_mode)
+    irl_norm = mc.Normalize(0, 9)
+    levels0 = _irl_levels(irl0)
+    levels1 = _irl_levels(irl1)
+    circles, spokes, labels = _vl_scaffold(fc)
+    layers = [circles]
+
+    color0 = mc.to_hex(IRL_CMAP(irl_norm(mean(levels0))))
+    color1 = mc.to_hex(IRL_CMAP(irl_norm(mean(levels1))))
+
+    if smooth:
+
+        layers.append(_vl_outline(levels1,
+                                  True,
+                                  fill=color1,
+                                  fillOpacity=0.888))
+        layers.append(_vl_outline(levels0,
+                                  True,
+                                  fill=color0,
+                                  fillOpacity=0.888,
+                                  strokeDash=[4, 2]))
+
+    else:
+
+        # Outlines only, as in plot_irl_progress.
+        layers.append(_vl_outline(levels1, False, stroke='#FF00FF80'))
+        layers.append(_vl_outline(levels0, False, stroke=color0))
+
+    layers += [spokes, labels]
+    layers += _vl_level_labels(levels1, fc, fg)
+
+    return _vl_chart(layers)
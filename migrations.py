@@ -0,0 +1,479 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) Lodve Berre and NTNU Technology Transfer AS 2024.
+
+This file is part of Really Nice IRL.
+
+Really Nice IRL is free software: you can redistribute it and/or modify it
+under the terms of the GNU Affero General Public License as published by the
+Free Software Foundation, either version 3 of the License, or (at your option)
+ any later version.
+
+Really Nice IRL is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with Really Nice IRL. If not, see:
+<https://www.gnu.org/licenses/agpl-3.0.html>.
+
+Versioned schema migrations for the Really Nice IRL database.
+
+Migrations are applied in order, each in its own transaction, and the
+applied versions are recorded in the schema_version table. Deployments
+apply them from the command line before starting the app, as
+ubuntu_helpers/rn_irl.sh and the Dockerfile do. The app itself never
+changes the schema: it refuses to start on an outdated schema, unless
+auto_migrate = true in the [db_details] section of secrets.toml.
+
+Commands:
+
+    python migrations.py upgrade
+    python migrations.py status
+    python migrations.py check-plans
+    python migrations.py rebuild-latest
+"""
+
+import argparse
+import streamlit as st
+import sys
+
+from datetime import datetime
+from sqlalchemy import create_engine, inspect, text
+
+
+SCHEMA_VERSION_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INTEGER PRIMARY KEY NOT NULL,
+    description TEXT,
+    applied TEXT (19))
+"""
+
+# Repopulates the Latest Assessments projection from the history. The latest
+# revision of a project is the one with the highest id.
+REBUILD_LATEST_ASSESSMENTS = [
+    'DELETE FROM "Latest Assessments"',
+    """INSERT INTO "Latest Assessments"
+            (project_no, assessment_id, project_leader_id, active)
+        SELECT project_no, id, project_leader_id, active FROM "IRL Data"
+        WHERE id IN (SELECT MAX(id) FROM "IRL Data" GROUP BY project_no)""",
+    ]
+
+
+def add_column(table, column, definition):
+    """
+    Migration step adding a column unless the table already has it.
+    ADD COLUMN has no IF NOT EXISTS, and the sqlite3 driver does not wrap
+    DDL in the migration transaction, so a migration interrupted before
+    its version was recorded would otherwise fail on the next start.
+
+    Parameters
+    ----------
+    table : str
+        Table name.
+    column : str
+        Name of the new column.
+    definition : str
+        Column type and constraints, e.g. 'INTEGER (1) DEFAULT 0'.
+
+    Returns
+    -------
+    step : callable
+        Takes the migration connection.
+
+    """
+
+    def step(connection):
+
+        rows = connection.execute(text('PRAGMA table_info("%s")' % table))
+        columns = [row.name for row in rows]
+
+        if column not in columns:
+
+            connection.execute(text('ALTER TABLE "%s" ADD COLUMN %s %s'
+                                    % (table, column, definition)))
+
+    return step
+
+
+# Ordered list of (version, description, statements).
+# Never edit a migration that has been released, add a new one instead.
+# Keep statements idempotent (IF NOT EXISTS, add_column etc.) as the sqlite3
+# driver does not wrap DDL in the migration transaction. Statements are SQL
+# strings or callables taking the connection.
+MIGRATIONS = [
+    (1,
+     "Baseline schema",
+     ["""CREATE TABLE IF NOT EXISTS Organisations (
+            org_id INTEGER PRIMARY KEY NOT NULL UNIQUE,
+            org_name TEXT,
+            active INTEGER (1))""",
+      """CREATE TABLE IF NOT EXISTS Faculties (
+            fac_id INTEGER PRIMARY KEY UNIQUE NOT NULL,
+            fac_name TEXT,
+            org_id INTEGER REFERENCES organisations (org_id),
+            active INTEGER (1))""",
+      """CREATE TABLE IF NOT EXISTS Departments (
+            dep_id INTEGER PRIMARY KEY UNIQUE NOT NULL,
+            dep_name TEXT,
+            fac_id INTEGER REFERENCES faculties (fac_id),
+            active INTEGER (1))""",
+      """CREATE TABLE IF NOT EXISTS IRL (
+            Level INTEGER,
+            IRLType TEXT (3),
+            Description TEXT,
+            Aspects TEXT,
+            StartupValue INTEGER,
+            LicenseValue INTEGER)""",
+      """CREATE TABLE IF NOT EXISTS Users (
+            user_id INTEGER PRIMARY KEY,
+            actual_name TEXT,
+            username TEXT UNIQUE,
+            password TEXT,
+            rights INTEGER (1),
+            active INTEGER (1),
+            org_id INTEGER REFERENCES organisations (org_id),
+            fac_id INTEGER REFERENCES faculties (fac_id),
+            dep_id INTEGER REFERENCES departments (dep_id))""",
+      """CREATE TABLE IF NOT EXISTS "Permission Levels" (
+            level INTEGER PRIMARY KEY,
+            level_text TEXT)""",
+      """CREATE TABLE IF NOT EXISTS "Project Teams" (
+            id INTEGER PRIMARY KEY,
+            project_id INTEGER,
+            user_id INTEGER REFERENCES Users (user_id),
+            project_rights INTEGER REFERENCES "Permission Levels" (level),
+            active INTEGER (1))""",
+      """CREATE TABLE IF NOT EXISTS "System Settings" (
+            id INTEGER PRIMARY KEY,
+            logo_uri_light TEXT,
+            logo_uri_dark TEXT,
+            logo_uri TEXT,
+            force_email_users INTEGER (1),
+            owner_org_id INTEGER REFERENCES Organisations (org_id))""",
+      """CREATE TABLE IF NOT EXISTS "User Settings" (
+            id INTEGER PRIMARY KEY NOT NULL,
+            user_id INTEGER REFERENCES users (user_id) UNIQUE NOT NULL,
+            smooth_irl INTEGER (1),
+            filter_on_user INTEGER (1),
+            remember_project INTEGER (1),
+            last_project_no INTEGER,
+            ascending_irl INTEGER (1),
+            ap_table_view INTEGER (1),
+            dark_mode INTEGER (1))""",
+      """CREATE TABLE IF NOT EXISTS "IRL Data" (
+            id INTEGER PRIMARY KEY NOT NULL,
+            project_no INTEGER,
+            project_name TEXT,
+            project_leader_id INTEGER REFERENCES users (user_id),
+            assessment_date TEXT (10),
+            crl_notes TEXT,
+            crl INTEGER (1) DEFAULT (1),
+            trl INTEGER (1) DEFAULT (1),
+            brl INTEGER (1) DEFAULT (1),
+            iprl INTEGER (1) DEFAULT (1),
+            tmrl INTEGER (1) DEFAULT (1),
+            frl INTEGER (1) DEFAULT (1),
+            trl_notes TEXT,
+            brl_notes TEXT,
+            iprl_notes TEXT,
+            tmrl_notes TEXT,
+            frl_notes TEXT,
+            crl_target INTEGER (1) DEFAULT (1),
+            trl_target INTEGER (1) DEFAULT (1),
+            brl_target INTEGER (1) DEFAULT (1),
+            iprl_target INTEGER (1) DEFAULT (1),
+            tmrl_target INTEGER (1) DEFAULT (1),
+            frl_target INTEGER (1) DEFAULT (1),
+            crl_target_lead TEXT (64),
+            trl_target_lead TEXT (64),
+            brl_target_lead TEXT (64),
+            iprl_target_lead TEXT (64),
+            tmrl_target_lead TEXT (64),
+            frl_target_lead TEXT (64),
+            crl_target_duedate TEXT (10),
+            trl_target_duedate TEXT (10),
+            brl_target_duedate TEXT (10),
+            iprl_target_duedate TEXT (10),
+            tmrl_target_duedate TEXT (10),
+            frl_target_duedate TEXT (10),
+            plot_targets INTEGER (1),
+            active INTEGER (1))""",
+      """CREATE TABLE IF NOT EXISTS "Action Points" (
+            ap_id INTEGER PRIMARY KEY,
+            assessment_id INTEGER REFERENCES "IRL Data" (id),
+            irl_type TEXT (4),
+            action_point TEXT,
+            responsible INTEGER REFERENCES Users (user_id),
+            due_date TEXT (10),
+            progress INTEGER (3),
+            comment TEXT)"""]),
+    (2,
+     "Indexes for project, team, action point and user lookups",
+     ["""CREATE INDEX IF NOT EXISTS ix_irl_data_project_date
+            ON "IRL Data" (project_no, assessment_date)""",
+      """CREATE INDEX IF NOT EXISTS ix_irl_data_leader_active
+            ON "IRL Data" (project_leader_id, active)""",
+      """CREATE INDEX IF NOT EXISTS ix_project_teams_project_user
+            ON "Project Teams" (project_id, user_id, active)""",
+      """CREATE INDEX IF NOT EXISTS ix_project_teams_user_active
+            ON "Project Teams" (user_id, active, project_id)""",
+      """CREATE INDEX IF NOT EXISTS ix_action_points_assessment_type
+            ON "Action Points" (assessment_id, irl_type)""",
+      """CREATE INDEX IF NOT EXISTS ix_users_org_active
+            ON Users (org_id, active)""",
+      "ANALYZE"]),
+    (3,
+     "Index for the latest revision of each project",
+     ["""CREATE INDEX IF NOT EXISTS ix_irl_data_project_id
+            ON "IRL Data" (project_no, id)""",
+      "ANALYZE"]),
+    (4,
+     "Latest Assessments projection",
+     ["""CREATE TABLE IF NOT EXISTS "Latest Assessments" (
+            project_no INTEGER PRIMARY KEY NOT NULL,
+            assessment_id INTEGER REFERENCES "IRL Data" (id),
+            project_leader_id INTEGER REFERENCES Users (user_id),
+            active INTEGER (1))""",
+      """CREATE INDEX IF NOT EXISTS ix_latest_assessments_leader_active
+            ON "Latest Assessments" (project_leader_id, active)""",
+      """CREATE INDEX IF NOT EXISTS ix_latest_assessments_active
+            ON "Latest Assessments" (active, assessment_id)"""] +
+     REBUILD_LATEST_ASSESSMENTS),
+    (5,
+     "Interactive IRL chart setting",
+     [add_column("User Settings", "interactive_irl",
+                 "INTEGER (1) DEFAULT 0")]),
+    ]
+
+
+def latest_version():
+    """
+    The version the schema will have once all migrations are applied.
+    """
+
+    return MIGRATIONS[-1][0]
+
+
+def current_version(connection):
+    """
+    Get the schema version of the database. Only reads, so it is safe to
+    call from request time code.
+
+    Parameters
+    ----------
+    connection : sqlalchemy.engine.Connection
+        Open connection to the database.
+
+    Returns
+    -------
+    version : int
+        Highest applied migration, 0 if none have been applied.
+
+    """
+    if not inspect(connection).has_table('schema_version'):
+
+        return 0
+
+    version = connection.execute(
+        text("SELECT MAX(version) FROM schema_version")).scalar()
+
+    if version is None:
+
+        return 0
+
+    return version
+
+
+def upgrade(engine, target=None):
+    """
+    Apply all pending migrations up to and including the target version.
+
+    Parameters
+    ----------
+    engine : sqlalchemy.engine.Engine
+        Engine for the database to upgrade.
+    target : int, optional
+        Version to upgrade to. The default is the latest version.
+
+    Returns
+    -------
+    applied : list of int
+        The versions applied by this call.
+
+    """
+    if target is None:
+
+        target = latest_version()
+
+    applied = []
+
+    with engine.begin() as connection:
+
+        connection.execute(text(SCHEMA_VERSION_TABLE))
+        version = current_version(connection)
+
+    for mig_version, description, statements in MIGRATIONS:
+
+        if mig_version <= version or mig_version > target:
+
+            continue
+
+        with engine.begin() as connection:
+
+            for statement in statements:
+
+                if callable(statement):
+
+                    statement(connection)
+
+                else:
+
+                    connection.execute(text(statement))
+
+            now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            connection.execute(
+                text("INSERT INTO schema_version "
+                     "(version, description, applied) "
+                     "VALUES (:version, :description, :applied)"),
+                {'version': mig_version,
+                 'description': description,
+                 'applied': now})
+
+        applied.append(mig_version)
+
+    return applied
+
+
+def status(engine):
+    """
+    List all migrations and whether they have been applied.
+
+    Parameters
+    ----------
+    engine : sqlalchemy.engine.Engine
+        Engine for the database to inspect.
+
+    Returns
+    -------
+    rows : list of tuple
+        (version, description, applied) where applied is None for pending
+        migrations.
+
+    """
+    with engine.begin() as connection:
+
+        connection.execute(text(SCHEMA_VERSION_TABLE))
+        applied = dict(connection.execute(
+            text("SELECT version, applied FROM schema_version")).all())
+
+    return [(version, description, applied.get(version, None))
+            for version, description, _ in MIGRATIONS]
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(
+        description="Manage the Really Nice IRL database schema.")
+    parser.add_argument("command",
+                        choices=["upgrade", "status", "check-plans",
+                                 "rebuild-latest"],
+                        help="upgrade applies pending migrations, status "
+                             "lists applied and pending migrations, "
+                             "check-plans fails if a hot query scans a "
+                             "table, rebuild-latest repopulates the Latest "
+                             "Assessments table from the history")
+    parser.add_argument("--db",
+                        help="SQLAlchemy database URL. Defaults to db_path "
+                             "in .streamlit/secrets.toml")
+    parser.add_argument("--target",
+                        type=int,
+                        help="Version to upgrade to. Defaults to latest")
+    args = parser.parse_args(argv)
+
+    if args.db is None:
+
+        db_path = st.secrets.db_details.db_path
+
+    else:
+
+        db_path = args.db
+
+    engine = create_engine(db_path)
+
+    try:
+
+        if args.command in ("check-plans", "rebuild-latest"):
+
+            # Both use the current schema, e.g. Latest Assessments.
+            with engine.begin() as connection:
+
+                version = current_version(connection)
+
+            if version < latest_version():
+
+                print("Database schema is at version %d, the latest is %d. "
+                      "Run python migrations.py upgrade first."
+                      % (version, latest_version()))
+
+                return 1
+
+        if args.command == "upgrade":
+
+            applied = upgrade(engine, args.target)
+
+            if len(applied) == 0:
+
+                print("Database is already up to date.")
+
+            for version in applied:
+
+                print("Applied migration %d." % version)
+
+        elif args.command == "status":
+
+            for version, description, applied in status(engine):
+
+                if applied is None:
+
+                    applied = "pending"
+
+                print("%3d  %-40s %s" % (version, description, applied))
+
+        elif args.command == "check-plans":
+
+            # Imported here as base imports this module.
+            import base
+
+            scans = base.check_query_plans(engine)
+
+            for name, details in scans.items():
+
+                for detail in details:
+
+                    print("%s: %s" % (name, detail))
+
+            if len(scans) > 0:
+
+                return 1
+
+            print("No table scans in the checked queries.")
+
+        elif args.command == "rebuild-latest":
+
+            import base
+
+            count = base.rebuild_latest_assessments(engine)
+            print("Rebuilt Latest Assessments for %d projects." % count)
+
+    finally:
+
+        engine.dispose()
+
+    return 0
+
+
+if __name__ == '__main__':
+
+    sys.exit(main())
@@ -1,137 +1,251 @@
-# -*- coding: utf-8 -*-
-"""
-Copyright (c) Lodve Berre and NTNU Technology Transfer AS 2024.
-
-This file is part of Really Nice IRL.
-
-Really Nice IRL is free software: you can redistribute it and/or modify it
-under the terms of the GNU Affero General Public License as published by the
-Free Software Foundation, either version 3 of the License, or (at your option)
- any later version.
-
-Really Nice IRL is distributed in the hope that it will be useful, but
-WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
-or FITNESS FOR A PARTICULAR PURPOSE.
-See the GNU General Public License for more details.
-
-You should have received a copy of the GNU Affero General Public License
-along with Really Nice IRL. If not, see:
-<https://www.gnu.org/licenses/agpl-3.0.html>.
-"""
-
-import streamlit as st
-import data_viz
-import numpy as np
-import ui
-import utils
-
-from streamlit import session_state as ss
-
-
-irl_labels = ['Customer Readiness Level',
-              'Technology Readiness Level',
-              'Business Model Readiness Level',
-              'IPR Readiness Level',
-              'Team Readiness Level',
-              'Funding Readiness Level']
-
-
-def main():
-
-    user = ss.user
-    utils.get_IRL_data(user)
-
-    portfolio = st.sidebar.multiselect("Select your portfolio",
-                                       ss.projects,
-                                       placeholder="Select projects")
-    max_cols = st.sidebar.slider("Max columns",
-                                 min_value=1,
-                                 max_value=9,
-                                 step=1,
-                                 value=3)
-    ss['project_portfolio'] = portfolio
-    cells = len(ss['project_portfolio'])
-
-    # If we have less selected projects than the maximum cols, then...
-    if cells < max_cols:
-
-        max_cols = cells
-
-    # Find the number of rows.
-    if cells == 0:
-
-        rows = 0
-
-    else:
-
-        rows = int(np.ceil(cells/max_cols))
-
-    # Create the grid for headers and plots.
-    grid = ui.make_grid(max_cols, rows*2)
-    cell = 0
-    row = 0
-    col = 0
-
-    # Loop through the selected projects and put headers, plots and
-    # assessments where they belong.
-    for cell in range(cells):
-
-        if (cell != 0) and (cell % max_cols == 0):
-
-            row += 2
-            col = 0
-
-        project = ss['project_portfolio'][cell]
-        header = "<h4 style='text-align: center;'>%s</h4>" % project
-        grid[row][col].markdown(header, unsafe_allow_html=True)
-        project_no = project.project_no
-        smooth = ss.user_settings.smooth_irl
-        dark_mode = ss.user_settings.dark_mode
-
-        irl_plot = data_viz.plot_irl(project,
-                                     smooth,
-                                     dark_mode)
-
-        with grid[row+1][col]:
-
-            st.pyplot(irl_plot)
-            prefix = 'port' + str(project_no)
-
-            if ss.user_settings.ap_table_view:
-
-                ui.show_action_points_table(project)
-
-            else:
-
-                ui.show_action_points(prefix, project, None)
-
-            if ss.user.org_id == ss.system_settings.owner_org_id:
-
-                ui.display_valuation(project)
-
-        col += 1
-
-
-if __name__ == '__main__':
-
-    ui.setup_page()
-    # Currently no sensible way to get theme information.
-    # We assume dark as this is default until otherwise is proven by user.
-    if ss.get('user_settings', None) is None:
-
-        dark_mode = True
-
-    else:
-
-        dark_mode = ss.user_settings.dark_mode
-
-    ui.add_logo(dark_mode)
-
-    if ss.get('user', None) is None:
-
-        ss['go_to_page'] = 'pages/4_Project_Portfolio.py'
-        st.switch_page('pages/2_Login.py')
-
-    else:
-
-        main()
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) Lodve Berre and NTNU Technology Transfer AS 2024.
+
+This file is part of Really Nice IRL.
+
+Really Nice IRL is free software: you can redistribute it and/or modify it
+under the terms of the GNU Affero General Public License as published by the
+Free Software Foundation, either version 3 of the License, or (at your option)
+ any later version.
+
+Really Nice IRL is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with Really Nice IRL. If not, see:
+<https://www.gnu.org/licenses/agpl-3.0.html>.
+"""
+
+import streamlit as st
+import base
+import data_viz
+import numpy as np
+import ui
+import utils
+
+from streamlit import session_state as ss
+
+
+irl_labels = ['Customer Readiness Level',
+              'Technology Readiness Level',
+              'Business Model Readiness Level',
+              'IPR Readiness Level',
+              'Team Readiness Level',
+              'Funding Readiness Level']
+
+
+# Portfolio sort orders, valuation only for users allowed to see it.
+SORT_ORDERS = ['Name', 'Mean IRL', 'Valuation']
+PAGE_SIZES = [3, 6, 9, 12, 18, 24, 36]
+
+
+def sort_portfolio(portfolio, sort_by, valuations=None):
+    """
+    Order of the projects in the portfolio view.
+
+    Parameters
+    ----------
+    portfolio : list of IRLAssessment
+        The selected projects.
+    sort_by : str
+        One of SORT_ORDERS. Mean IRL and valuation sort from high to low.
+    valuations : Pandas DataFrame, optional
+        base.calc_portfolio_values for the portfolio, needed to sort by
+        valuation. The default is None.
+
+    Returns
+    -------
+    order : list of int
+        Positions in the portfolio, in display order.
+
+    """
+
+    if sort_by == 'Mean IRL':
+
+        keys = -np.array([np.mean(project.levels()) for project in portfolio])
+
+    elif sort_by == 'Valuation':
+
+        keys = -valuations['startup'].to_numpy()
+
+    else:
+
+        keys = np.array([str(project.project_name).lower()
+                         for project in portfolio])
+
+    return [int(i) for i in np.argsort(keys, kind='stable')]
+
+
+def main():
+
+    user = ss.user
+    utils.get_IRL_data(user)
+
+    portfolio = st.sidebar.multiselect("Select your portfolio",
+                                       ss.projects,
+                                       placeholder="Select projects")
+    max_cols = st.sidebar.slider("Max columns",
+                                 min_value=1,
+                                 max_value=9,
+                                 step=1,
+                                 value=3)
+    page_size = st.sidebar.select_slider("Projects per page",
+                                         options=PAGE_SIZES,
+                                         value=9)
+    show_valuation = ss.user.org_id == ss.system_settings.owner_org_id
+    sort_orders = SORT_ORDERS if show_valuation else SORT_ORDERS[:2]
+    sort_by = st.sidebar.selectbox("Sort by", sort_orders)
+    ss['project_portfolio'] = portfolio
+    valuations = None
+
+    if show_valuation:
+
+        valuations = base.calc_portfolio_values(portfolio)
+
+    order = sort_portfolio(portfolio, sort_by, valuations)
+    pages = max(1, int(np.ceil(len(portfolio)/page_size)))
+
+    # Stay on the last page when the portfolio shrinks.
+    if ss.get('portfolio_page', 1) > pages:
+
+        ss['portfolio_page'] = pages
+
+    if pages > 1:
+
+        page = st.sidebar.number_input("Page",
+                                       min_value=1,
+                                       max_value=pages,
+                                       step=1,
+                                       key='portfolio_page')
+
+    else:
+
+        page = 1
+
+    # Only the projects on the current page are shown.
+    visible = order[(page-1)*page_size:page*page_size]
+    cells = len(visible)
+
+    # If we have less selected projects than the maximum cols, then...
+    if cells < max_cols:
+
+        max_cols = cells
+
+    # Find the number of rows.
+    if cells == 0:
+
+        rows = 0
+
+    else:
+
+        rows = int(np.ceil(cells/max_cols))
+
+    # Create the grid for headers and plots.
+    grid = ui.make_grid(max_cols, rows*2)
+
+    if not ss.user_settings.ap_table_view:
+
+        ass_ids = [portfolio[i].id for i in visible]
+        all_aps = base.get_assessments_action_points(ass_ids)
+
+    smooth = ss.user_settings.smooth_irl
+    dark_mode = ss.user_settings.dark_mode
+    interactive = ss.user_settings.interactive_irl
+
+    # Render all charts up front, in parallel, before laying them out.
+    if not interactive:
+
+        workers = st.secrets.get('rendering', {}).get('workers', None)
+        irl_plots = data_viz.render_irl_batch([portfolio[i] for i in visible],
+                                              smooth,
+                                              dark_mode,
+                                              workers=workers)
+
+        # Have the neighbouring pages ready in the render cache.
+        adjacent = order[page*page_size:(page+1)*page_size]
+
+        if page > 1:
+
+            adjacent += order[(page-2)*page_size:(page-1)*page_size]
+
+        data_viz.prefetch_irl_batch([portfolio[i] for i in adjacent],
+                                    smooth,
+                                    dark_mode,
+                                    workers=workers)
+
+    cell = 0
+    row = 0
+    col = 0
+
+    # Loop through the projects on the page and put headers, plots and
+    # assessments where they belong.
+    for cell in range(cells):
+
+        if (cell != 0) and (cell % max_cols == 0):
+
+            row += 2
+            col = 0
+
+        project = portfolio[visible[cell]]
+        header = "<h4 style='text-align: center;'>%s</h4>" % project
+        grid[row][col].markdown(header, unsafe_allow_html=True)
+        project_no = project.project_no
+
+        with grid[row+1][col]:
+
+            if interactive:
+
+                ui.show_irl(project, smooth, dark_mode, interactive=True)
+
+            else:
+
+                st.image(irl_plots[cell], width="stretch")
+
+            prefix = 'port' + str(project_no)
+
+            if ss.user_settings.ap_table_view:
+
+                ui.show_action_points_table(project)
+
+            else:
+
+                ui.show_action_points(prefix, project, None,
+                                      all_aps=all_aps)
+
+            if show_valuation:
+
+                ui.display_valuation(project,
+                                     valuations.iloc[visible[cell]])
+
+        col += 1
+
+
+if __name__ == '__main__':
+
+    ui.setup_page()
+    # Currently no sensible way to get theme information.
+    # We assume dark as this is default until otherwise is proven by user.
+    if ss.get('user_settings', None) is None:
+
+        dark_mode = True
+
+    else:
+
+        dark_mode = ss.user_settings.dark_mode
+
+    ui.add_logo(dark_mode)
+
+    if ss.get('user', None) is None:
+
+        ss['go_to_page'] = 'pages/4_Project_Portfolio.py'
+        st.switch_page('pages/2_Login.py')
+
+    else:
+
+        # Read queries are memoized for the duration of this run.
+        with base.request_scope():
+
+            main()
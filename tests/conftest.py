@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) Lodve Berre and NTNU Technology Transfer AS 2024.
+
+This file is part of Really Nice IRL.
+
+Really Nice IRL is free software: you can redistribute it and/or modify it
+under the terms of the GNU Affero General Public License as published by the
+Free Software Foundation, either version 3 of the License, or (at your option)
+ any later version.
+
+Really Nice IRL is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with Really Nice IRL. If not, see:
+<https://www.gnu.org/licenses/agpl-3.0.html>.
+"""
+
+import os
+import pytest
+import sys
+
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+# The app modules live in the repository root.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+import migrations  # noqa: E402
+
+
+class Secrets(dict):
+    """
+    Stand-in for st.secrets, sections as attributes.
+    """
+
+    def __getattr__(self, name):
+
+        return self[name]
+
+
+def memory_engine():
+    """
+    Engine for a new in-memory SQLite database, one shared connection.
+    """
+
+    return create_engine('sqlite://',
+                         poolclass=StaticPool,
+                         connect_args={'check_same_thread': False})
+
+
+@pytest.fixture
+def engine():
+    """
+    Freshly migrated in-memory database.
+    """
+    engine = memory_engine()
+    migrations.upgrade(engine)
+
+    yield engine
+
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    """
+    Freshly migrated in-memory database the app modules talk to.
+    """
+    import base
+
+    base.bind_engine(engine)
+
+    yield engine
+
+    base.dispose_engine()
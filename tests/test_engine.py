@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) Lodve Berre and NTNU Technology Transfer AS 2024.
+
+This file is part of Really Nice IRL.
+
+Really Nice IRL is free software: you can redistribute it and/or modify it
+under the terms of the GNU Affero General Public License as published by the
+Free Software Foundation, either version 3 of the License, or (at your option)
+ any later version.
+
+Really Nice IRL is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with Really Nice IRL. If not, see:
+<https://www.gnu.org/licenses/agpl-3.0.html>.
+"""
+
+import pytest
+import threading
+
+import base
+import migrations
+
+from conftest import memory_engine, Secrets
+
+
+@pytest.mark.parametrize('pragmas', [{'foreign_keys': 'ON'},
+                                     {'cache_size': '0; DROP TABLE Users'}])
+def test_sqlite_pragmas_are_validated(pragmas, monkeypatch):
+
+    monkeypatch.setattr(base.st, 'secrets', Secrets(sqlite_pragmas=pragmas))
+
+    with pytest.raises(ValueError):
+
+        base.get_sqlite_pragmas()
+
+
+def test_sqlite_pragmas_override_defaults(monkeypatch):
+
+    monkeypatch.setattr(base.st, 'secrets',
+                        Secrets(sqlite_pragmas={'cache_size': -4000}))
+
+    assert base.get_sqlite_pragmas()['cache_size'] == -4000
+
+
+def test_pool_stats_count_every_event():
+
+    threads = 8
+    events = 20000
+    before = base.get_pool_stats()['checkouts']
+
+    def checkout():
+
+        for _ in range(events):
+
+            base._on_checkout(None, None, None)
+
+    workers = [threading.Thread(target=checkout) for _ in range(threads)]
+
+    for worker in workers:
+
+        worker.start()
+
+    for worker in workers:
+
+        worker.join()
+
+    assert base.get_pool_stats()['checkouts'] - before == threads * events
+
+
+def test_bind_engine_reloads_org_tree(db):
+
+    base.add_org('First')
+
+    assert [str(org) for org in base.get_orgs()] == ['First']
+
+    engine = memory_engine()
+    migrations.upgrade(engine)
+    base.bind_engine(engine)
+
+    assert base.get_orgs() == []
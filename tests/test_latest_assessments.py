@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) Lodve Berre and NTNU Technology Transfer AS 2024.
+
+This file is part of Really Nice IRL.
+
+Really Nice IRL is free software: you can redistribute it and/or modify it
+under the terms of the GNU Affero General Public License as published by the
+Free Software Foundation, either version 3 of the License, or (at your option)
+ any later version.
+
+Really Nice IRL is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with Really Nice IRL. If not, see:
+<https://www.gnu.org/licenses/agpl-3.0.html>.
+"""
+
+from sqlalchemy import text
+
+import base
+
+
+OLD_LEADER = base.User(user_id=1, rights=1)
+NEW_LEADER = base.User(user_id=2, rights=1)
+
+
+def insert_project(db, project_no, assessment_date=None):
+
+    project = base.IRLAssessment(project_no=project_no,
+                                 project_name='Project %d' % project_no,
+                                 project_leader_id=OLD_LEADER.user_id,
+                                 active=1)
+    assert project.insert() is None
+
+    if assessment_date is not None:
+
+        with db.begin() as connection:
+
+            connection.execute(text(
+                'UPDATE "IRL Data" SET assessment_date = :date '
+                'WHERE project_no = :project_no'),
+                {'date': assessment_date, 'project_no': project_no})
+
+    project, = [p for p in base.get_projects(OLD_LEADER)
+                if p.project_no == project_no]
+
+    return project
+
+
+def project_nos(user, filt=True, active=True):
+
+    return [p.project_no for p in base.get_projects(user, filt, active)]
+
+
+def test_leader_change_on_todays_assessment(db):
+
+    project = insert_project(db, 1)
+    project.project_leader_id = NEW_LEADER.user_id
+    project.update()
+
+    assert project_nos(OLD_LEADER) == []
+    assert project_nos(NEW_LEADER) == [1]
+
+
+def test_leader_change_saves_new_revision(db):
+
+    project = insert_project(db, 1, '2020-01-01')
+    project.project_leader_id = NEW_LEADER.user_id
+    new_id = project.update()
+
+    assert project_nos(OLD_LEADER) == []
+    latest, = base.get_projects(NEW_LEADER)
+    assert latest.id == new_id != project.id
+
+
+def test_overwriting_old_revision_keeps_latest(db):
+
+    project = insert_project(db, 1, '2020-01-01')
+    project.update()
+    project.project_leader_id = NEW_LEADER.user_id
+    project.update(overwrite=True)
+
+    assert project_nos(OLD_LEADER) == [1]
+    assert project_nos(NEW_LEADER) == []
+
+
+def test_status_change(db):
+
+    insert_project(db, 1)
+    project = insert_project(db, 2, '2020-01-01')
+    project.update()
+
+    assert base.change_project_status(base.get_projects(OLD_LEADER), False)
+    assert project_nos(OLD_LEADER) == []
+    assert project_nos(OLD_LEADER, active=False) == [1, 2]
+
+    assert base.change_project_status(
+        base.get_projects(OLD_LEADER, active=False), True)
+    assert project_nos(OLD_LEADER) == [1, 2]
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) Lodve Berre and NTNU Technology Transfer AS 2024.
+
+This file is part of Really Nice IRL.
+
+Really Nice IRL is free software: you can redistribute it and/or modify it
+under the terms of the GNU Affero General Public License as published by the
+Free Software Foundation, either version 3 of the License, or (at your option)
+ any later version.
+
+Really Nice IRL is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with Really Nice IRL. If not, see:
+<https://www.gnu.org/licenses/agpl-3.0.html>.
+"""
+
+import pytest
+import sqlite3
+
+from contextlib import closing
+
+import base
+import migrations
+
+from conftest import memory_engine, Secrets
+from sqlalchemy import create_engine, text
+
+
+def test_upgrade_applies_all_migrations(engine):
+
+    assert all(applied is not None
+               for _, _, applied in migrations.status(engine))
+    assert migrations.upgrade(engine) == []
+
+
+def test_add_column_survives_interrupted_migration():
+
+    engine = memory_engine()
+    migrations.upgrade(engine, target=4)
+
+    # The column was added, but the process died before the version was
+    # recorded.
+    with engine.begin() as connection:
+
+        connection.execute(text('ALTER TABLE "User Settings" '
+                                'ADD COLUMN interactive_irl INTEGER (1)'))
+
+    assert migrations.upgrade(engine) == [5]
+
+    with engine.begin() as connection:
+
+        rows = connection.execute(text('PRAGMA table_info("User Settings")'))
+        columns = [row.name for row in rows]
+
+    assert columns.count('interactive_irl') == 1
+
+    engine.dispose()
+
+
+def test_engine_refuses_outdated_schema_without_ddl(tmp_path, monkeypatch):
+
+    db_file = tmp_path / 'irl.sdb'
+    db_path = 'sqlite:///%s' % db_file
+    secrets = Secrets(db_details=Secrets(db_path=db_path))
+    monkeypatch.setattr(base.st, 'secrets', secrets)
+    base.dispose_engine()
+
+    with pytest.raises(RuntimeError, match='migrations.py upgrade'):
+
+        base.get_engine()
+
+    with closing(sqlite3.connect(db_file)) as connection:
+
+        tables = connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'").fetchall()
+
+    assert tables == []
+
+    engine = create_engine(db_path)
+    migrations.upgrade(engine)
+    engine.dispose()
+
+    try:
+
+        assert base.get_engine() is not None
+
+    finally:
+
+        base.dispose_engine()
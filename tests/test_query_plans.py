@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) Lodve Berre and NTNU Technology Transfer AS 2024.
+
+This file is part of Really Nice IRL.
+
+Really Nice IRL is free software: you can redistribute it and/or modify it
+under the terms of the GNU Affero General Public License as published by the
+Free Software Foundation, either version 3 of the License, or (at your option)
+ any later version.
+
+Really Nice IRL is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with Really Nice IRL. If not, see:
+<https://www.gnu.org/licenses/agpl-3.0.html>.
+"""
+
+import base
+import migrations
+
+
+def test_hot_queries_do_not_scan(engine):
+
+    assert base.check_query_plans(engine) == {}
+
+
+def test_check_plans_requires_upgraded_schema(tmp_path, capsys):
+
+    db_path = 'sqlite:///%s' % (tmp_path / 'irl.sdb')
+    migrations.main(['upgrade', '--db', db_path, '--target', '3'])
+
+    assert migrations.main(['check-plans', '--db', db_path]) == 1
+    assert 'upgrade first' in capsys.readouterr().out
+
+    migrations.main(['upgrade', '--db', db_path])
+
+    assert migrations.main(['check-plans', '--db', db_path]) == 0
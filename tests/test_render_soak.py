@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) Lodve Berre and NTNU Technology Transfer AS 2024.
+
+This file is part of Really Nice IRL.
+
+Really Nice IRL is free software: you can redistribute it and/or modify it
+under the terms of the GNU Affero General Public License as published by the
+Free Software Foundation, either version 3 of the License, or (at your option)
+ any later version.
+
+Really Nice IRL is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with Really Nice IRL. If not, see:
+<https://www.gnu.org/licenses/agpl-3.0.html>.
+"""
+
+import ctypes
+import ctypes.util
+import gc
+import os
+import random
+
+import pytest
+
+import base
+import data_viz
+
+
+WARMUP = 25
+RENDERS = 100
+# Leaking figures cost several MB per render, far above this.
+MAX_GROWTH = 20 * 1024 * 1024
+
+
+def rss():
+    """
+    Resident set size of this process in bytes, from /proc, after handing
+    freed memory back to the system so allocator noise does not count.
+    """
+    gc.collect()
+
+    try:
+
+        ctypes.CDLL(ctypes.util.find_library('c')).malloc_trim(0)
+
+    except (OSError, AttributeError):
+
+        # Not glibc, the bound still catches leaks of whole figures.
+        pass
+
+    with open('/proc/self/statm') as statm:
+
+        return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def random_assessment(rng):
+
+    return base.IRLAssessment(plot_targets=rng.randint(0, 1), **{
+        irl_type.lower() + suffix: rng.randint(1, 9)
+        for irl_type in base.IRL_TYPES for suffix in ('', '_target')})
+
+
+def render(rng):
+
+    # Every render is a cold one, the cache must not hide a leak.
+    data_viz.render_cache.clear()
+    smooth = rng.random() < 0.5
+    dark_mode = rng.random() < 0.5
+
+    if rng.random() < 0.5:
+
+        data_viz.render_irl(random_assessment(rng), smooth, dark_mode)
+
+    else:
+
+        data_viz.render_irl_progress(random_assessment(rng),
+                                     random_assessment(rng), smooth,
+                                     dark_mode)
+
+
+@pytest.mark.skipif(not os.path.exists('/proc/self/statm'),
+                    reason="needs /proc to read the resident set size")
+def test_rendering_charts_does_not_grow_memory():
+
+    rng = random.Random(17)
+
+    # Let the allocator reach its high-water mark for the image buffers.
+    for _ in range(WARMUP):
+
+        render(rng)
+
+    before = rss()
+
+    for _ in range(RENDERS):
+
+        render(rng)
+
+    assert rss() - before < MAX_GROWTH
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) Lodve Berre and NTNU Technology Transfer AS 2024.
+
+This file is part of Really Nice IRL.
+
+Really Nice IRL is free software: you can redistribute it and/or modify it
+under the terms of the GNU Affero General Public License as published by the
+Free Software Foundation, either version 3 of the License, or (at your option)
+ any later version.
+
+Really Nice IRL is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with Really Nice IRL. If not, see:
+<https://www.gnu.org/licenses/agpl-3.0.html>.
+"""
+
+import pytest
+
+from sqlalchemy import text
+
+import base
+
+
+@pytest.fixture
+def member(db):
+
+    with db.begin() as connection:
+
+        connection.execute(text(
+            "INSERT INTO Users (user_id, username, rights, active) "
+            "VALUES (1, 'member', 2, 1)"))
+
+    return base.User(user_id=1, rights=2)
+
+
+def test_read_after_flush_sees_write(member):
+
+    with base.request_scope() as context:
+
+        assert len(base.get_project_team(1)) == 0
+
+        # Session.add is written by the flush on commit.
+        base.add_project_team(1, [member])
+
+        assert base.get_project_team(1).user_id.tolist() == [1]
+        assert context.stats()['misses'] == 2
+
+
+def test_read_after_bulk_update_sees_write(member):
+
+    base.add_project_team(1, [member])
+
+    with base.request_scope() as context:
+
+        assert base.get_project_rights(1, 1) == 2
+
+        # ProjectTeam.update is a bulk update, no flush is involved.
+        team_member = base.get_project_team(1).team_obj[0]
+        team_member.project_rights = 3
+        team_member.update()
+
+        assert base.get_project_rights(1, 1) == 3
+        assert context.stats()['misses'] == 3
+
+
+def test_results_are_copies(member):
+
+    base.add_project_team(1, [member])
+
+    with base.request_scope() as context:
+
+        team = base.get_project_team(1)
+        team['access_level'] = 'Editor'
+        team.drop(index=0, inplace=True)
+        non_members = base.get_project_non_members(1)
+        non_members.append(member)
+
+        assert 'access_level' not in base.get_project_team(1)
+        assert len(base.get_project_team(1)) == 1
+        assert base.get_project_non_members(1) == []
+        assert context.stats()['hits'] == 3
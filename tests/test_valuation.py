@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+Copyright (c) Lodve Berre and NTNU Technology Transfer AS 2024.
+
+This file is part of Really Nice IRL.
+
+Really Nice IRL is free software: you can redistribute it and/or modify it
+under the terms of the GNU Affero General Public License as published by the
+Free Software Foundation, either version 3 of the License, or (at your option)
+ any later version.
+
+Really Nice IRL is distributed in the hope that it will be useful, but
+WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with Really Nice IRL. If not, see:
+<https://www.gnu.org/licenses/agpl-3.0.html>.
+"""
+
+import random
+
+from sqlalchemy import func, or_, text
+
+import base
+
+
+IRL = base.IRL
+
+
+def sql_value(assessment, value, target):
+    """
+    The per-assessment SQL valuation calc_values replaced.
+    """
+    suffix = '_target' if target else ''
+
+    with base.session_scope() as session:
+
+        total = session.query(func.sum(getattr(IRL, value))).filter(or_(*[
+            (IRL.IRLType == irl_type) &
+            (IRL.Level == getattr(assessment, irl_type.lower() + suffix))
+            for irl_type in base.IRL_TYPES])).scalar()
+
+    return total or 0
+
+
+def seed_reference(db, rng):
+
+    rows = [{'Level': level,
+             'IRLType': irl_type,
+             'StartupValue': rng.choice([None, rng.randint(0, 10**6)]),
+             'LicenseValue': rng.choice([None, rng.randint(0, 10**6)])}
+            for irl_type in base.IRL_TYPES for level in range(1, 10)]
+
+    with db.begin() as connection:
+
+        connection.execute(text(
+            'INSERT INTO IRL (Level, IRLType, StartupValue, LicenseValue) '
+            'VALUES (:Level, :IRLType, :StartupValue, :LicenseValue)'), rows)
+
+    base.invalidate_irl_reference()
+
+
+def test_calc_values_matches_sql_valuation(db):
+
+    rng = random.Random(7)
+    seed_reference(db, rng)
+    # 0 and None are unset levels, they are worth nothing.
+    choices = [None, 0] + list(range(1, 10))
+    assessments = [base.IRLAssessment(**{
+        irl_type.lower() + suffix: rng.choice(choices)
+        for irl_type in base.IRL_TYPES for suffix in ('', '_target')})
+        for _ in range(50)]
+    assessments.append(base.IRLAssessment())
+
+    for value in ('StartupValue', 'LicenseValue'):
+
+        for target in (False, True):
+
+            expected = [sql_value(assessment, value, target)
+                        for assessment in assessments]
+
+            assert (base.calc_values(assessments, value, target).tolist() ==
+                    expected)
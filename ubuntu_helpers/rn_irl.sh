@@ -2,4 +2,5 @@
 
 source /etc/rn_irl/bin/activate
 cd /etc/rn_irl/bin/rn_irl
+python migrations.py upgrade || exit 1
 streamlit run Introduction.py